@@ -0,0 +1,82 @@
+"""benchmark filling defaults in `GridSchema.coerce_data`: the per-cell `apply` it
+used to run vs the column-wise `fill_with_defaults`.
+run with: `python benchmarks/bench_coerce_data.py`
+"""
+
+import functools
+import random
+import timeit
+
+import pandas as pd
+
+from ipyautoui.automapschema import _init_model_schema
+from ipyautoui.custom.autogrid import GridSchema, fill_with_defaults
+from ipyautoui.demo_schemas.editable_datagrid import EditableGrid, DataFrameCols
+
+
+def fill_with_defaults_by_cell(data: pd.DataFrame, defaults: dict) -> pd.DataFrame:
+    """the previous implementation. a python lambda per cell"""
+
+    def fill_with_default(col):
+        default_value = defaults.get(col.name)
+        if default_value is None:
+            return col
+        else:
+            return col.apply(
+                lambda x: (
+                    default_value
+                    if (pd.isna(x).all() if isinstance(x, list) else pd.isna(x))
+                    else x
+                )
+            )
+
+    return data.apply(fill_with_default)
+
+
+def get_data(n_rows: int, missing: float = 0.3, seed: int = 0) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    row = DataFrameCols().model_dump()
+    get = lambda v: None if rnd.random() < missing else v
+    return pd.DataFrame(
+        [{k: get(v) for k, v in row.items()} for _ in range(n_rows)],
+        index=pd.RangeIndex(n_rows),
+    )
+
+
+def main(sizes=(1_000, 10_000, 100_000), number=3):
+    _, schema = _init_model_schema(EditableGrid)
+    gridschema = GridSchema(schema)
+    defaults = gridschema.default_row
+    print(f"columns: {len(defaults)}")
+    for n in sizes:
+        data = get_data(n)
+        by_cell = fill_with_defaults_by_cell(data, defaults)
+        vectorised = fill_with_defaults(data, defaults)
+        assert by_cell.equals(vectorised), "results differ"
+
+        t_cell = min(
+            timeit.repeat(
+                functools.partial(fill_with_defaults_by_cell, data, defaults),
+                number=number,
+            )
+        )
+        t_vec = min(
+            timeit.repeat(
+                functools.partial(fill_with_defaults, data, defaults), number=number
+            )
+        )
+        t_coerce = min(
+            timeit.repeat(
+                functools.partial(gridschema.coerce_data, data), number=number
+            )
+        )
+        print(
+            f"rows: {n:>7} | by cell: {1e3 * t_cell / number:8.1f} ms"
+            f" | vectorised: {1e3 * t_vec / number:6.1f} ms"
+            f" | speedup: {t_cell / t_vec:5.1f}x"
+            f" | coerce_data: {1e3 * t_coerce / number:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
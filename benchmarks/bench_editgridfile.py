@@ -0,0 +1,80 @@
+"""benchmark EditGridFile storage: the functions that load and save the whole JSON
+file on every call vs `JsonFileStore` (in-memory index + append-only log).
+run with: `python benchmarks/bench_editgridfile.py`
+"""
+
+import contextlib
+import functools
+import io
+import json
+import pathlib
+import tempfile
+import timeit
+
+from ipyautoui.custom.editgridfile import (
+    JsonFileStore,
+    STORE_CACHE,
+    add_row,
+    delete_row,
+    edit_row,
+    edit_rows,
+)
+
+
+def make_file(fpth: pathlib.Path, n_rows: int) -> pathlib.Path:
+    rows = [dict(id=i, string=f"s{i}", integer=i, floater=i / 3) for i in range(n_rows)]
+    fpth.write_text(json.dumps(rows, indent=4))
+    fpth.with_name(fpth.name + ".log").unlink(missing_ok=True)
+    return fpth
+
+
+def load_uncached(fpth: pathlib.Path) -> JsonFileStore:
+    STORE_CACHE.invalidate()
+    return JsonFileStore(fpth)
+
+
+def time_ms(fn, number: int) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):  # the functions print
+        return 1e3 * min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def main(sizes=(10_000, 100_000), n_edits=100):
+    row = dict(string="new", integer=0, floater=0.5)
+    edits = {i: {"integer": -i} for i in range(0, 10 * n_edits, 10)}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fpth = pathlib.Path(tmpdir) / "data.json"
+        for n in sizes:
+            make_file(fpth, n)
+            number = 3 if n <= 10_000 else 1
+            old = {
+                "add": functools.partial(add_row, row, fpth=fpth),
+                "edit": functools.partial(edit_row, row | {"id": n - 1}, fpth=fpth),
+                "delete": functools.partial(delete_row, {"id": n // 2}, fpth=fpth),
+                f"{n_edits} edits": functools.partial(edit_rows, edits, "id", fpth),
+            }
+            old = {k: time_ms(fn, number) for k, fn in old.items()}
+
+            make_file(fpth, n)
+            t_load = time_ms(functools.partial(load_uncached, fpth), 1)
+            store = JsonFileStore(fpth, compact_every=10**9)
+            new = {
+                "add": functools.partial(store.add, [row]),
+                "edit": functools.partial(store.edit, {n - 1: row}),
+                "delete": functools.partial(store.delete, [n // 2]),
+                f"{n_edits} edits": functools.partial(store.edit, edits),
+            }
+            new = {k: time_ms(fn, 100) for k, fn in new.items()}
+            t_compact = time_ms(store.compact, 1)
+
+            print(
+                f"rows: {n} | store load: {t_load:.1f} ms | compact: {t_compact:.1f} ms"
+            )
+            for k in old:
+                print(
+                    f"  {k:>10} | json file: {old[k]:8.1f} ms | store: {new[k]:6.3f} ms"
+                    f" | speedup: {old[k] / new[k]:8.0f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""benchmark `map_widget` dispatch: linear scan of the widgets_map vs the compiled
+dispatch index. run with: `python benchmarks/bench_map_widget.py`
+"""
+
+import copy
+import timeit
+
+from ipyautoui import demo_schemas
+from ipyautoui.automapschema import (
+    _init_model_schema,
+    get_widgets_map,
+    get_dispatch_key,
+    find_matches,
+    find_matches_linear,
+)
+
+
+def get_property_schemas():
+    li = []
+    for name in dir(demo_schemas):
+        if not name[0].isupper():
+            continue
+        _, schema = _init_model_schema(getattr(demo_schemas, name))
+        li += [copy.deepcopy(v) for v in schema.get("properties", {}).values()]
+    return li
+
+
+def main(number=20):
+    widgets_map = get_widgets_map()
+    properties = get_property_schemas()
+    n_dispatched = sum(get_dispatch_key(di) is not None for di in properties)
+
+    def run(fn):
+        for di in properties:
+            fn(di, widgets_map)
+
+    t_linear = min(timeit.repeat(lambda: run(find_matches_linear), number=number))
+    t_index = min(timeit.repeat(lambda: run(find_matches), number=number))
+    n = number * len(properties)
+    print(f"properties: {len(properties)} ({n_dispatched} dispatched by index)")
+    print(f"linear scan: {1e6 * t_linear / n:.1f} µs / property")
+    print(f"index:       {1e6 * t_index / n:.1f} µs / property")
+    print(f"speedup:     {t_linear / t_index:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
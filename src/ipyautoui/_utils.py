@@ -8,9 +8,14 @@ import logging
 import pathlib
 import getpass
 import inspect
+import hashlib
+import threading
+import collections
 import immutables
 import importlib
 import importlib.util
+import importlib.metadata
+import tempfile
 import pandas as pd
 import ipywidgets as w
 import typing as ty
@@ -310,7 +315,7 @@ def load_PyObj(obj: PyObj):
 
 
 # TODO: use obj_to_importstr and obj_from_importstr rather than load_PyObj
-def obj_to_importstr(obj: ty.Callable):  # NOT IN USE
+def obj_to_importstr(obj: ty.Callable):
     """
     given a callable callable object this will return the
     import string to. From the string the object can be
@@ -559,4 +564,182 @@ def pydantic_model_from_json_schema(json_schema: dict) -> ty.Type[BaseModel]:
         module = importlib.util.module_from_spec(spec)
         sys.modules[module_name] = module
         spec.loader.exec_module(module)
-    return getattr(module, title)
\ No newline at end of file
+    return getattr(module, title)
+
+
+class LruCache:
+    """a bounded least-recently-used cache with hit / miss counters.
+
+    Example:
+        >>> cache = LruCache(maxsize=2)
+        >>> cache.set("a", 1)
+        >>> cache.get("a")
+        1
+        >>> cache.info()
+        {'hits': 1, 'misses': 0, 'maxsize': 2, 'currsize': 1}
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """remove `key` from the cache. if key is None the whole cache is cleared."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def clear(self):
+        """clear the cache and reset the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=self.maxsize,
+            currsize=len(self._data),
+        )
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+def json_hash(obj, default: ty.Callable = str) -> ty.Optional[str]:
+    """canonical (key order independent) sha256 hash of a json serialisable object.
+    returns None if the object cannot be serialised (e.g. a recursive schema).
+    non-json objects (e.g. classes) are serialised using `default`.
+    """
+    try:
+        s = json.dumps(obj, sort_keys=True, default=default)
+    except (TypeError, ValueError, RecursionError):
+        return None
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+def get_ipyautoui_version() -> str:
+    try:
+        from ipyautoui._version import __version__
+
+        return __version__
+    except ImportError:
+        try:
+            return importlib.metadata.version("ipyautoui")
+        except importlib.metadata.PackageNotFoundError:
+            return "unknown"
+
+
+def write_text_atomic(fpth: pathlib.Path, text: str, encoding: str = "utf-8"):
+    """write to a temp file in the same dir and rename it. readers see either the
+    old or the new file, never a partly written one."""
+    fd, tmp = tempfile.mkstemp(dir=fpth.parent, prefix=f".{fpth.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+        os.replace(tmp, fpth)
+    except BaseException:
+        pathlib.Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class JsonFileCache:
+    """opt-in cache of json files that persists across kernel restarts. the cache is
+    enabled by setting the `IPYAUTOUI_CACHEDIR` env var. keys are hashed together with
+    the ipyautoui version such that entries are invalidated when either changes.
+    files are written atomically (temp file + rename).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def fdir(self) -> ty.Optional[pathlib.Path]:
+        from ipyautoui.env import Env
+
+        fdir = Env().IPYAUTOUI_CACHEDIR
+        return None if fdir is None else pathlib.Path(fdir) / self.name
+
+    @property
+    def enabled(self) -> bool:
+        return self.fdir is not None
+
+    def fpth(self, key: str) -> ty.Optional[pathlib.Path]:
+        fdir = self.fdir
+        if fdir is None:
+            return None
+        h = hashlib.sha256(f"{key}-{get_ipyautoui_version()}".encode("utf-8"))
+        return fdir / f"{h.hexdigest()}.json"
+
+    def get(self, key: str, object_hook: ty.Optional[ty.Callable] = None):
+        fpth = self.fpth(key)
+        if fpth is None:
+            return None
+        try:
+            value = json.loads(fpth.read_text(encoding="utf-8"), object_hook=object_hook)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as err:  # corrupt or stale entry. treated as a miss
+            logger.warning(f"failed to read cache file {fpth}: {err}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value, default: ty.Optional[ty.Callable] = None) -> bool:
+        """write value to the cache. returns False if not cached."""
+        fpth = self.fpth(key)
+        if fpth is None:
+            return False
+        try:
+            s = json.dumps(value, default=default)
+        except (TypeError, ValueError, RecursionError) as err:
+            logger.debug(f"not cached, value not json serialisable: {err}")
+            return False
+        fpth.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            write_text_atomic(fpth, s)
+        except OSError as err:
+            logger.warning(f"failed to write cache file {fpth}: {err}")
+            return False
+        return True
+
+    def clear(self):
+        """delete all cached files and reset the counters"""
+        fdir = self.fdir
+        if fdir is not None and fdir.is_dir():
+            for f in fdir.glob("*.json"):
+                f.unlink(missing_ok=True)
+        self.hits = 0
+        self.misses = 0
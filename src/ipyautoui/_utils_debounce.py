@@ -1,47 +1,180 @@
 # https://ipywidgets.readthedocs.io/en/latest/examples/Widget%20Events.html#Debouncing
-# NOTE: currently not in use
+"""coalesce bursts of UI change events (e.g. typing, pasting a row) into one call.
+
+calls are scheduled on the running asyncio loop (i.e. the kernel's loop). if there is
+no running loop (e.g. in a script or test) the call is made immediately.
+"""
 
 import asyncio
+import logging
+import functools
+import weakref
+import typing as ty
+import traitlets as tr
+
+logger = logging.getLogger(__name__)
+
+#: debouncers with a scheduled call. `Debounced.flush` does nothing if it is empty
+PENDING = weakref.WeakSet()
+
+
+class Debouncer:
+    """postpones calling `fn` until `wait` seconds have elapsed since the last call.
+    `fn` is called at most `max_latency` seconds after the first call of a burst.
+    only the arguments of the last call are used.
+
+    Example:
+        >>> d = Debouncer(print, wait=0.1)
+        >>> d("a")  # no running loop, so called immediately
+        a
+    """
 
-# from threading import Timer
-# ^ this can replace the Timer class below... not sure when / why this makes sense...
+    def __init__(
+        self,
+        fn: ty.Callable,
+        wait: float = 0.1,
+        max_latency: ty.Optional[float] = None,
+    ):
+        self.fn = fn
+        self.wait = wait
+        self.max_latency = max_latency
+        self.calls = 0
+        self.runs = 0
+        self._args = None
+        self._handle = None
+        self._first = None
 
+    @property
+    def pending(self) -> bool:
+        return self._args is not None
 
-class Timer:
-    def __init__(self, timeout, callback):
-        self._timeout = timeout
-        self._callback = callback
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        self._args = (args, kwargs)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None or not self.wait:
+            return self.flush()
 
-    async def _job(self):
-        await asyncio.sleep(self._timeout)
-        self._callback()
+        now = loop.time()
+        if self._first is None:
+            self._first = now
+        delay = self.wait
+        if self.max_latency is not None:
+            delay = max(0.0, min(delay, self._first + self.max_latency - now))
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = loop.call_later(delay, self._run)
+        PENDING.add(self)
 
-    def start(self):
-        self._task = asyncio.ensure_future(self._job())
+    def _run(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception(f"debounced call failed: {self.fn}")
+
+    def flush(self):
+        """call `fn` now if a call is pending"""
+        self.cancel()
+        if self._args is None:
+            return None
+        args, kwargs = self._args
+        self._args = None
+        PENDING.discard(self)
+        self.runs += 1
+        return self.fn(*args, **kwargs)
 
     def cancel(self):
-        self._task.cancel()
+        """cancel the scheduled call. the pending arguments are kept."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._first = None
 
 
-def debounce(wait):
+def debounce(wait: float, max_latency: ty.Optional[float] = None):
     """Decorator that will postpone a function's
     execution until after `wait` seconds
     have elapsed since the last time it was invoked."""
 
     def decorator(fn):
-        timer = None
+        debouncer = Debouncer(fn, wait=wait, max_latency=max_latency)
 
+        @functools.wraps(fn)
         def debounced(*args, **kwargs):
-            nonlocal timer
-
-            def call_it():
-                fn(*args, **kwargs)
-
-            if timer is not None:
-                timer.cancel()
-            timer = Timer(wait, call_it)
-            timer.start()
+            return debouncer(*args, **kwargs)
 
+        debounced.flush = debouncer.flush
         return debounced
 
     return decorator
+
+
+class Debounced(tr.HasTraits):
+    """mixin that gives each widget instance its own debouncers.
+
+    Attributes:
+        debounce_wait (float): seconds to wait for more events before calling.
+            0 calls immediately. Defaults to 0.05.
+        debounce_max_latency (float): max seconds between the first event and the
+            call. Defaults to 0.5.
+    """
+
+    debounce_wait = tr.Float(default_value=0.05)
+    debounce_max_latency = tr.Float(default_value=0.5, allow_none=True)
+
+    @property
+    def debouncers(self) -> dict:
+        return self.__dict__.setdefault("_debouncers", {})
+
+    def debounced(self, fn: ty.Callable) -> Debouncer:
+        """get the debouncer of a method. debouncers are keyed by method name."""
+        name = fn.__name__
+        if name not in self.debouncers:
+            self.debouncers[name] = Debouncer(
+                fn, wait=self.debounce_wait, max_latency=self.debounce_max_latency
+            )
+        return self.debouncers[name]
+
+    @tr.observe("debounce_wait", "debounce_max_latency")
+    def _observe_debounce(self, on_change):
+        for d in self.debouncers.values():
+            d.wait, d.max_latency = self.debounce_wait, self.debounce_max_latency
+
+    def flush(self):
+        """make any pending debounced calls now (e.g. before saving). nested debounced
+        widgets are flushed first, such that their changes reach this widget.
+        returns at once if no debouncer is pending (e.g. on every read of `value`)."""
+        if not PENDING:
+            return
+        for child in iter_debounced_children(self):
+            child.flush()
+            if not PENDING:
+                break
+        for d in list(self.debouncers.values()):
+            d.flush()
+
+
+def _get_children(widget) -> list:
+    children = list(getattr(widget, "children", None) or [])
+    di_widgets = getattr(widget, "di_widgets", None)
+    if isinstance(di_widgets, dict):
+        children += list(di_widgets.values())
+    return children
+
+
+def iter_debounced_children(widget) -> ty.Iterator[Debounced]:
+    """the outermost `Debounced` widgets nested in `widget` (i.e. not those nested in
+    another `Debounced` widget, as it flushes them)"""
+    seen, stack = {id(widget)}, _get_children(widget)
+    while stack:
+        child = stack.pop()
+        if id(child) in seen:
+            continue
+        seen.add(id(child))
+        if isinstance(child, Debounced):
+            yield child
+        else:
+            stack += _get_children(child)
@@ -1,13 +1,21 @@
 # +
 
 
+import copy
 import typing as ty
+import functools
 import ipywidgets as w
 from pydantic import BaseModel, Field
 from ipyautoui.nullable import nullable
 from jsonref import replace_refs
 from ipyautoui.constants import MAP_JSONSCHEMA_TO_IPYWIDGET
-from ipyautoui._utils import remove_non_present_kwargs, frozenmap, obj_from_importstr
+from ipyautoui._utils import (
+    remove_non_present_kwargs,
+    frozenmap,
+    obj_from_importstr,
+    LruCache,
+    json_hash,
+)
 from ipyautoui.custom.markdown_widget import MarkdownWidget
 from ipyautoui.custom.filechooser import FileChooser
 from ipyautoui.custom.date_string import DatePickerString, NaiveDatetimePickerString
@@ -17,15 +25,31 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def _init_model_schema(
-    schema=None, by_alias=False
-) -> tuple[ty.Optional[ty.Type[BaseModel]], dict]:
+#: cache of normalised (i.e. refs replaced) schemas.
+#: key: (model or `json_hash(schema)`, by_alias)
+SCHEMA_CACHE = LruCache(maxsize=128)
+
+
+def _schema_cache_key(schema, by_alias=False) -> ty.Optional[tuple]:
+    if isinstance(schema, dict):
+        h = json_hash(schema)
+        return None if h is None else (h, by_alias)
+    else:
+        return schema, by_alias
+
+
+def invalidate_schema_cache(schema=None):
+    """remove a model / schema from SCHEMA_CACHE. if schema is None the cache is cleared."""
     if schema is None:
-        return None, {
-            "format": "dataframe",
-            "type": "array",
-            "items": {"properties": {}},
-        }
+        SCHEMA_CACHE.invalidate()
+        return
+    for by_alias in (False, True):
+        key = _schema_cache_key(schema, by_alias=by_alias)
+        if key is not None:
+            SCHEMA_CACHE.invalidate(key)
+
+
+def _normalise_schema(schema, by_alias=False) -> tuple[ty.Optional[ty.Type[BaseModel]], dict]:
     if isinstance(schema, dict):
         model = None
         schema = replace_refs(schema, merge_props=True)
@@ -35,10 +59,33 @@ def _init_model_schema(
         schema = model.model_json_schema(by_alias=by_alias).copy()
         schema = replace_refs(schema, merge_props=True)
         schema = {k: v for k, v in schema.items() if k != "$defs"}
-        
     return model, schema
 
 
+def _init_model_schema(
+    schema=None, by_alias=False
+) -> tuple[ty.Optional[ty.Type[BaseModel]], dict]:
+    """get the pydantic model (if given) and normalised json schema (refs replaced).
+    normalised schemas are cached in SCHEMA_CACHE. a copy is always returned such
+    that the cached schema cannot be mutated.
+    """
+    if schema is None:
+        return None, {
+            "format": "dataframe",
+            "type": "array",
+            "items": {"properties": {}},
+        }
+    key = _schema_cache_key(schema, by_alias=by_alias)
+    if key is None:  # cannot be hashed
+        return _normalise_schema(schema, by_alias=by_alias)
+    cached = SCHEMA_CACHE.get(key)
+    if cached is None:
+        cached = copy.deepcopy(_normalise_schema(schema, by_alias=by_alias)[1])
+        SCHEMA_CACHE.set(key, cached)
+    model = None if isinstance(schema, dict) else schema
+    return model, copy.deepcopy(cached)
+
+
 def is_allowed_type(di: dict) -> bool:
     #  https://json-schema.org/understanding-json-schema/reference/combining.html
     if "anyOf" in di:
@@ -1218,6 +1265,185 @@ def get_autooveride(schema):
     return cl
 
 
+class DispatchRule(ty.NamedTuple):
+    """necessary (not sufficient) conditions for a `fn_filt` to return True.
+    used to skip filters that cannot match a given property.
+
+    Attributes:
+        types: json types the filter can match. None == any type.
+        fn_format: filter on the "format" of string types. None == any format.
+        requires: at least one of these keys must be present. None == no requirement.
+    """
+
+    types: ty.Optional[frozenset] = None
+    fn_format: ty.Optional[ty.Callable[[str], bool]] = None
+    requires: ty.Optional[tuple] = None
+
+
+_STRING = frozenset(["string"])
+_ARRAY = frozenset(["array"])
+
+#: dispatch rules for the builtin filters. filters not in here (i.e. custom
+#: filters added with `di_update`) are always evaluated.
+DISPATCH_RULES = {
+    is_AutoOveride: DispatchRule(requires=("autoui",)),
+    is_IntText: DispatchRule(types=frozenset(["integer"])),
+    is_IntSlider: DispatchRule(types=frozenset(["integer"])),
+    is_FloatText: DispatchRule(types=frozenset(["number"])),
+    is_FloatSlider: DispatchRule(types=frozenset(["number"])),
+    is_IntRangeSlider: DispatchRule(types=_ARRAY),
+    is_FloatRangeSlider: DispatchRule(types=_ARRAY),
+    is_Text: DispatchRule(types=_STRING),
+    is_Textarea: DispatchRule(types=_STRING),
+    is_Markdown: DispatchRule(types=_STRING, fn_format=lambda f: f == "markdown"),
+    is_Dropdown: DispatchRule(requires=("enum",)),
+    is_Combobox: DispatchRule(requires=("examples", "anyOf")),
+    is_SelectMultiple: DispatchRule(types=_ARRAY),
+    is_TagsInput: DispatchRule(types=_ARRAY),
+    is_Color: DispatchRule(types=_STRING, fn_format=lambda f: "color" in f),
+    is_Path: DispatchRule(types=_STRING, fn_format=lambda f: f == "path"),
+    is_Checkbox: DispatchRule(types=frozenset(["boolean"])),
+    is_Date: DispatchRule(types=_STRING, fn_format=lambda f: f == "date"),
+    is_Datetime: DispatchRule(types=_STRING, fn_format=lambda f: f == "date-time"),
+    is_AnyOf: DispatchRule(requires=("anyOf",)),
+    is_Object: DispatchRule(types=frozenset(["object"])),
+    is_DataFrame: DispatchRule(types=_ARRAY),
+    is_Array: DispatchRule(types=_ARRAY),
+}
+_DISPATCH_FLAGS = ("autoui", "enum", "examples", "anyOf")
+
+
+def get_dispatch_key(di: dict) -> ty.Optional[tuple]:
+    """get the key used to lookup candidate filters for a property.
+    returns None if the property cannot be safely dispatched, in which
+    case all filters must be evaluated (i.e. a linear scan).
+
+    The key is: (type, format, flags). For `Optional[X]` (i.e. `anyOf: [X, null]`)
+    the type and format are those of X, as this is what the filters evaluate.
+    """
+    if "type" in di:
+        probe = di
+    elif "anyOf" in di:
+        if not all(isinstance(l, dict) for l in di["anyOf"]):
+            return None
+        non_null = [l for l in di["anyOf"] if l.get("type") != "null"]
+        is_nullable = len(non_null) != len(di["anyOf"])
+        if not is_nullable:
+            # only anyOf widgets (AnyOf, Combobox) can match
+            probe = {k: v for k, v in di.items() if k in _DISPATCH_FLAGS}
+            probe["type"] = None
+        elif len(non_null) == 1:
+            probe = {**{k: v for k, v in di.items() if k != "anyOf"}, **non_null[0]}
+            if "type" not in probe:
+                return None
+        else:
+            # `is_Nullable` mutates the schema in this case, so the outcome
+            # depends on the evaluation order of all filters.
+            return None
+    else:
+        return None  # allOf, oneOf, not or unknown
+
+    t, fmt = probe["type"], probe.get("format")
+    if t is not None and not isinstance(t, str):
+        return None
+    if fmt is not None and not isinstance(fmt, str):
+        return None
+    flags = frozenset(k for k in _DISPATCH_FLAGS if k in probe or k in di)
+    return t, fmt, flags
+
+
+def _is_candidate(rule: ty.Optional[DispatchRule], key: tuple) -> bool:
+    if rule is None:
+        return True
+    t, fmt, flags = key
+    if rule.types is not None and t not in rule.types:
+        return False
+    if rule.fn_format is not None and (fmt is None or not rule.fn_format(fmt)):
+        return False
+    if rule.requires is not None and not any(k in flags for k in rule.requires):
+        return False
+    return True
+
+
+class WidgetMapIndex:
+    """compiled dispatch index of a widgets_map. WidgetMappers are bucketed by
+    the dispatch key of the property (type, format, enum / examples / autoui / anyOf
+    presence) such that only the filters that could possibly match are evaluated.
+    the order of evaluation is the same as the widgets_map such that the result is
+    identical to a linear scan.
+    """
+
+    def __init__(self, names: tuple[str], rules: tuple[ty.Optional[DispatchRule]]):
+        self.names = names
+        self.rules = rules
+        self.buckets = {}
+
+    def candidates(self, key: tuple) -> tuple[str]:
+        try:
+            return self.buckets[key]
+        except KeyError:
+            c = tuple(n for n, r in zip(self.names, self.rules) if _is_candidate(r, key))
+            self.buckets[key] = c
+            return c
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_widgets_map(fingerprint: tuple) -> WidgetMapIndex:
+    names = tuple(n for n, _ in fingerprint)
+    rules = tuple(DISPATCH_RULES.get(fn) for _, fn in fingerprint)
+    return WidgetMapIndex(names, rules)
+
+
+#: id(widgets_map): (widgets_map, index). the map is kept such that its id isn't reused
+_WIDGETS_MAP_INDEXES = {}
+
+
+def compile_widgets_map(widgets_map: frozenmap) -> WidgetMapIndex:
+    """get the (cached) dispatch index of a widgets_map. a widgets_map is immutable,
+    so it is looked up by identity. equal maps share an index."""
+    cached = _WIDGETS_MAP_INDEXES.get(id(widgets_map))
+    if cached is not None and cached[0] is widgets_map:
+        return cached[1]
+    fingerprint = tuple((k, v.fn_filt) for k, v in widgets_map.items())
+    index = _compile_widgets_map(fingerprint)
+    if len(_WIDGETS_MAP_INDEXES) >= 64:
+        _WIDGETS_MAP_INDEXES.pop(next(iter(_WIDGETS_MAP_INDEXES)))
+    _WIDGETS_MAP_INDEXES[id(widgets_map)] = (widgets_map, index)
+    return index
+
+
+def widgets_map_fingerprint(widgets_map: frozenmap) -> tuple:
+    """hashable summary of a widgets_map. equal if the maps give the same widgets."""
+    return tuple(
+        (k, v.fn_filt, v.widget, tuple(v.li_fn_modify)) for k, v in widgets_map.items()
+    )
+
+
+def find_matches_linear(di: dict, widgets_map: frozenmap) -> list[tuple[str, bool]]:
+    """evaluate every filter in the widgets_map (in order) and return the matches"""
+    mapped = []
+    for widget_name, v in widgets_map.items():
+        check, allow_none = v.fn_filt(di)
+        if check:
+            mapped.append((widget_name, allow_none))
+    return mapped
+
+
+def find_matches(di: dict, widgets_map: frozenmap) -> list[tuple[str, bool]]:
+    """evaluate only the filters in the widgets_map that could match `di`
+    (see `WidgetMapIndex`) and return the matches. Identical to `find_matches_linear`.
+    """
+    key = get_dispatch_key(di)
+    if key is None:
+        return find_matches_linear(di, widgets_map)
+    mapped = []
+    for widget_name in compile_widgets_map(widgets_map).candidates(key):
+        check, allow_none = widgets_map[widget_name].fn_filt(di)
+        if check:
+            mapped.append((widget_name, allow_none))
+    return mapped
+
+
 def map_widget(
     di: dict, widgets_map: frozenmap = None, fail_on_error: bool = False
 ) -> WidgetCaller:
@@ -1238,19 +1464,26 @@ def map_widget(
     if widgets_map is None:
         widgets_map = get_widgets_map()
 
+    # search widgets_map to find a correct mapping...
+    mapped = find_matches(di, widgets_map)
+    return make_widget_caller(di, mapped, widgets_map, fail_on_error=fail_on_error)
+
+
+def make_widget_caller(
+    di: dict,
+    mapped: list[tuple[str, bool]],
+    widgets_map: frozenmap,
+    fail_on_error: bool = False,
+) -> WidgetCaller:
+    """make the WidgetCaller from the matches found in the widgets_map
+    (i.e. from the output of `find_matches`)"""
+
     def get_widget(di, k, widgets_map):
         if k == "AutoOveride":
             return get_autooveride(di)
         else:
             return widgets_map[k].widget
 
-    mapped = []
-    # loop through widgets_map to find a correct mapping...
-    for widget_name, v in widgets_map.items():
-        check, allow_none = v.fn_filt(di)
-        if check:
-            mapped.append((widget_name, allow_none))
-
     if len(mapped) == 0:
         if fail_on_error:
             raise ValueError(f"widget map not found for: {di}")
@@ -1310,7 +1543,7 @@ def from_schema_method(
 
 
 def from_model_method(cls, model: ty.Type[BaseModel], value: ty.Optional[dict] = None):
-    schema = replace_refs(model.model_json_schema(), merge_props=True)
+    _, schema = _init_model_schema(model)
     if value is not None:
         schema["value"] = value
     ui = cls(**schema)
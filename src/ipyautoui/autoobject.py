@@ -1,5 +1,7 @@
 # +
+import copy
 import logging
+import functools
 import pathlib
 import ipywidgets as w
 import traitlets as tr
@@ -12,7 +14,7 @@ from ipyautoui._utils import obj_from_importstr, is_null, trait_order
 from ipyautoui.nullable import Nullable
 from ipyautoui.autobox import AutoBox
 from ipyautoui.autoform import AutoObjectFormLayout
-from ipyautoui.watch_validate import WatchValidate, pydantic_validate
+from ipyautoui.watch_validate import WatchValidate, pydantic_validate, set_widget_value
 from ipyautoui.custom.title_description import TitleDescription
 
 logger = logging.getLogger(__name__)
@@ -42,6 +44,54 @@ def _get_value_trait(obj_with_traits):
         )
 
 
+UNRESOLVED = object()
+
+
+def get_schema_default(schema: dict):
+    """get the default value of a schema without building the widget. objects are
+    resolved from the defaults of their properties. returns `UNRESOLVED` if the
+    default is only known by the widget (e.g. no default or a null default).
+    """
+    if schema.get("default") is not None:
+        return copy.deepcopy(schema["default"])
+    properties = schema.get("properties")
+    if schema.get("type") == "object" and isinstance(properties, dict):
+        value = {}
+        for k, v in properties.items():
+            value[k] = get_schema_default(v)
+            if value[k] is UNRESOLVED:
+                return UNRESOLVED
+        return value
+    return UNRESOLVED
+
+
+class LazyWidget(w.VBox):
+    """lightweight placeholder for a nested widget. holds the value and builds the
+    real widget from the `caller` when requested."""
+
+    caller = tr.Instance(klass=aumap.WidgetCaller)
+    value = tr.Any()
+
+    def build(self):
+        widget = aumap.widgetcaller(self.caller)
+        v = self.value
+        if is_null(v) and not isinstance(widget, Nullable):
+            return widget
+        try:
+            widget.value = v
+        except tr.TraitError as err:
+            logging.warning(err)
+        return widget
+
+
+def _accepts_trait(widget, name: str) -> bool:
+    return (
+        isinstance(widget, type)
+        and issubclass(widget, tr.HasTraits)
+        and name in widget.class_traits()
+    )
+
+
 class AutoObject(w.VBox, WatchValidate):
     """creates an ipywidgets form from a json-schema or pydantic model.
     datatype must be "object"
@@ -73,6 +123,9 @@ class AutoObject(w.VBox, WatchValidate):
             is ignored by the widget otherwise.
         disabled (bool, optional): disables all widgets. If widgets are disabled
             using schema kwargs this is remembered when re-enabled. Defaults to False.
+        lazy (bool, optional): collapsed nested widgets are held as a `LazyWidget`
+            placeholder and only built when expanded (or with `build_lazy`). passed
+            on to nested AutoObjects. Defaults to False.
 
     """
     # model - pydantic model from WatchValidate
@@ -82,6 +135,10 @@ class AutoObject(w.VBox, WatchValidate):
     widgets_map = tr.Dict()
     type = tr.Unicode(default_value="object")
     allOf = tr.List(allow_none=True, default_value=None)
+    blueprint = tr.Instance(
+        klass="ipyautoui.blueprint.UiBlueprint", default_value=None, allow_none=True
+    )  # NOTE: must be set before properties
+    lazy = tr.Bool(default_value=False)  # NOTE: must be set before properties
     properties = tr.Dict()
     _value = tr.Dict(
         allow_none=True
@@ -97,7 +154,7 @@ class AutoObject(w.VBox, WatchValidate):
     # show_raw = tr.Bool(default_value=False)  # TODO: match logic for show_null
 
     def update_model(self, model):
-        self.update_schema(model.model_json_schema())
+        self.update_schema(aumap._init_model_schema(model)[1])
         self.model = model
         try:
             self.value = pydantic_validate(self.model, self.value)
@@ -109,6 +166,7 @@ class AutoObject(w.VBox, WatchValidate):
 
     def update_schema(self, schema):
         schema = replace_refs(schema, merge_props=True)
+        self.blueprint = None  # the schema has changed
         self.properties = schema["properties"]
         updates = {k: v for k, v in schema.items() if k in self.traits() and k != "properties" and k != "value"}
         {setattr(self, k, v) for k, v in updates.items()}
@@ -163,6 +221,9 @@ class AutoObject(w.VBox, WatchValidate):
                 self.properties = on_change["old"]
                 raise ValueError("widgets must match on schema change. changes intended for modifications of existing widgets only.")
             for k, v in di_callers.items():
+                if isinstance(self.di_widgets[k], LazyWidget):
+                    self.di_widgets[k].caller = v
+                    continue
                 {setattr(self.di_widgets[k], _k, _v) for _k, _v in v.kwargs.items() if _k != "value"}
                 {setattr(self.di_boxes[k], _k, _v) for _k, _v in v.kwargs_box.items() if _k != "value"}
             self.di_callers = di_callers
@@ -170,18 +231,37 @@ class AutoObject(w.VBox, WatchValidate):
             self.di_callers = self._get_di_callers(self.properties)
             self._init_ui()
 
+    def _blueprint_matches(self, properties) -> bool:
+        bp = self.blueprint
+        return (
+            bp is not None
+            and bp.properties is not None
+            and bp.properties.keys() == properties.keys()
+            and bp.properties_fingerprint
+            == aumap.widgets_map_fingerprint(self.widgets_map)
+        )
+
     def _get_di_callers(self, properties):
-        di_callers = {
-            pkey: aumap.map_widget(
-                pschema, widgets_map=self.widgets_map
-            )
-            for pkey, pschema in properties.items()
-        }
+        if self._blueprint_matches(properties):
+            # the mapping has already been done.
+            di_callers = {
+                pkey: self.blueprint.properties[pkey].get_caller()
+                for pkey in properties.keys()
+            }
+        else:
+            di_callers = {
+                pkey: aumap.map_widget(
+                    pschema, widgets_map=self.widgets_map
+                )
+                for pkey, pschema in properties.items()
+            }
         for v in di_callers.values():
             if v.autoui in self.nested_widgets:
                 v.kwargs = v.kwargs | {"show_title": False, "show_description": False}
                 # NOTE: ^ this avoids nested widgets having title and description both in AutoBox and in themselves
                 v.kwargs_box = v.kwargs_box | {"nested": True}
+            if self.lazy and _accepts_trait(v.autoui, "lazy"):
+                v.kwargs = v.kwargs | {"lazy": True}
         return di_callers
 
     @tr.observe("align_horizontal")
@@ -218,12 +298,16 @@ class AutoObject(w.VBox, WatchValidate):
     def observe_disabled(self, on_change):
         if self.disabled:
             for k, v in self.di_widgets.items():
+                if isinstance(v, LazyWidget):
+                    continue  # disabled when built
                 try:
                     v.disabled = True
                 except:
                     logger.warning(f"{k}: widget does not have a `disabled` traitlet")
         else:
             for k, v in self.di_widgets.items():
+                if isinstance(v, LazyWidget):
+                    continue
                 if (
                     "disabled" in self.properties[k].keys()
                     and self.properties[k]["disabled"]
@@ -309,9 +393,9 @@ class AutoObject(w.VBox, WatchValidate):
 
     def get_ordered_kwargs(self, kwargs):
         in_order = list(kwargs.keys())
-        tr_order = trait_order(type(self))
-        if isinstance(self, AutoObjectForm): # HACK: traits not found in inherited class...
-            tr_order = trait_order(AutoObject)
+        tr_order = trait_order(AutoObject)
+        # NOTE: ^ trait_order only finds traits defined on the class itself (not inherited)
+        #         so the AutoObject order is used for subclasses (e.g. AutoObjectForm, AutoUi)
 
         out_order = tr_order + [i for i in in_order if i not in tr_order]
         return {o: kwargs[o] for o in out_order if o in in_order}
@@ -378,17 +462,64 @@ class AutoObject(w.VBox, WatchValidate):
         self._init_widgets()
         self._init_controls()
 
+    def _init_widget(self, caller):
+        if self.lazy and caller.kwargs_box.get("nested") and not self.open_nested:
+            value = get_schema_default(caller.schema_)
+            if value is not UNRESOLVED:
+                return LazyWidget(caller=caller, value=value)
+        return aumap.widgetcaller(caller)
+
     def _init_widgets(self):
-        self.di_widgets = {k: aumap.widgetcaller(v) for k, v in self.di_callers.items()}
+        self.di_widgets = {k: self._init_widget(v) for k, v in self.di_callers.items()}
         self.di_boxes = {
             k: AutoBox(
                 **(self.di_callers[k].kwargs_box | {"widget": self.di_widgets[k]})
             )
             for k in self.di_callers.keys()
         }
+        for k, v in self.di_widgets.items():
+            if isinstance(v, LazyWidget):
+                self.di_boxes[k].tgl.observe(functools.partial(self._expand, k), "value")
         self.vbx_widget.children = list(self.di_boxes.values())
         self.indent_widgets()
 
+    def _expand(self, key, on_change):
+        if on_change["new"]:
+            self.build_lazy(key)
+
+    @property
+    def lazy_keys(self) -> list:
+        """keys of nested widgets that are not yet built"""
+        return [k for k, v in self.di_widgets.items() if isinstance(v, LazyWidget)]
+
+    def build_lazy(self, key=None):
+        """build the real widget of a LazyWidget placeholder. if key is None all
+        placeholders are built. returns the widget (or None)."""
+        if key is None:
+            for k in self.lazy_keys:
+                self.build_lazy(k)
+            return None
+        lazy = self.di_widgets[key]
+        if not isinstance(lazy, LazyWidget):
+            return lazy
+        widget = lazy.build()
+        if self.disabled:
+            try:
+                widget.disabled = True
+            except (tr.TraitError, AttributeError, ValueError):
+                logger.warning(f"{key}: widget does not have a `disabled` traitlet")
+        self.di_widgets[key] = widget
+        box = self.di_boxes[key]
+        box.widget = widget
+        box._tgl("")
+        for watch in ["_value", "value"]:
+            if widget.has_trait(watch):
+                self.set_watcher(key, widget, watch)
+                break
+        if not self._silent:
+            self._watch_validate_update_value()  # e.g. a null value replaced by the widget
+        return widget
+
     def indent_widgets(self):
         """Indent the widgets appropriately based on the schema.
         Any widget that is not nullable and has a type of "array" will be indented."""
@@ -417,21 +548,30 @@ class AutoObject(w.VBox, WatchValidate):
 
     def _init_watch_widgets(self):
         for k, v in self.di_widgets.items():
+            if isinstance(v, LazyWidget):
+                continue  # watched when built
             for watch in ["_value", "value"]:
                 if v.has_trait(watch):
                     self.set_watcher(k, v, watch)
                     break  # if `_value` is found don't look for `value`
 
+    def _set_widget_value(self, k, v):
+        if is_null(v) and not isinstance(self.di_widgets[k], Nullable):
+            v = _get_value_trait(self.di_widgets[k]).default()
+        try:
+            set_widget_value(self.di_widgets[k], v)
+        except tr.TraitError as err:
+            logging.warning(err)
+
+    def _update_widget_from_value(self, key):
+        if key in self.di_widgets.keys():
+            self._set_widget_value(key, self.value[key])
+
     def _update_widgets_from_value(self):
         with self.silence_autoui_traits():
             for k, v in self.value.items():
                 if k in self.di_widgets.keys():
-                    if is_null(v) and not isinstance(self.di_widgets[k], Nullable):
-                        v = _get_value_trait(self.di_widgets[k]).default()
-                    try:
-                        self.di_widgets[k].value = v
-                    except tr.TraitError as err:
-                        logging.warning(err)
+                    self._set_widget_value(k, v)
                 else:
                     logging.critical(
                         f"no widget created for {k}, with value {str(v)}. fix this in the schema!"
@@ -450,6 +590,8 @@ class AutoObject(w.VBox, WatchValidate):
         for v in self.di_widgets.values():
             if isinstance(v, Nullable):
                 return True
+            if isinstance(v, LazyWidget) and v.caller.allow_none:
+                return True
         return False
 
 
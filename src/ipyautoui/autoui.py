@@ -31,12 +31,8 @@ from ipyautoui.autoform import (
     ShowNull,
 )
 from ipyautoui.custom.editgrid import EditGrid
-from ipyautoui.automapschema import (
-    get_widgets_map,
-    get_containers_map,
-    map_widget,
-    _init_model_schema,
-)
+from ipyautoui.automapschema import _init_model_schema
+from ipyautoui.blueprint import get_blueprint, accepts_blueprint
 
 logger = logging.getLogger(__name__)
 
@@ -197,53 +193,54 @@ class AutoRenderMethods:  # NOT IN USE
         return {ext: AutoRenderer}
 
 
-def get_autoui(schema: ty.Union[ty.Type[BaseModel], dict], **kwargs):
-    model, schema = _init_model_schema(schema)
-    schema = {**schema, **kwargs}
-    try:
-        # assumes the root object is a container so reduces the search space
-        caller = map_widget(
-            schema, widgets_map=get_containers_map(), fail_on_error=True
-        )
-        is_container = True
-        if issubclass(caller.autoui, EditGrid):
-            li = [caller.autoui, TitleDescription, ShowRaw, AutoUiFileMethods]
+@functools.lru_cache(maxsize=None)
+def get_autoui_class(widget: ty.Type[w.Widget]) -> ty.Type[w.Widget]:
+    """get the (cached) AutoUi class that extends the root container widget"""
+    if issubclass(widget, EditGrid):
+        li = [widget, TitleDescription, ShowRaw, AutoUiFileMethods]
 
-            class AutoUi(*li):
-                pass
+        class AutoUi(*li):
+            pass
 
-        else:
+    else:
 
-            class AutoUi(
-                caller.autoui,
-                ShowRaw,
-                ShowNull,
-                TitleDescription,
-                WrapSaveButtonBar,
-                AutoUiFileMethods,
-            ):
-                def _set_children(self):
-                    self.children = [
-                        self.savebuttonbar,
-                        w.HBox([self.bn_showraw, self.bn_shownull, self.html_title]),
-                        self.html_description,
-                        self.vbx_error,
-                        self.vbx_widget,
-                        self.vbx_showraw,
-                    ]
-                    self.show_hide_bn_nullable()
+        class AutoUi(
+            widget,
+            ShowRaw,
+            ShowNull,
+            TitleDescription,
+            WrapSaveButtonBar,
+            AutoUiFileMethods,
+        ):
+            def _set_children(self):
+                self.children = [
+                    self.savebuttonbar,
+                    w.HBox([self.bn_showraw, self.bn_shownull, self.html_title]),
+                    self.html_description,
+                    self.vbx_error,
+                    self.vbx_widget,
+                    self.vbx_showraw,
+                ]
+                self.show_hide_bn_nullable()
+
+    return AutoUi
 
+
+def get_autoui(schema: ty.Union[ty.Type[BaseModel], dict], **kwargs):
+    model, schema = _init_model_schema(schema)
+    schema = {**schema, **kwargs}
+    # maps the schema once. the blueprint is passed to the ui such that
+    # the mapping is not repeated on instantiation.
+    bp = get_blueprint(schema)
+    if bp.is_container:
+        AutoUi = get_autoui_class(bp.caller.autoui)
+        kw = {"blueprint": bp} if accepts_blueprint(AutoUi) else {}
         if model is not None:
-            return wrapped_partial(
-                AutoUi.from_pydantic_model, model
-            )  # TODO: this is inefficient as the top-level mapping is called twice.
+            return wrapped_partial(AutoUi.from_pydantic_model, model, **kw)
         else:
-            return wrapped_partial(AutoUi.from_jsonschema, schema)
-
-    except:
-        # increases the search spaces to include all widgets
-        caller = map_widget(schema, widgets_map=get_widgets_map())
-        is_container = False
+            return wrapped_partial(AutoUi.from_jsonschema, schema, **kw)
+    else:
+        caller = bp.get_caller()
         return wrapped_partial(
             AutoBox.wrapped_widget,
             caller.autoui,
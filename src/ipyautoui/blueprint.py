@@ -0,0 +1,268 @@
+"""compiled, immutable "blueprints" of a user interface.
+
+A blueprint is a tree of `WidgetCaller`s (and container metadata) that is mapped
+from a json schema once and then instantiated into widgets many times. This avoids
+calling `map_widget` for every property each time a form is created.
+
+Example:
+
+    from ipyautoui.blueprint import get_blueprint
+    from ipyautoui.automapschema import _init_model_schema
+    from ipyautoui.demo_schemas import CoreIpywidgets
+
+    _, schema = _init_model_schema(CoreIpywidgets)
+    bp = get_blueprint(schema)
+    ui = bp.widget()  # maps nothing. the blueprint is passed to nested containers
+
+If the `IPYAUTOUI_CACHEDIR` env var is set, blueprints are also cached to disk
+(see `BLUEPRINT_DISK_CACHE`) such that they are reused across kernel restarts.
+"""
+
+import copy
+import logging
+import types
+import typing as ty
+import traitlets as tr
+from pydantic import BaseModel, ConfigDict, Field
+
+import ipyautoui.automapschema as aumap
+from ipyautoui._utils import (
+    LruCache,
+    JsonFileCache,
+    json_hash,
+    obj_to_importstr,
+    obj_from_importstr,
+)
+
+logger = logging.getLogger(__name__)
+
+#: cache of compiled blueprints. key: `json_hash(schema)`
+BLUEPRINT_CACHE = LruCache(maxsize=128)
+#: opt-in on-disk cache of blueprints. enabled by the `IPYAUTOUI_CACHEDIR` env var
+BLUEPRINT_DISK_CACHE = JsonFileCache("blueprints")
+IMPORTSTR = "__importstr__"
+
+
+def accepts_blueprint(widget: ty.Callable) -> bool:
+    """check if a widget class has a `blueprint` trait"""
+    return (
+        isinstance(widget, type)
+        and issubclass(widget, tr.HasTraits)
+        and "blueprint" in widget.class_traits()
+    )
+
+
+class UiBlueprint(BaseModel):
+    """immutable tree of WidgetCallers. `properties` (objects) and `items` (arrays)
+    hold the blueprints of the children of containers.
+    """
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    caller: aumap.WidgetCaller
+    mapped: tuple[tuple[str, bool], ...] = ()
+    is_container: bool = True
+    properties: ty.Optional[dict[str, "UiBlueprint"]] = None
+    properties_fingerprint: tuple = ()
+    items: ty.Optional["UiBlueprint"] = None
+    widgets_map: ty.Any = Field(default=None, exclude=True, repr=False)
+
+    @property
+    def has_children(self) -> bool:
+        return self.properties is not None or self.items is not None
+
+    def get_caller(self, **kwargs) -> aumap.WidgetCaller:
+        """get a copy of the WidgetCaller. if kwargs are given they are merged with the
+        schema (as `get_widget` does) and the caller remade from the stored mapping.
+        """
+        if kwargs:
+            di = copy.deepcopy(self.caller.schema_) | kwargs
+            caller = aumap.make_widget_caller(di, list(self.mapped), self.widgets_map)
+        else:
+            caller = self.caller.model_copy(deep=True)
+        if self.has_children and accepts_blueprint(caller.autoui):
+            caller.kwargs = caller.kwargs | {"blueprint": self}
+        return caller
+
+    def widget(self, **kwargs):
+        """instantiate the widget"""
+        return aumap.widgetcaller(self.get_caller(**kwargs))
+
+
+def _is_subclass(obj, cls) -> bool:
+    return isinstance(obj, type) and issubclass(obj, cls)
+
+
+def _compile(
+    di: dict,
+    widgets_map: aumap.frozenmap,
+    fail_on_error: bool = False,
+    is_container: bool = True,
+    _path: tuple = (),
+) -> UiBlueprint:
+    from ipyautoui.autoobject import AutoObject
+    from ipyautoui.custom.iterable import AutoArray
+
+    mapped = aumap.find_matches(di, widgets_map)
+    caller = aumap.make_widget_caller(
+        di, mapped, widgets_map, fail_on_error=fail_on_error
+    )
+    kw, properties, properties_fingerprint, items = caller.kwargs, None, (), None
+
+    # NOTE: recursive schemas are only compiled to the point of recursion.
+    #       beyond that the widgets map their children as normal.
+    if _is_subclass(caller.autoui, AutoObject):
+        pr = kw.get("properties")
+        if isinstance(pr, dict) and id(pr) not in _path:
+            wm = aumap.get_widgets_map(kw.get("update_map_widgets"))
+            properties = {
+                k: _compile(v, wm, _path=_path + (id(pr),)) for k, v in pr.items()
+            }
+            properties_fingerprint = aumap.widgets_map_fingerprint(wm)
+    elif _is_subclass(caller.autoui, AutoArray):
+        it = kw.get("items")
+        if isinstance(it, dict) and id(it) not in _path:
+            items = _compile(it, aumap.get_widgets_map(), _path=_path + (id(it),))
+
+    return UiBlueprint(
+        caller=caller,
+        mapped=tuple(mapped),
+        is_container=is_container,
+        properties=properties,
+        properties_fingerprint=properties_fingerprint,
+        items=items,
+        widgets_map=widgets_map,
+    )
+
+
+def compile_blueprint(schema: dict) -> UiBlueprint:
+    """map a (normalised) json schema to a UiBlueprint. the root is assumed to be a
+    container (object, array or dataframe). if it is not, all widgets are searched.
+    """
+    containers_map = aumap.get_containers_map()
+    try:
+        aumap.map_widget(
+            copy.deepcopy(schema), widgets_map=containers_map, fail_on_error=True
+        )
+    except ValueError:
+        return _compile(
+            copy.deepcopy(schema), aumap.get_widgets_map(), is_container=False
+        )
+    return _compile(copy.deepcopy(schema), containers_map, fail_on_error=True)
+
+
+def _encode_importstr(obj) -> dict:
+    """json `default`. classes and functions are stored as import strings"""
+    if isinstance(obj, (type, types.FunctionType)):
+        s = obj_to_importstr(obj)
+        try:
+            is_importable = obj_from_importstr(s) is obj
+        except Exception:
+            is_importable = False
+        if is_importable:
+            return {IMPORTSTR: s}
+    raise TypeError(f"{obj} cannot be serialised as an import string")
+
+
+def _decode_importstr(di: dict):
+    """json `object_hook`. inverse of `_encode_importstr`"""
+    if len(di) == 1 and IMPORTSTR in di:
+        return obj_from_importstr(di[IMPORTSTR])
+    return di
+
+
+def blueprint_to_json(bp: UiBlueprint) -> ty.Optional[dict]:
+    """serialise a blueprint. returns None if it was compiled with a custom
+    widgets_map (these cannot be restored from file)"""
+    fingerprints = (
+        aumap.widgets_map_fingerprint(aumap.get_widgets_map()),
+        aumap.widgets_map_fingerprint(aumap.get_containers_map()),
+    )
+
+    def to_json(bp, widgets_map_fingerprint):
+        if aumap.widgets_map_fingerprint(bp.widgets_map) != widgets_map_fingerprint:
+            raise ValueError("custom widgets_map")
+        if bp.properties is not None and bp.properties_fingerprint != fingerprints[0]:
+            raise ValueError("custom widgets_map")
+        return dict(
+            caller=bp.caller.model_dump(),
+            mapped=[list(x) for x in bp.mapped],
+            is_container=bp.is_container,
+            properties=(
+                None
+                if bp.properties is None
+                else {k: to_json(v, fingerprints[0]) for k, v in bp.properties.items()}
+            ),
+            items=None if bp.items is None else to_json(bp.items, fingerprints[0]),
+        )
+
+    try:
+        return to_json(bp, fingerprints[1] if bp.is_container else fingerprints[0])
+    except ValueError as err:
+        logger.debug(f"blueprint not serialised: {err}")
+        return None
+
+
+def blueprint_from_json(di: dict, widgets_map=None) -> UiBlueprint:
+    """inverse of `blueprint_to_json`. classes must already be decoded."""
+    if widgets_map is None:
+        if di["is_container"]:
+            widgets_map = aumap.get_containers_map()
+        else:
+            widgets_map = aumap.get_widgets_map()
+    wm = aumap.get_widgets_map()
+    properties, properties_fingerprint = di["properties"], ()
+    if properties is not None:
+        properties = {k: blueprint_from_json(v, wm) for k, v in properties.items()}
+        properties_fingerprint = aumap.widgets_map_fingerprint(wm)
+    return UiBlueprint(
+        caller=aumap.WidgetCaller(**di["caller"]),
+        mapped=tuple(tuple(x) for x in di["mapped"]),
+        is_container=di["is_container"],
+        properties=properties,
+        properties_fingerprint=properties_fingerprint,
+        items=None if di["items"] is None else blueprint_from_json(di["items"], wm),
+        widgets_map=widgets_map,
+    )
+
+
+def _read_disk_cache(key: str, schema: dict) -> ty.Optional[UiBlueprint]:
+    try:
+        di = BLUEPRINT_DISK_CACHE.get(key, object_hook=_decode_importstr)
+    except Exception as err:  # e.g. a widget class that no longer exists
+        logger.warning(f"failed to load cached blueprint: {err}")
+        return None
+    if di is None or di.get("schema") != schema:
+        return None
+    try:
+        return blueprint_from_json(di["blueprint"])
+    except Exception as err:
+        logger.warning(f"failed to load cached blueprint: {err}")
+        return None
+
+
+def _write_disk_cache(key: str, schema: dict, bp: UiBlueprint) -> bool:
+    di = blueprint_to_json(bp)
+    if di is None:
+        return False
+    value = dict(schema=schema, blueprint=di)
+    return BLUEPRINT_DISK_CACHE.set(key, value, default=_encode_importstr)
+
+
+def get_blueprint(schema: dict) -> UiBlueprint:
+    """get the (cached) blueprint of a (normalised) json schema. blueprints are
+    cached in memory and, if `IPYAUTOUI_CACHEDIR` is set, on disk."""
+    key = json_hash(schema)
+    if key is None:  # e.g. recursive schema
+        return compile_blueprint(schema)
+    bp = BLUEPRINT_CACHE.get(key)
+    if bp is None:
+        use_disk = BLUEPRINT_DISK_CACHE.enabled
+        if use_disk:
+            bp = _read_disk_cache(key, schema)
+        if bp is None:
+            bp = compile_blueprint(schema)
+            if use_disk:
+                _write_disk_cache(key, schema, bp)
+        BLUEPRINT_CACHE.set(key, bp)
+    return bp
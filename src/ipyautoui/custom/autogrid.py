@@ -5,8 +5,10 @@ contains methods for validation, coercion, and default values.
 
 defines AutoGrid, a datagrid generated from a jsonschema."""
 
+import copy
 import typing as ty
 import logging
+import numpy as np
 import pandas as pd
 
 import traitlets as tr
@@ -15,7 +17,7 @@ from ipydatagrid import CellRenderer, TextRenderer
 
 from ipyautoui.custom.datagrid import DataGrid
 import ipyautoui.automapschema as asch
-from ipyautoui._utils import obj_from_importstr, frozenmap
+from ipyautoui._utils import obj_from_importstr, frozenmap, LruCache, json_hash
 from ipyautoui._utils import json_as_type
 
 MAP_TRANSPOSED_SELECTION_MODE = frozenmap({True: "column", False: "row"})
@@ -147,6 +149,51 @@ def get_global_renderers_from_schema(schema, **kwargs) -> dict:
     return {k: v for k, v in renderers.items() if v is not None}
 
 
+def _fill_object_column(col: pd.Series, default) -> pd.Series:
+    # NOTE: object columns may hold lists. a list of only missing values is missing
+    values = col.to_numpy(dtype=object, copy=True)
+    missing = pd.isna(values)
+    is_list = np.fromiter((isinstance(v, list) for v in values), bool, len(values))
+    if is_list.any():
+        missing[is_list] = [pd.isna(v).all() for v in values[is_list]]
+    if missing.any():
+        if pd.api.types.is_scalar(default):
+            values[missing] = default
+        else:
+            for n in np.flatnonzero(missing):
+                values[n] = default
+    return pd.Series(values, index=col.index, name=col.name).infer_objects()
+
+
+def fill_with_defaults(data: pd.DataFrame, defaults: dict) -> pd.DataFrame:
+    """fill missing values (None, NaN or a list of missing values) with the default
+    of the column. typed columns are filled with `fillna`, object columns (that may
+    hold lists) are filled separately.
+
+    Args:
+        data (pd.DataFrame): data
+        defaults (dict): column name: default value. None if no default
+
+    Returns:
+        pd.DataFrame: filled data
+    """
+    data = data.copy(deep=False)
+    for n, name in enumerate(data.columns):
+        default = defaults.get(name)
+        if default is None:
+            continue
+        col = data.iloc[:, n]
+        if col.dtype == object or not pd.api.types.is_scalar(default):
+            col = _fill_object_column(col, default)
+        else:
+            try:
+                col = col.fillna(default)
+            except (TypeError, ValueError):  # i.e. default not of column type
+                col = _fill_object_column(col, default)
+        data.isetitem(n, col)
+    return data
+
+
 def is_incremental(li):
     return li == list(range(li[0], li[0] + len(li)))
 
@@ -188,6 +235,7 @@ class GridSchema:
 
         self.index = self.get_index()
         self.get_traits = get_traits
+        self._datagrid_traits = {}  # NOTE: shared by the copies of `get_gridschema`
 
         self.map_name_index = self.get_map_name_index()
         self.map_index_name = {v: k for k, v in self.map_name_index.items()}
@@ -290,17 +338,25 @@ class GridSchema:
 
     @property
     def datagrid_traits(self) -> dict[str, ty.Any]:
+        return self.get_datagrid_traits(self.get_traits)
+
+    def get_datagrid_traits(self, trait_names: ty.Optional[list]) -> dict[str, ty.Any]:
+        """the values of the datagrid traits set by the schema. cached per list of
+        trait names. NOTE: shared between grids, do not mutate."""
         def try_getattr(obj, name):
             try:
                 return getattr(obj, name)
             except:
                 pass
 
-        if self.get_traits is None:
+        if trait_names is None:
             return {}
-        else:
-            _ = {t: try_getattr(self, t) for t in self.get_traits}
-            return {k: v for k, v in _.items() if v is not None}
+        key = tuple(trait_names)
+        cache = self._datagrid_traits
+        if key not in cache:
+            _ = {t: try_getattr(self, t) for t in trait_names}
+            cache[key] = {k: v for k, v in _.items() if v is not None}
+        return cache[key]
 
     def _get_default_data(self, order=None):
         if "default" in self.schema.keys():
@@ -402,19 +458,6 @@ class GridSchema:
                 drop = [l for l in col_names if l not in self.get_order_titles(order)]
             return data.drop(drop, axis=1)
 
-        def fill_with_default(col):
-            default_value = self._get_default_row().get(col.name)
-            if default_value is None:
-                return col
-            else:
-                return col.apply(
-                    lambda x: (
-                        default_value
-                        if (pd.isna(x).all() if isinstance(x, list) else pd.isna(x))
-                        else x
-                    )
-                )
-
         if order is None:
             order = self.default_order
 
@@ -432,7 +475,7 @@ class GridSchema:
             else:
                 data = data.reindex(columns=[self.map_name_index[x] for x in order])
 
-        data = data.apply(fill_with_default)
+        data = fill_with_defaults(data, self._get_default_row())
 
         # map column names to outward facing names
         if bykeys:
@@ -453,6 +496,36 @@ class GridSchema:
         return data
 
 
+#: cache of (GridSchema, kwargs values). key: `json_hash` of the schema and kwargs
+GRIDSCHEMA_CACHE = LruCache(maxsize=32)
+
+
+def _id_of(obj) -> str:
+    return f"{type(obj).__qualname__}@{id(obj)}"
+
+
+def get_gridschema(schema: dict, **kwargs) -> GridSchema:
+    """get a (cached) GridSchema. the renderers, column widths, index maps and
+    default row are only computed the first time a schema (and kwargs) is used.
+    the schema passed is not mutated. each call returns a copy of the cached
+    GridSchema with its own copy of the schema.
+    NOTE: the computed attributes are shared between grids, do not mutate.
+    """
+    key = json_hash([schema, kwargs], default=_id_of)
+    # ^ non-json kwargs (e.g. renderers) are keyed by identity. the cache entry
+    #   keeps them alive, so an id is not reused while it is cached
+    if key is None:
+        return GridSchema(copy.deepcopy(schema), **kwargs)
+    cached, _ = GRIDSCHEMA_CACHE.get(key, (None, None))
+    if cached is None:
+        cached = GridSchema(copy.deepcopy(schema), **kwargs)
+        GRIDSCHEMA_CACHE.set(key, (cached, list(kwargs.values())))
+        # ^ kwargs are kept such that objects keyed by `_id_of` stay alive
+    gridschema = copy.copy(cached)
+    gridschema.schema = copy.deepcopy(cached.schema)
+    return gridschema
+
+
 # -
 if __name__ == "__main__":
     from pydantic import RootModel
@@ -505,7 +578,8 @@ class AutoGrid(DataGrid):
 
     @tr.observe("schema")
     def _set_gridschema(self, onchange):
-        self.gridschema = GridSchema(self.schema, **self.kwargs)
+        self.gridschema = get_gridschema(self.schema, **self.kwargs)
+        self.gridschema.get_traits = self.datagrid_trait_names  # i.e. a copy per grid
 
     def update_from_schema(
         self,
@@ -584,7 +658,51 @@ class AutoGrid(DataGrid):
         else:
             return True
 
-    def records(self, keys_as_title=False):
+    @property
+    def _records_cache(self) -> dict:
+        return self.__dict__.setdefault("_records", {})
+
+    def _observe_changes(self):
+        # registered before `count_changes` such that its observers see fresh records
+        self.on_cell_change(self._update_records_cache)
+        self.observe(self._clear_records_cache, "_data")
+        super()._observe_changes()
+
+    def _clear_records_cache(self, onchange=None):
+        self._records_cache.clear()
+
+    def _update_records_cache(self, cell):
+        """patch the changed cell into the cached records (copy on write). the
+        value is read back from the data such that it matches `to_dict`."""
+        if not self._records_cache:
+            return
+        if self.transposed:  # a cell edit changes a column. not worth patching
+            self._clear_records_cache()
+            return
+        row, column = cell["row"], cell["column"]
+        try:
+            value = self._data["data"].at[row, column]
+        except KeyError:
+            self._clear_records_cache()
+            return
+        if isinstance(value, np.generic):
+            value = value.item()
+        for keys_as_title, records in self._records_cache.items():
+            k = column if keys_as_title else self.gridschema.map_index_name.get(column)
+            records[row] = records[row] | {k: value}
+
+    def records(self, keys_as_title=False) -> list[dict]:
+        """the grid data as a list of dicts. the records are cached and patched on
+        cell changes, and a copy of each row is returned. the cache is cleared if
+        `_data` changes.
+        """
+        records = self._records_cache.get(keys_as_title)
+        if records is None:
+            records = self._get_records(keys_as_title=keys_as_title)
+            self._records_cache[keys_as_title] = records
+        return [dict(r) for r in records]
+
+    def _get_records(self, keys_as_title=False) -> list[dict]:
         if self.transposed:
             data = self.data.T
         else:
@@ -614,15 +732,13 @@ class AutoGrid(DataGrid):
         self.selection_mode = MAP_TRANSPOSED_SELECTION_MODE[self.transposed]
         self.model, self.schema = asch._init_model_schema(schema, by_alias=by_alias)
         # ^ generates gridschema
-        self.gridschema.get_traits = self.datagrid_trait_names
+        datagrid_traits = self.gridschema.datagrid_traits
         _data = self._init_data(data)
         super().__init__(_data)
-        {setattr(self, k, v) for k, v in self.gridschema.datagrid_traits.items()}
+        {setattr(self, k, v) for k, v in datagrid_traits.items()}
         # annoyingly have to add this due to renderers being overwritten...
-        if "global_decimal_places" in self.gridschema.datagrid_traits.keys():
-            self.global_decimal_places = self.gridschema.datagrid_traits[
-                "global_decimal_places"
-            ]
+        if "global_decimal_places" in datagrid_traits.keys():
+            self.global_decimal_places = datagrid_traits["global_decimal_places"]
         assert isinstance(self.count_changes, int)
         # ^ this sets the default value and initiates trait change observer in `datagrid.py`
         if order is not None:
@@ -723,6 +839,41 @@ class AutoGrid(DataGrid):
         else:
             return self.set_row_value(index, value)
 
+    def set_item_values(self, value: list[dict], index: list[int]) -> list[dict]:
+        """
+        set many rows (transposed==False) or cols (transposed==True) in one update
+        """
+        if self.order is not None:
+            value = [{o: v[o] for o in self.order} for v in value]
+        if self.transposed:
+            return self.set_col_values(value, index=index)
+        else:
+            return self.set_row_values(value, index=index)
+
+    def splice_rows(self, delete: ty.Sequence[int] = (), append: ty.Sequence[dict] = ()):
+        """delete rows (by row index) and append rows (dicts keyed by field name or
+        title). only the appended rows are coerced and the data is sent to the
+        front-end once. the rows are re-indexed from 0.
+
+        NOTE: not supported for transposed grids (rows are columns).
+        """
+        if self.transposed:
+            raise ValueError("splice_rows is not supported if transposed")
+        if not delete and not append:
+            return
+        data = self._data
+        df = data["data"]
+        if delete:
+            df = df.drop(index=list(delete))
+        if append:
+            new = self._init_data(pd.DataFrame(list(append)))
+            new = new[self._get_col_headers(data)].reset_index(drop=True)
+            df = pd.concat([df, new], ignore_index=True)
+        df = df.reset_index(drop=True)
+        for k in data["schema"]["primaryKey"]:  # i.e. index and ipydguuid
+            df[k] = pd.RangeIndex(len(df))
+        self._data = {"data": df, "schema": data["schema"], "fields": data["fields"]}
+
     def _check_indexes(self, value: dict):
         """Check whether indexes of value are a subset of the schema
 
@@ -734,6 +885,126 @@ class AutoGrid(DataGrid):
         else:
             return False
 
+    def _set_cell_values(self, value: pd.DataFrame) -> list[dict]:
+        """set many cells in one update. the changed cells are found with one
+        comparison and the front-end is sent one message per changed row (or the
+        whole data if most rows changed).
+
+        Args:
+            value (pd.DataFrame): index: primary key values, columns: column names
+
+        Returns:
+            list[dict]: change records (as returned by `set_cell_value_if_different`)
+        """
+        df = self._data["data"]
+        key = self._data["schema"]["primaryKey"][:-1]  # omitting ipydguuid
+        if len(key) > 1:
+            primary_key = pd.MultiIndex.from_frame(df[key])
+        else:
+            primary_key = pd.Index(df[key[0]])
+        if not primary_key.is_unique:
+            raise ValueError("primary key values must be unique")
+        rows = primary_key.get_indexer(value.index)
+        if (rows == -1).any():
+            raise ValueError(
+                f"primary key values not found: {list(value.index[rows == -1])}"
+            )
+        cols = df.columns.get_indexer(value.columns)
+        if (cols == -1).any():
+            raise ValueError(f"columns not found: {list(value.columns[cols == -1])}")
+
+        old = df.iloc[rows, cols].to_numpy(dtype=object, copy=True)
+        new = value.to_numpy(dtype=object)
+        ri, ci = np.nonzero(old != new)
+        if len(ri) == 0:
+            return []
+        # NOTE: each changed column is written to a copy and set once they are all
+        #       written, such that a failed write doesn't leave the update half done.
+        #       cells are set one by one as iloc unpacks list values.
+        updated = {}
+        for c in np.unique(ci):
+            col = df.iloc[:, cols[c]].copy()
+            for r in ri[ci == c]:
+                v = new[r, c]
+                if col.dtype != object and not pd.api.types.is_scalar(v):
+                    col = col.astype(object)
+                try:
+                    col.iat[rows[r]] = v
+                except (TypeError, ValueError):  # i.e. incompatible with dtype
+                    col = col.astype(object)
+                    col.iat[rows[r]] = v
+            updated[cols[c]] = col
+        for i, col in updated.items():
+            df.isetitem(i, col)
+
+        headers = self._get_col_headers(self._data)
+        map_column_index = {h: n for n, h in enumerate(headers)}
+        changes = []
+        for r, c in zip(ri, ci):
+            primary_key_value, column_name = value.index[r], value.columns[c]
+            if isinstance(primary_key_value, tuple):
+                primary_key_value = [
+                    v.item() if isinstance(v, np.generic) else v
+                    for v in primary_key_value
+                ]
+            elif isinstance(primary_key_value, np.generic):
+                primary_key_value = primary_key_value.item()
+            changes.append(
+                {
+                    "column_name": column_name,
+                    "primary_key_value": primary_key_value,
+                    "old_value": old[r, c],
+                    "new_value": new[r, c],
+                }
+            )
+            self._cell_change_handlers(  # notify python listeners only
+                {
+                    "row": int(rows[r]),
+                    "column": column_name,
+                    "column_index": map_column_index.get(column_name),
+                    "value": new[r, c],
+                }
+            )
+        logging.info(f"set {len(changes)} cell values")
+        changed_rows = np.unique(rows[ri])
+        if len(changed_rows) > 1 and len(changed_rows) > len(df) // 2:
+            self.send_state("_data")
+        else:
+            for r in changed_rows:
+                self._notify_row_change(int(r), df.loc[r, headers].tolist())
+        return changes
+
+    def _get_row_values_frame(self, value: ty.Union[pd.DataFrame, list[dict]], index):
+        if isinstance(value, pd.DataFrame):
+            data = value if index is None else value.set_axis(index)
+        else:
+            if index is None or len(index) != len(value):
+                raise ValueError("index of each row in value must be given")
+            data = pd.DataFrame(list(value), index=list(index))
+        if self._check_indexes(value=dict.fromkeys(data.columns)):
+            data = data.rename(columns=self.map_name_index)
+        elif set(data.columns) == set(self.map_name_index.values()):
+            pass
+        else:
+            raise Exception("Columns of value given do not match with value keys.")
+        return data
+
+    def set_row_values(
+        self, value: ty.Union[pd.DataFrame, list[dict]], index: ty.Optional[list] = None
+    ) -> list[dict]:
+        """Set many rows in one update.
+
+        Args:
+            value (ty.Union[pd.DataFrame, list[dict]]): the row data. keyed by field
+                name or title.
+            index (list, optional): the keys of the rows. Defaults to the index of
+                value (if a DataFrame).
+
+        Returns:
+            list[dict]: change records
+        """
+        return self._set_cell_values(self._get_row_values_frame(value, index))
+
     def set_row_value(self, index: int, value: dict):
         """Set a chosen row using the index and a value given.
 
@@ -741,18 +1012,7 @@ class AutoGrid(DataGrid):
             index (int): The key of the row. # TODO: is this defo an int?
             value (dict): The data we want to input into the row.
         """
-        if self._check_indexes(value=value):
-            value = {self.map_name_index.get(name): v for name, v in value.items()}
-            # ^ self.apply_map_name_title(value)  ? ??
-        elif set(value.keys()) == set(self.map_name_index.values()):
-            pass
-        else:
-            raise Exception("Columns of value given do not match with value keys.")
-        changes = [
-            self.set_cell_value_if_different(column, index, v)
-            for column, v in value.items()
-        ]
-        return [c for c in changes if c is not None]
+        return self.set_row_values([value], index=[index])
 
     def apply_map_name_title(self, row_data):
         return {
@@ -761,6 +1021,29 @@ class AutoGrid(DataGrid):
             if k in self.map_index_name.keys()
         }
 
+    def set_col_values(
+        self, value: ty.Union[pd.DataFrame, list[dict]], index: ty.Optional[list] = None
+    ) -> list[dict]:
+        """Set many cols (i.e. rows of a transposed grid) in one update.
+
+        Note: We do not call value setter to apply values as it resets the datagrid.
+
+        Args:
+            value (ty.Union[pd.DataFrame, list[dict]]): the col data. keyed by field
+                name or title.
+            index (list, optional): the indexes of the cols. Defaults to the index of
+                value (if a DataFrame).
+
+        Returns:
+            list[dict]: change records
+        """
+        data = self._get_row_values_frame(value, index)
+        data.index = [self.get_col_name_from_index(i) for i in data.index]
+        data = data.T
+        if set(data.index) != set(self.data.index.to_list()):
+            raise Exception("Index of datagrid does not match with value keys.")
+        return self._set_cell_values(data)
+
     def set_col_value(self, index: int, value: dict):
         """Set a chosen col using the index and a value given.
 
@@ -770,19 +1053,7 @@ class AutoGrid(DataGrid):
             index (int): The index of the col
             value (dict): The data we want to input into the col.
         """
-        column_name = self.get_col_name_from_index(index)
-        if self._check_indexes(value=value):
-            value = {self.map_name_index.get(name): v for name, v in value.items()}
-        if set(value.keys()) != set(self.data.index.to_list()):
-            raise Exception("Index of datagrid does not match with value keys.")
-        changes = []
-        for primary_key_value, v in value.items():
-            if isinstance(primary_key_value, tuple):
-                primary_key_value = list(primary_key_value)
-            changes.append(
-                self.set_cell_value_if_different(column_name, primary_key_value, v)
-            )
-        return [c for c in changes if c is not None]
+        return self.set_col_values([value], index=[index])
 
     def filter_by_column_name(self, column_name: str, li_filter: list):
         """Filter rows to display based on a column name and a list of objects belonging to that column.
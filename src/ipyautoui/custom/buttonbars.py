@@ -13,6 +13,7 @@ from ipyautoui.constants import (
     HELP_BUTTON_KWARGS,
 )
 from IPython.display import display, clear_output
+from ipyautoui.custom.svgspinner import SvgSpinner
 from datetime import datetime
 import logging
 from enum import Enum
@@ -356,6 +357,25 @@ class CrudButtonBar(w.VBox):
     fn_reload = tr.Callable(default_value=None, allow_none=True)
     show_io = tr.Bool(default_value=False)
     show_support = tr.Bool(default_value=True)
+    busy = tr.Bool(default_value=False)
+
+    @tr.observe("busy")
+    def _observe_busy(self, change):
+        # NOTE: support is left enabled
+        for name in ["add", "edit", "copy", "delete", "io", "reload"]:
+            getattr(self, name).disabled = self.busy
+        self._init_spinner()
+        if hasattr(self, "spinner"):
+            self.spinner.show = self.busy
+
+    def _init_spinner(self):
+        # NOTE: built lazily (when first busy) as most bars are never busy
+        if not self.busy or not hasattr(self, "hbx_bbar") or hasattr(self, "spinner"):
+            return
+        self.spinner = SvgSpinner(show=self.busy)
+        children = list(self.hbx_bbar.children)
+        children.insert(children.index(self.message), self.spinner)
+        self.hbx_bbar.children = children
 
     @tr.observe("show_io")
     def _observe_show_io(self, change):
@@ -415,6 +435,7 @@ class CrudButtonBar(w.VBox):
             ]
         )
         self.children = [self.hbx_bbar, self.out]
+        self._init_spinner()
         self._init_controls()
 
     def _init_form(self):
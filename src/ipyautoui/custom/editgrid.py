@@ -6,6 +6,10 @@
 
 import traitlets as tr
 import typing as ty
+import asyncio
+import bisect
+import functools
+import inspect
 import logging
 import traceback
 import pandas as pd
@@ -17,9 +21,10 @@ import json
 from ipyautoui.autoobject import AutoObjectForm
 from ipyautoui.custom.buttonbars import CrudButtonBar
 from ipyautoui._utils import frozenmap, traits_in_kwargs
+from ipyautoui._utils_debounce import Debounced
 from ipyautoui.constants import BUTTON_WIDTH_MIN
 from ipyautoui.custom.autogrid import AutoGrid
-from ipyautoui.custom.edittsv import EditTsvWithDiff
+from ipyautoui.custom.edittsv import EditTsvWithDiff, Changes
 from ipyautoui.custom.title_description import TitleDescription
 
 MAP_TRANSPOSED_SELECTION_MODE = frozenmap({True: "column", False: "row"})
@@ -32,6 +37,9 @@ class DataHandler(BaseModel):
     """CRUD operations for a for EditGrid.
     Can be used to connect to a database or other data source.
     note - the TypeHints below are hints only. The functions can be any callable.
+    `fn_get_all_data`, `fn_post`, `fn_patch`, `fn_delete`, `fn_copy` and `fn_io` can
+    be coroutine functions. These are run on the kernel's event loop (one at a time,
+    in the order they are called) without blocking the UI.
 
     Args:
         fn_get_all_data (Callable): Function to get all data.
@@ -40,6 +48,27 @@ class DataHandler(BaseModel):
         fn_patch (Callable): Function to patch data. is passed a dict of a single row/col to patch.
         fn_delete (callable): Function to delete data. is passed the index of the row/col to delete.
         fn_copy (Callable): Function to copy data. is passed a list of dicts with values of rows/cols to copy.
+        fn_get_page (Callable): Optional. Function to get a page of data. is passed
+            `(offset, limit, sort, filter)` and returns a list of dicts. `sort` is a list
+            of `{"field", "desc"}` and `filter` a list of `{"field", "operator", "value"}`
+            (operators as ipydatagrid filter transforms). If given (with `fn_count`)
+            EditGrid only loads the page that is shown (plus prefetch).
+        fn_count (Callable): Optional. Function to count the rows. is passed `filter`.
+        fn_post_many (Callable): Optional. is passed a list of rows to post and returns
+            the rows as posted (e.g. with primary keys assigned).
+        fn_patch_many (Callable): Optional. is passed a list of rows to patch and
+            returns the rows as patched.
+        fn_delete_many (Callable): Optional. is passed a list of rows to delete.
+        fn_copy_many (Callable): Optional. is passed a list of rows to copy and returns
+            the new rows.
+        If a `*_many` function is given it is used instead of the single row function
+        and the rows returned are patched into the grid (rather than reloading all the
+        data). If it returns None the data is reloaded.
+        fn_get_changes_since (Callable): Optional. is passed the version of the data
+            the grid has and returns `(new_version, Changes)`. Changes are keyed by
+            `primary_key_name`. If passed None it must return all rows as additions.
+            If given, reloads only patch the changes into the grid.
+        primary_key_name (str): Optional. the field that rows are keyed by in Changes.
     """
 
     # REVIEW... MAYBE SHOULD USE *ARGS AND **KWARGS
@@ -49,6 +78,20 @@ class DataHandler(BaseModel):
     fn_delete: ty.Callable[[list[int]], None]
     fn_copy: ty.Callable[[list[int]], None]
     fn_io: ty.Optional[ty.Callable] = None
+    fn_get_page: ty.Optional[ty.Callable[[int, int, list, list], list[dict]]] = None
+    fn_count: ty.Optional[ty.Callable[[list], int]] = None
+    fn_post_many: ty.Optional[ty.Callable[[list[dict]], list[dict]]] = None
+    fn_patch_many: ty.Optional[ty.Callable[[list[dict]], list[dict]]] = None
+    fn_delete_many: ty.Optional[ty.Callable[[list[dict]], None]] = None
+    fn_copy_many: ty.Optional[ty.Callable[[list[dict]], list[dict]]] = None
+    fn_get_changes_since: ty.Optional[
+        ty.Callable[[ty.Any], tuple[ty.Any, Changes]]
+    ] = None
+    primary_key_name: ty.Optional[str] = None
+
+    @property
+    def is_paged(self) -> bool:
+        return self.fn_get_page is not None and self.fn_count is not None
 
 
 if __name__ == "__main__":
@@ -66,6 +109,39 @@ if __name__ == "__main__":
     ui.value = {"string": "adfs", "integer": 2, "floater": 1.22}
 
 
+def is_coroutine_function(fn: ty.Callable) -> bool:
+    while isinstance(fn, functools.partial):
+        fn = fn.func
+    if inspect.iscoroutinefunction(fn):
+        return True
+    # i.e. an instance with an `async def __call__`
+    return (
+        callable(fn)
+        and not inspect.isroutine(fn)
+        and inspect.iscoroutinefunction(type(fn).__call__)
+    )
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def _index(li: ty.Sequence, item) -> ty.Optional[int]:
+    """index of the first item equal to `item`"""
+    for n, x in enumerate(li):
+        if x == item:
+            return n
+    return None
+
+
+def _rindex(li: ty.Sequence, item) -> ty.Optional[int]:
+    """index of the last item equal to `item`"""
+    for n in range(len(li) - 1, -1, -1):
+        if li[n] == item:
+            return n
+    return None
+
+
 class UiDelete(w.VBox):
     value = tr.Dict(default_value={})
     columns = tr.List(default_value=[])
@@ -203,12 +279,18 @@ if __name__ == "__main__":
 # TODO: add a test for the datahandler...
 
 # from ipyautoui.watch_validate import WatchValidate
-class EditGrid(w.VBox, TitleDescription):
+class EditGrid(w.VBox, TitleDescription, Debounced):
     _value = tr.Tuple()  # using a tuple to guarantee no accidental mutation
     warn_on_delete = tr.Bool()
     show_copy_dialogue = tr.Bool()
     close_crud_dialogue_on_action = tr.Bool()
     show_ui_io = tr.Bool(default_value=False)
+    page_size = tr.Int(default_value=500)
+    page_prefetch = tr.Int(default_value=500)
+    page_offset = tr.Int(default_value=0)
+    n_rows = tr.Int(default_value=None, allow_none=True)
+    optimistic = tr.Bool(default_value=False)
+    reload_interval = tr.Float(default_value=None, allow_none=True)
 
     @tr.observe("warn_on_delete")
     def observe_warn_on_delete(self, on_change):
@@ -243,17 +325,85 @@ class EditGrid(w.VBox, TitleDescription):
 
     @property
     def value(self):
+        self.flush()
         return self._value
 
     @value.setter
     def value(self, value):
         self.grid.data = self.grid._init_data(pd.DataFrame(value))
+        self._reapply_transforms()
 
+    def _reapply_transforms(self):
         # HOTFIX: Setting data creates bugs out transforms currently so reset transform applied
         _transforms = self.grid._transforms
+        if not _transforms:
+            return
         self.grid.transform([])  # Set to no transforms
         self.grid.transform(_transforms)  # Set to previous transforms
 
+    def _get_row_indexes(self, keys: list, primary_key_name=None) -> list[int]:
+        if primary_key_name is None:
+            return [int(k) for k in keys]
+        map_key_index = {
+            str(v.get(primary_key_name)): n for n, v in enumerate(self.value)
+        }
+        try:
+            return [map_key_index[str(k)] for k in keys]
+        except KeyError as e:
+            raise ValueError(f"{primary_key_name}={e} not found in grid") from e
+
+    def _get_selections_after_delete(self, delete: list[int]) -> list[dict]:
+        if not delete:
+            return self.grid.selections
+        if self.grid._transforms or self.transposed:
+            return []  # NOTE: selections are of the view, not the data
+        deleted, delete = set(delete), sorted(delete)
+        selections = []
+        for s in self.grid.selections:
+            rows = [
+                r - bisect.bisect_left(delete, r)
+                for r in range(s["r1"], s["r2"] + 1)
+                if r not in deleted
+            ]
+            if rows:
+                selections.append(s | {"r1": min(rows), "r2": max(rows)})
+        return selections
+
+    def apply_changes(self, changes: Changes, primary_key_name: ty.Optional[str] = None):
+        """apply changes to the grid in place (rather than resetting the whole grid).
+        transforms and selections are kept. edits are applied first, then deletions,
+        and additions are appended to the end.
+
+        Args:
+            changes (Changes): edits and deletions are keyed by row index, or by the
+                value of the `primary_key_name` field if given.
+            primary_key_name (str, optional): Defaults to None.
+        """
+        value = self.value
+        if changes.edits:
+            keys = list(changes.edits.keys())
+            indexes = self._get_row_indexes(keys, primary_key_name)
+            rows = [
+                value[i] | changes.edited_rows.get(k, {}) | changes.edits[k]
+                for k, i in zip(keys, indexes)
+            ]
+            self.grid.set_item_values(rows, index=indexes)
+        delete = self._get_row_indexes(changes.deletions, primary_key_name)
+        if not delete and not changes.additions:
+            return
+        if self.transposed or len(value) == 0:
+            # NOTE: rows are columns if transposed. the whole grid is reset
+            delete = set(delete)
+            self.value = [v for i, v in enumerate(self.value) if i not in delete] + [
+                v for v in changes.additions
+            ]
+        else:
+            selections = self._get_selections_after_delete(delete)
+            self.grid.splice_rows(delete=delete, append=changes.additions)
+            self._reapply_transforms()
+            if selections != self.grid.selections:
+                self.grid.selections = selections
+
     @property
     def schema(self):
         return self.grid.schema
@@ -301,6 +451,11 @@ class EditGrid(w.VBox, TitleDescription):
         self.by_title = by_title
         self.by_alias = by_alias
         self.datahandler = datahandler
+        self._page_buffer = None
+        self._loading_page = False
+        self._datahandler_tasks = []
+        self._queued_reload = None  # i.e. the reload task that has not started
+        self._datahandler_version = None
 
         self.ui_io = None
         self._ui_io_factory = None
@@ -368,6 +523,18 @@ class EditGrid(w.VBox, TitleDescription):
             schema, data=getvalue(value), by_alias=self.by_alias, **kwargs
         )
 
+    def _init_row_form(self, ui):
+        from ipyautoui.blueprint import get_blueprint, accepts_blueprint
+
+        if accepts_blueprint(ui):  # avoids re-mapping the row_schema for each form
+            try:
+                bp = get_blueprint(self.row_schema)
+            except ValueError:
+                bp = None  # e.g. row_schema has no type
+            if bp is not None and bp.is_container:
+                return ui.from_jsonschema(self.row_schema, blueprint=bp)
+        return ui.from_jsonschema(self.row_schema)
+
     def _init_ui_callables(
         self,
         ui_add: ty.Optional[ty.Callable] = None,
@@ -377,13 +544,11 @@ class EditGrid(w.VBox, TitleDescription):
         ui_io: ty.Optional[ty.Callable] = None,
     ):
         if ui_add is None:
-            self.ui_add = AutoObjectForm.from_jsonschema(self.row_schema)
-        else:
-            self.ui_add = ui_add.from_jsonschema(self.row_schema)
+            ui_add = AutoObjectForm
+        self.ui_add = self._init_row_form(ui_add)
         if ui_edit is None:
-            self.ui_edit = AutoObjectForm.from_jsonschema(self.row_schema)
-        else:
-            self.ui_edit = ui_edit.from_jsonschema(self.row_schema)
+            ui_edit = AutoObjectForm
+        self.ui_edit = self._init_row_form(ui_edit)
         if ui_delete is None:
             self.ui_delete = UiDelete()
         else:
@@ -472,12 +637,26 @@ class EditGrid(w.VBox, TitleDescription):
         self.stk_crud = w.Stack(
             children=[self.ui_add, self.ui_edit, self.ui_copy, self.ui_delete]
         )
+        self.bn_page_prev = w.Button(
+            icon="chevron-left", layout={"width": BUTTON_WIDTH_MIN}
+        )
+        self.bn_page_next = w.Button(
+            icon="chevron-right", layout={"width": BUTTON_WIDTH_MIN}
+        )
+        self.html_page = w.HTML()
+        self.hbx_paging = w.HBox(
+            [self.bn_page_prev, self.html_page, self.bn_page_next],
+            layout={"display": "None"},
+        )
+        self.bn_page_prev.on_click(self._page_prev)
+        self.bn_page_next.on_click(self._page_next)
 
     def _init_controls(self):
         self.grid.observe(self._observe_selections, "selections")
         self.grid.observe(self._grid_changed, "count_changes")
         self.buttonbar_grid.observe(self._setview, "active")
         self.grid.observe(self._observe_order, "order")
+        self.grid.observe(self._observe_transforms, "_transforms")
         self._observe_order(None)  # prompts order if it is set in by grid setter above
 
     def _update_value_from_grid(self):
@@ -485,11 +664,371 @@ class EditGrid(w.VBox, TitleDescription):
 
     def _set_datahandler(self, datahandler):
         self.datahandler = datahandler
+        self._page_buffer = None
+        self._datahandler_version = None
         if self.datahandler is not None:
             self.buttonbar_grid.fn_reload = self._reload_datahandler
+        self.hbx_paging.layout.display = "" if self.is_paged else "None"
+        if self.is_paged:
+            self.load_page(0, reload=True)
+
+    # datahandler calls
+    # --------------------------------------------------------------------------
+    def _call_datahandler(
+        self,
+        fn: ty.Callable,
+        *args,
+        then: ty.Optional[ty.Callable] = None,
+        on_error: ty.Optional[ty.Callable[[Exception], None]] = None,
+        is_reload: bool = False,
+    ):
+        """call a datahandler function and pass the result to `then` (or the
+        exception to `on_error`, if given).
+        coroutine functions (and any call made while others are pending) are queued
+        on the running event loop and run one at a time. the buttonbar is busy
+        until the queue is empty. if there is no running loop they are run now."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if not self._datahandler_tasks and (loop is None or not is_coroutine_function(fn)):
+            try:
+                result = fn(*args)
+                if inspect.isawaitable(result):  # i.e. no running loop
+                    result = asyncio.run(_await(result))
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+                return
+            if then is not None:
+                then(result)
+            return
+
+        previous = self._datahandler_tasks[-1] if self._datahandler_tasks else None
+
+        async def run():
+            if previous is not None:
+                await asyncio.wait([previous])
+            if self._queued_reload is task:
+                self._queued_reload = None
+            try:
+                result = fn(*args)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+                return
+            if then is not None:
+                then(result)
+
+        task = loop.create_task(run())
+        if is_reload:
+            self._queued_reload = task
+        self._datahandler_tasks.append(task)
+        self.buttonbar_grid.busy = True
+        task.add_done_callback(self._datahandler_task_done)
+
+    def _datahandler_task_done(self, task):
+        self._datahandler_tasks.remove(task)
+        if not self._datahandler_tasks:
+            self.buttonbar_grid.busy = False
+        if not task.cancelled() and task.exception() is not None:
+            e = task.exception()
+            logger.error("datahandler call failed", exc_info=e)
+            self.buttonbar_grid.message.value = f"⚠️ <i>{e}</i>"
+
+    def _get_datahandler_many(self, name: str) -> ty.Optional[ty.Callable]:
+        if self.datahandler is None:
+            return None
+        return getattr(self.datahandler, f"fn_{name}_many", None)
+
+    def _patch_from_datahandler(self, changes: ty.Optional[Changes]):
+        """patch the result of a `*_many` datahandler call into the grid. if paged, or
+        if the datahandler returned nothing, the data is reloaded."""
+        if changes is None or self.is_paged:
+            self._reload_all_data()
+        else:
+            self.apply_changes(changes)
+
+    def _find_rows(self, rows: list[dict]) -> list[int]:
+        """indexes of `rows` in `value`, found by the datahandler `primary_key_name`
+        (else by value) as other changes may have moved them. rows not found are
+        skipped."""
+        value, primary_key_name = self.value, self.datahandler.primary_key_name
+        if primary_key_name is None:
+            indexes, found = [], set()
+            for row in rows:  # NOTE: equal rows are matched to distinct indexes
+                n = next(
+                    (n for n, v in enumerate(value) if n not in found and v == row),
+                    None,
+                )
+                found.add(n)
+                indexes.append(n)
+        else:
+            map_key_index = {
+                str(v.get(primary_key_name)): n for n, v in enumerate(value)
+            }
+            indexes = [map_key_index.get(str(row.get(primary_key_name))) for row in rows]
+        return [n for n in indexes if n is not None]
+
+    # optimistic updates
+    # --------------------------------------------------------------------------
+    @property
+    def is_optimistic(self) -> bool:
+        """if True changes are applied to the grid at once and sent to the
+        datahandler in the background. a change that fails is rolled back.
+        the data is only reloaded on demand (or every `reload_interval` seconds)."""
+        return self.optimistic and self.datahandler is not None
+
+    def _send_optimistic(
+        self,
+        fn: ty.Callable,
+        *args,
+        action: str,
+        rollback: ty.Callable,
+        then: ty.Optional[ty.Callable] = None,
+    ):
+        def on_error(e):
+            logger.error(f"{action} failed. rolling back", exc_info=e)
+            rollback()
+            self.buttonbar_grid.message.value = (
+                f"⚠️ <i>{action} failed and was undone: {e}</i>"
+            )
+
+        self._call_datahandler(fn, *args, then=then, on_error=on_error)
+
+    def _rollback(
+        self,
+        additions: ty.Sequence[dict] = (),
+        deletions: ty.Sequence[tuple[int, dict, ty.Optional[dict]]] = (),
+        edit: ty.Optional[tuple[int, dict, dict]] = None,
+    ):
+        """undo one optimistic change. rows are found by value (other changes may
+        have moved them).
+
+        Args:
+            additions: rows that were added
+            deletions: (index after the delete, row, next row not deleted) of rows
+                that were deleted. a row is put back before the next row if it is
+                found, else at the index.
+            edit: (index, old row, new row) of the row that was edited
+        """
+        value = list(self.value)
+        for row in additions:
+            n = _rindex(value, row)
+            if n is not None:
+                value.pop(n)
+        for i, (n, row, following) in enumerate(sorted(deletions, key=lambda x: x[0])):
+            m = None if following is None else _index(value, following)
+            if m is None:
+                m = len(value) if following is None else min(n + i, len(value))
+            value.insert(m, row)
+        if edit is not None:
+            n, old, new = edit
+            if not (n < len(value) and value[n] == new):
+                n = _rindex(value, new)
+            if n is not None:
+                value[n] = old
+        self.value = value
+
+    def _replace_added(self, added: list[dict], rows: ty.Optional[list[dict]]):
+        """replace optimistically added rows with the rows returned by the
+        datahandler (e.g. with primary keys assigned)"""
+        if rows is None:
+            return
+        value = self.value
+        edits = {}
+        for old, new in zip(added, rows):
+            n = _rindex(value, old)
+            if n is not None and new != old:
+                edits[n] = new
+        if edits:
+            self.apply_changes(Changes(edits=edits))
+
+    def _add_optimistic(self, rows: list[dict], action: str, name: str):
+        """add rows and send them with `fn_{name}_many` (or `fn_{name}` per row)"""
+        self.apply_changes(Changes(additions=rows))
+        fn_many = self._get_datahandler_many(name)
+        if fn_many is not None:
+            self._send_optimistic(
+                fn_many,
+                rows,
+                action=action,
+                rollback=functools.partial(self._rollback, additions=rows),
+                then=functools.partial(self._replace_added, rows),
+            )
+        else:
+            for row in rows:
+                self._send_optimistic(
+                    getattr(self.datahandler, f"fn_{name}"),
+                    row,
+                    action=action,
+                    rollback=functools.partial(self._rollback, additions=[row]),
+                )
+
+    def _patch_optimistic(self, index: int, row: dict):
+        old = self.value[index]
+        self.apply_changes(Changes(edits={index: row}))
+        new = self.value[index]
+        fn_patch_many = self._get_datahandler_many("patch")
+        self._send_optimistic(
+            self.datahandler.fn_patch if fn_patch_many is None else fn_patch_many,
+            row if fn_patch_many is None else [row],
+            action="edit",
+            rollback=functools.partial(self._rollback, edit=(index, old, new)),
+        )
+
+    def _delete_optimistic(self, indexes: list[int]):
+        value, indexes = self.value, sorted(indexes)
+        is_deleted = set(indexes)
+        deleted = []
+        for i, n in enumerate(indexes):  # i.e. (index after the delete, row, next row)
+            m = next((m for m in range(n + 1, len(value)) if m not in is_deleted), None)
+            deleted.append((n - i, value[n], None if m is None else value[m]))
+        self.apply_changes(Changes(deletions=indexes))
+        fn_delete_many = self._get_datahandler_many("delete")
+        if fn_delete_many is not None:
+            self._send_optimistic(
+                fn_delete_many,
+                [row for _, row, _ in deleted],
+                action="delete",
+                rollback=functools.partial(self._rollback, deletions=deleted),
+            )
+        else:
+            for d in deleted:
+                self._send_optimistic(
+                    self.datahandler.fn_delete,
+                    d[1],
+                    action="delete",
+                    rollback=functools.partial(self._rollback, deletions=[d]),
+                )
+
+    @tr.observe("reload_interval")
+    def _observe_reload_interval(self, onchange):
+        task = self.__dict__.pop("_reload_timer", None)
+        if task is not None:
+            task.cancel()
+        if self.reload_interval is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("reload_interval requires a running event loop")
+            return
+        self._reload_timer = loop.create_task(self._reload_periodically())
+
+    async def _reload_periodically(self):
+        while self.reload_interval is not None and self.comm is not None:
+            await asyncio.sleep(self.reload_interval)
+            if self.comm is None:  # i.e. closed
+                break
+            self._reload_all_data()
+
+    async def wait_datahandler(self):
+        """wait for the queued datahandler calls to finish"""
+        while self._datahandler_tasks:
+            await asyncio.wait(list(self._datahandler_tasks))
+
+    # paging
+    # --------------------------------------------------------------------------
+    @property
+    def is_paged(self) -> bool:
+        """True if the datahandler returns pages (rows are not transposed).
+        if paged, `value` is the rows of the page that is shown."""
+        return (
+            self.datahandler is not None
+            and self.datahandler.is_paged
+            and not self.transposed
+        )
+
+    def _get_query(self) -> tuple[list[dict], list[dict]]:
+        """get `sort` and `filter` for the datahandler from the grid transforms"""
+        fields = self.grid._data["schema"]["fields"]
+
+        def get_field(t):
+            name = fields[t["columnIndex"]]["name"]
+            return self.grid.gridschema.map_index_name.get(name, name)
+
+        sort, filter = [], []
+        for t in self.grid._transforms:
+            if t["type"] == "sort":
+                sort.append({"field": get_field(t), "desc": bool(t.get("desc"))})
+            elif t["type"] == "filter":
+                filter.append(
+                    {
+                        "field": get_field(t),
+                        "operator": t["operator"],
+                        "value": t.get("value"),
+                    }
+                )
+        return sort, filter
+
+    def _buffer_has_page(self, offset: int, query) -> bool:
+        buffer = self._page_buffer
+        if buffer is None or buffer["query"] != query:
+            return False
+        start, stop = buffer["start"], buffer["start"] + len(buffer["rows"])
+        return start <= offset and (
+            offset + self.page_size <= stop or stop >= self.n_rows
+        )
+
+    def load_page(self, offset: ty.Optional[int] = None, reload: bool = False):
+        """show the page of rows from `offset`. rows are fetched from the datahandler
+        with `page_prefetch` rows either side of the page, such that neighbouring
+        pages are shown without fetching. sort and filter transforms of the grid
+        are passed to the datahandler."""
+        if not self.is_paged:
+            raise ValueError("the datahandler does not return pages")
+        if offset is None:
+            offset = self.page_offset
+        sort, filter = query = self._get_query()
+        if reload or self._page_buffer is None or self._page_buffer["query"] != query:
+            self._page_buffer = None
+            self.n_rows = self.datahandler.fn_count(filter)
+        offset = max(0, min(offset, self.n_rows - 1))
+        if not self._buffer_has_page(offset, query):
+            start = max(0, offset - self.page_prefetch)
+            limit = offset - start + self.page_size + self.page_prefetch
+            rows = self.datahandler.fn_get_page(start, limit, sort, filter)
+            self._page_buffer = {"start": start, "rows": rows, "query": query}
+            logger.info(f"fetched rows {start}-{start + len(rows)}")
+        i = offset - self._page_buffer["start"]
+        self.page_offset = offset
+        self._set_page(self._page_buffer["rows"][i : i + self.page_size])
+
+    def _set_page(self, rows: list[dict]):
+        self._loading_page = True
+        try:
+            self.value = rows
+        finally:
+            self._loading_page = False
+        stop = min(self.page_offset + self.page_size, self.n_rows)
+        self.html_page.value = (
+            f"{min(self.page_offset + 1, self.n_rows)}-{stop} of {self.n_rows}"
+        )
+
+    def _page_prev(self, onclick):
+        self.load_page(max(0, self.page_offset - self.page_size))
+
+    def _page_next(self, onclick):
+        if self.page_offset + self.page_size < self.n_rows:
+            self.load_page(self.page_offset + self.page_size)
+
+    def _observe_transforms(self, onchange):
+        if self.is_paged and not self._loading_page:
+            if self._page_buffer is None or self._page_buffer["query"] != self._get_query():
+                self.load_page(0)
 
     def _set_children(self):
-        self.vbx_widget.children = [self.buttonbar_grid, self.stk_crud, self.grid]
+        self.vbx_widget.children = [
+            self.buttonbar_grid,
+            self.stk_crud,
+            self.grid,
+            self.hbx_paging,
+        ]
     
         # Base CRUD UIs
         children = [self.ui_add, self.ui_edit, self.ui_copy, self.ui_delete]
@@ -514,11 +1053,10 @@ class EditGrid(w.VBox, TitleDescription):
             if self.buttonbar_grid.delete.value:
                 self._set_ui_delete_to_selected_row()
 
-    # @debounce(0.1)  # TODO: make debounce work if too slow...
     def _grid_changed(self, onchange):
         # debouncer used to allow editing whole rows in 1 go
         # without updating the `value` on every cell edit.
-        self._update_value_from_grid()
+        self.debounced(self._update_value_from_grid)()
 
     def _setview(self, onchange):
         if self.buttonbar_grid.active == "io":
@@ -551,10 +1089,10 @@ class EditGrid(w.VBox, TitleDescription):
         self.grid.selections = []
         # ^ HOTFIX: Have to set empty to reselect later on
 
-        if self.datahandler is not None:
-            self._reload_all_data()
-        else:
+        if self.datahandler is None:
             self.grid.set_item_value(selected_index, self.ui_edit.value)
+        elif not self.is_optimistic and self._get_datahandler_many("patch") is None:
+            self._reload_all_data()
 
         if self.close_crud_dialogue_on_action:
             self.buttonbar_grid.edit.value = False
@@ -568,8 +1106,27 @@ class EditGrid(w.VBox, TitleDescription):
         self.ui_edit.savebuttonbar.unsaved_changes = False
 
     def _patch(self):
-        if self.datahandler is not None:
-            self.datahandler.fn_patch(self.ui_edit.value)  # TODO: add index
+        if self.datahandler is None:
+            return
+        if self.is_optimistic:
+            self._patch_optimistic(self.grid.selected_index, self.ui_edit.value)
+            return
+        fn_patch_many = self._get_datahandler_many("patch")
+        if fn_patch_many is None:
+            self._call_datahandler(
+                self.datahandler.fn_patch, self.ui_edit.value
+            )  # TODO: add index
+        else:
+            old, value = self.value[self.grid.selected_index], self.ui_edit.value
+
+            def then(rows):
+                # NOTE: found when the call returns. the row may have moved
+                new = value if rows is None else rows[0]
+                self._patch_from_datahandler(
+                    Changes(edits={n: new for n in self._find_rows([old])})
+                )
+
+            self._call_datahandler(fn_patch_many, [value], then=then)
 
     def _edit(self):
         try:
@@ -589,13 +1146,8 @@ class EditGrid(w.VBox, TitleDescription):
     # --------------------------------------------------------------------------
     def _save_add_to_grid(self):
         if self.datahandler is None:
-            if len(self.grid._data["data"]) == 0:  # If no data in grid
-                self.value = tuple([self.ui_add.value])
-            else:
-                # Append new row onto data frame and set to grid's data.
-                # Call setter. syntax below required to avoid editing in place.
-                self.value = tuple(list(self.value) + [self.ui_add.value])
-        else:
+            self.apply_changes(Changes(additions=[self.ui_add.value]))
+        elif not self.is_optimistic and self._get_datahandler_many("post") is None:
             self._reload_all_data()
         if self.close_crud_dialogue_on_action:
             self.buttonbar_grid.add.value = False
@@ -607,8 +1159,21 @@ class EditGrid(w.VBox, TitleDescription):
             self.ui_add.savebuttonbar.unsaved_changes = True
 
     def _post(self):
-        if self.datahandler is not None:
-            self.datahandler.fn_post(self.ui_add.value)
+        if self.datahandler is None:
+            return
+        if self.is_optimistic:
+            self._add_optimistic([self.ui_add.value], action="add", name="post")
+            return
+        fn_post_many = self._get_datahandler_many("post")
+        if fn_post_many is None:
+            self._call_datahandler(self.datahandler.fn_post, self.ui_add.value)
+        else:
+            self._call_datahandler(
+                fn_post_many, [self.ui_add.value], then=self._patch_additions
+            )
+
+    def _patch_additions(self, rows: ty.Optional[list[dict]]):
+        self._patch_from_datahandler(None if rows is None else Changes(additions=rows))
 
     def _add(self):
         self._set_ui_add_to_default_row()
@@ -634,7 +1199,7 @@ class EditGrid(w.VBox, TitleDescription):
         pass
 
     def _copy_selected_to_end(self):
-        self.value = tuple(list(self.value) + self._get_selected_data())
+        self.apply_changes(Changes(additions=self._get_selected_data()))
         if self.close_crud_dialogue_on_action:
             self.buttonbar_grid.copy.value = False
 
@@ -646,15 +1211,26 @@ class EditGrid(w.VBox, TitleDescription):
                 )
             else:
                 if not self.show_copy_dialogue:
-                    if self.datahandler is not None:
+                    self.buttonbar_grid.message.value = "📝 <i>Copied Data</i> "
+                    fn_copy_many = self._get_datahandler_many("copy")
+                    if self.is_optimistic:
+                        self._add_optimistic(
+                            self._get_selected_data(), action="copy", name="copy"
+                        )
+                    elif fn_copy_many is not None:
+                        self._call_datahandler(
+                            fn_copy_many,
+                            self._get_selected_data(),
+                            then=self._patch_additions,
+                        )
+                    elif self.datahandler is not None:
                         for value in self._get_selected_data():
-                            self.datahandler.fn_copy(value)
+                            self._call_datahandler(self.datahandler.fn_copy, value)
                         self._reload_all_data()
                     else:
                         self._copy_selected_to_end()
                         # ^ add copied values. note. above syntax required to avoid editing in place.
 
-                    self.buttonbar_grid.message.value = "📝 <i>Copied Data</i> "
                     self.buttonbar_grid.copy.value = False
 
                 else:
@@ -674,23 +1250,92 @@ class EditGrid(w.VBox, TitleDescription):
         self.buttonbar_grid.message.value = "🔄 <i>Reloaded Data</i> "
 
     def _reload_all_data(self):
-        if self.datahandler is not None:
-            self.value = self.datahandler.fn_get_all_data()
+        if self.datahandler is None:
+            return
+        tasks = self._datahandler_tasks
+        if self._queued_reload is not None and tasks and tasks[-1] is self._queued_reload:
+            return  # i.e. folded into the queued reload, as nothing is queued after it
+        if self.is_paged:
+            self._call_datahandler(
+                functools.partial(self.load_page, reload=True), is_reload=True
+            )
+        elif self.datahandler.fn_get_changes_since is not None:
+            self._call_datahandler(
+                self.datahandler.fn_get_changes_since,
+                self._datahandler_version,
+                then=self._apply_changes_since,
+                is_reload=True,
+            )
+        else:
+            self._call_datahandler(
+                self.datahandler.fn_get_all_data,
+                then=functools.partial(setattr, self, "value"),
+                is_reload=True,
+            )
+
+    def _apply_changes_since(self, result: tuple[ty.Any, Changes]):
+        """patch the changes since the last version into the grid. if the grid has
+        no version the additions are all the rows. if the changes do not apply
+        (e.g. an edit of a row that isn't in the grid) all the rows are reloaded."""
+        version, changes = result
+        if self._datahandler_version is None:
+            self.value = changes.additions
+            self._datahandler_version = version
+            return
+        primary_key_name = self.datahandler.primary_key_name
+        if primary_key_name is not None:
+            # rows that the grid already has (e.g. added optimistically) are edited
+            keys = {str(v.get(primary_key_name)) for v in self.value}
+
+            def is_new(row):
+                return str(row.get(primary_key_name)) not in keys
+
+            changes = Changes(
+                deletions=[k for k in changes.deletions if str(k) in keys],
+                edits=changes.edits
+                | {
+                    row[primary_key_name]: row
+                    for row in changes.additions
+                    if not is_new(row)
+                },
+                additions=[row for row in changes.additions if is_new(row)],
+                edited_rows=changes.edited_rows,
+            )
+        try:
+            self.apply_changes(changes, primary_key_name=primary_key_name)
+        except ValueError as e:
+            logger.warning(f"changes since {self._datahandler_version} not applied: {e}")
+            self._datahandler_version = None
+            self._call_datahandler(
+                self.datahandler.fn_get_changes_since,
+                None,
+                then=self._apply_changes_since,
+            )
+            return
+        self._datahandler_version = version
 
     def _delete_selected(self):
-        if self.datahandler is not None:
+        self.buttonbar_grid.message.value = "🗑️ <i>Deleted Data</i> "
+        fn_delete_many = self._get_datahandler_many("delete")
+        if self.is_optimistic:
+            self._delete_optimistic(list(self.grid.selected_indexes))
+        elif fn_delete_many is not None:
+            rows = [self.value[i] for i in self.grid.selected_indexes]
+
+            def then(_):
+                # NOTE: found when the call returns. the rows may have moved
+                self._patch_from_datahandler(
+                    Changes(deletions=self._find_rows(rows))
+                )
+
+            self._call_datahandler(fn_delete_many, rows, then=then)
+        elif self.datahandler is not None:
             value = [self.value[i] for i in self.grid.selected_indexes]
             for v in value:
-                self.datahandler.fn_delete(v)
+                self._call_datahandler(self.datahandler.fn_delete, v)
             self._reload_all_data()
         else:
-            self.value = [
-                value
-                for i, value in enumerate(self.value)
-                if i not in self.grid.selected_indexes
-            ]
-            # ^ Only set for values NOT in self.grid.selected_indexes
-        self.buttonbar_grid.message.value = "🗑️ <i>Deleted Data</i> "
+            self.apply_changes(Changes(deletions=self.grid.selected_indexes))
         if self.close_crud_dialogue_on_action:
             self.buttonbar_grid.delete.value = False
 
@@ -3,13 +3,21 @@ from ipyautoui.custom.editgrid import (
     DataHandler,
 )
 from ipyautoui.custom.edittsv import Changes, EditTsvFileUpload
+from ipyautoui.custom.sqlitetable import SqliteTable
+import os
 import pathlib
+import logging
 import traitlets as tr
 import json
 from pydantic import BaseModel, RootModel, Field
 import typing as ty
 import ipywidgets as w
-import functools
+from ipyautoui._utils import write_text_atomic, LruCache
+
+logger = logging.getLogger(__name__)
+
+#: files with these suffixes are stored in a SQLite database
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
 
 
 # +
@@ -24,9 +32,8 @@ def load_json(fpth: pathlib.Path = pathlib.Path("text.json")) -> list[dict]:
 
 
 def save_json(data: list[dict], fpth: pathlib.Path) -> pathlib.Path:
-    """Save JSON list data safely."""
-    with fpth.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    """Save JSON list data safely (written to a temp file and renamed)."""
+    write_text_atomic(fpth, json.dumps(data, indent=4))
     return fpth
 
 
@@ -124,20 +131,320 @@ def add_row(addition: dict, primary_key_name = "id", fpth: pathlib.Path = pathli
     print(f"➕ Added new row")
     return data
 
+
+# --- STORAGE ENGINE ---
+#: stores by the signature of their files. a new store of files that are unchanged
+#: copies the rows and index of the cached store rather than reading the files
+STORE_CACHE = LruCache(maxsize=16)
+
+
+def get_file_signature(*fpths: pathlib.Path) -> tuple:
+    """(path, st_mtime_ns, st_size) of each file. (path, None, None) if missing"""
+    signature = []
+    for fpth in fpths:
+        try:
+            st = os.stat(fpth)
+            signature.append((os.path.abspath(fpth), st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append((os.path.abspath(fpth), None, None))
+    return tuple(signature)
+
+
+def get_changes(old: dict, new: dict, primary_key_name: str = "id") -> Changes:
+    """get the changes between two indexes of rows (key: row)"""
+    return Changes(
+        deletions=[row[primary_key_name] for k, row in old.items() if k not in new],
+        edits={
+            row[primary_key_name]: row
+            for k, row in new.items()
+            if k in old and old[k] is not row and old[k] != row
+        },
+        additions=[row for k, row in new.items() if k not in old],
+    )
+
+
+class JsonFileStore:
+    """rows of a JSON file (a list of dicts) held in memory and indexed by primary key.
+
+    changes are appended to a log file (`<fpth>.log`, one JSON object per line)
+    rather than rewriting the JSON file. every `compact_every` changes the rows are
+    written to the JSON file (atomically) and the log is cleared. on load the log is
+    replayed over the JSON file, so no change is lost if the process stops before
+    compaction. new rows get ids from a sequence that is never reused.
+
+    the files are only read if their signature (path, st_mtime_ns, st_size) is not
+    that of a store in `STORE_CACHE`. changes to the files by others (e.g. another
+    process) are read by `reload`, and before each write such that they are not
+    overwritten. NOTE: the files are not locked.
+
+    Args:
+        fpth (pathlib.Path): the JSON file
+        primary_key_name (str): Defaults to "id".
+        compact_every (int): number of logged changes before compacting.
+            Defaults to 1000.
+    """
+
+    def __init__(
+        self,
+        fpth: pathlib.Path,
+        primary_key_name: str = "id",
+        compact_every: int = 1000,
+    ):
+        self.fpth = pathlib.Path(fpth)
+        self.primary_key_name = primary_key_name
+        self.compact_every = compact_every
+        self._external = {}  # key: (primary key value, existed), changed by others
+        self.load()
+
+    @property
+    def fpth_log(self) -> pathlib.Path:
+        return self.fpth.with_name(self.fpth.name + ".log")
+
+    def _key(self, row_or_key) -> str:
+        if isinstance(row_or_key, dict):
+            row_or_key = row_or_key[self.primary_key_name]
+        return str(row_or_key)
+
+    @property
+    def signature(self) -> tuple:
+        return get_file_signature(self.fpth, self.fpth_log)
+
+    def _cache(self):
+        """cache the store by the signature of its files (after they are written)"""
+        if getattr(self, "_signature", None) is not None:
+            STORE_CACHE.invalidate(self._signature)
+        self._signature = self.signature
+        STORE_CACHE.set(self._signature, self)
+
+    @property
+    def is_modified(self) -> bool:
+        """True if the files have been changed other than by this store"""
+        return self.signature != self._signature
+
+    def load(self):
+        """read the JSON file and replay the log. if a cached store has the files as
+        they are now its rows and index are copied instead."""
+        signature = self.signature
+        cached = STORE_CACHE.get(signature)
+        if cached is not None and cached._signature == signature:
+            self.index = dict(cached.index)  # i.e. rows are replaced, not mutated
+            self.next_id, self.n_logged = cached.next_id, cached.n_logged
+            self._external = dict(cached._external)  # i.e. not yet read by either
+            self._signature = signature
+            return
+        rows = load_json(self.fpth) if self.fpth.exists() else []
+        self.index = {self._key(r): r for r in rows}  # key: row (in file order)
+        self.next_id = max(
+            (
+                r[self.primary_key_name] + 1
+                for r in rows
+                if isinstance(r.get(self.primary_key_name), int)
+            ),
+            default=1,
+        )
+        self.n_logged, is_corrupt = 0, False
+        if self.fpth_log.exists():
+            with self.fpth_log.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:  # i.e. a partly written last line
+                        logger.warning(f"ignoring corrupt line in {self.fpth_log}")
+                        is_corrupt = True
+                        continue
+                    self._apply(entry)
+                    self.n_logged += 1
+        self._signature = signature  # i.e. the files as read
+        if is_corrupt:  # such that appends don't follow the corrupt line
+            self.compact()
+        else:
+            self._cache()
+
+    def reload(self) -> ty.Optional[Changes]:
+        """load the files if they have been modified by others. returns the
+        changes, or None if they were not modified"""
+        if not self.is_modified:
+            return None
+        old = self.index
+        self.load()
+        changes = get_changes(old, self.index, self.primary_key_name)
+        keys = [*changes.deletions, *changes.edits, *changes.additions]
+        for key in map(self._key, keys):  # i.e. kept for `get_changes_since`
+            row = old.get(key) or self.index[key]
+            self._external.setdefault(key, (row[self.primary_key_name], key in old))
+        return changes
+
+    def get_changes_since(self, version) -> tuple[tuple, Changes]:
+        """`fn_get_changes_since` of the DataHandler. the version is the signature
+        of the files. only changes by others are returned (including those read
+        before a write), as changes made through the store are already in the
+        grid. if version is None all rows are additions."""
+        self.reload()
+        external, self._external = self._external, {}
+        if version is None:
+            return self._signature, Changes(additions=self.get_all())
+        changes = Changes()
+        for key, (primary_key_value, existed) in external.items():
+            row = self.index.get(key)
+            if row is None:
+                if existed:
+                    changes.deletions.append(primary_key_value)
+            elif existed:
+                changes.edits[primary_key_value] = row
+            else:
+                changes.additions.append(row)
+        return self._signature, changes
+
+    def _apply(self, entry: dict):
+        op = entry["op"]
+        if op == "upsert":
+            for row in entry["rows"]:
+                self.index[self._key(row)] = row
+        elif op == "delete":
+            for k in entry["keys"]:
+                self.index.pop(k, None)
+        elif op == "seq":
+            pass
+        else:
+            raise ValueError(f"unknown log op: {op}")
+        self.next_id = max(self.next_id, entry.get("next_id", 0))
+
+    def _log(self, *entries: dict):
+        """apply and append entries to the log. compacts if the log is long"""
+        for entry in entries:
+            entry["next_id"] = self.next_id
+            self._apply(entry)
+        with self.fpth_log.open("a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in entries))
+        self.n_logged += len(entries)
+        if self.n_logged >= self.compact_every:
+            self.compact()
+        else:
+            self._cache()
+
+    def _sync(self):
+        """reload if the files were changed by others, e.g. before writing"""
+        if self.is_modified:
+            self.reload()
+
+    def compact(self):
+        """write the rows to the JSON file (atomically) and clear the log. the id
+        sequence is kept in the new log."""
+        self._sync()
+        save_json(self.get_all(), self.fpth)
+        write_text_atomic(
+            self.fpth_log, json.dumps({"op": "seq", "next_id": self.next_id}) + "\n"
+        )
+        self.n_logged = 0
+        self._cache()
+
+    # read
+    # --------------------------------------------------------------------------
+    def get_all(self) -> list[dict]:
+        return list(self.index.values())
+
+    def get(self, key) -> ty.Optional[dict]:
+        return self.index.get(self._key(key))
+
+    # write
+    # --------------------------------------------------------------------------
+    def add(self, additions: list[dict]) -> list[dict]:
+        """add rows with new ids from the sequence. returns the rows as added"""
+        self._sync()
+        rows = []
+        for addition in additions:
+            row = {self.primary_key_name: self.next_id} | {
+                k: v for k, v in addition.items() if k != self.primary_key_name
+            }
+            self.next_id += 1
+            rows.append(row)
+        if rows:
+            self._log({"op": "upsert", "rows": rows})
+        return rows
+
+    def edit(self, edits: dict[ty.Union[str, int], dict]) -> list[dict]:
+        """update the fields of rows by key (the key itself is not changed). returns
+        the rows as edited"""
+        self._sync()
+        rows = []
+        for key, fields in edits.items():
+            row = self.index.get(self._key(key))
+            if row is None:
+                logger.warning(f"{self.primary_key_name}={key} not found")
+                continue
+            rows.append(
+                row | {k: v for k, v in fields.items() if k != self.primary_key_name}
+            )
+        if rows:
+            self._log({"op": "upsert", "rows": rows})
+        return rows
+
+    def delete(self, keys: list) -> None:
+        """delete rows by key (or row)"""
+        self._sync()
+        keys = [self._key(k) for k in keys]
+        if keys:
+            self._log({"op": "delete", "keys": keys})
+
+    def handle_crud(self, changes: Changes) -> None:
+        """Apply delete → insert → update in order."""
+        self.delete(changes.deletions)
+        self.add(changes.additions)
+        self.edit(changes.edits)
+
+    def datahandler(self, **kwargs) -> DataHandler:
+        """get a DataHandler. kwargs override the defaults"""
+        pk = self.primary_key_name
+        return DataHandler(
+            **dict(
+                fn_get_all_data=self.get_all,
+                fn_post=lambda row: self.add([row]),
+                fn_patch=lambda row: self.edit({row[pk]: row}),
+                fn_delete=lambda row: self.delete([row]),
+                fn_copy=lambda row: self.add([row]),
+                fn_post_many=self.add,
+                fn_patch_many=lambda rows: self.edit({r[pk]: r for r in rows}),
+                fn_delete_many=self.delete,
+                fn_copy_many=self.add,
+                fn_io=self.handle_crud,
+                fn_get_changes_since=self.get_changes_since,
+                primary_key_name=pk,
+            )
+            | kwargs
+        )
+
+
+def get_store(
+    fpth: pathlib.Path, schema: dict, primary_key_name: str = "id"
+) -> ty.Union[JsonFileStore, SqliteTable]:
+    """get the store of a file. SQLite if the suffix is in `SQLITE_SUFFIXES`
+    (the table is generated from the schema), else JSON."""
+    if fpth.suffix.lower() in SQLITE_SUFFIXES:
+        return SqliteTable(fpth, schema=schema, primary_key_name=primary_key_name)
+    return JsonFileStore(fpth, primary_key_name=primary_key_name)
+
+
 class EditGridFile(EditGrid):
+    """an EditGrid that saves to a file. a `.json` file (a list of rows) or a
+    SQLite database (`.db`, `.sqlite`, `.sqlite3`). a SQLite database is read in
+    pages, and each change is an update of the changed rows only.
+
+    a JSON file is only read again if it has changed (see `JsonFileStore`). set
+    `reload_interval` (seconds) to poll it for changes by others, which are
+    patched into the grid."""
+
     primary_key_name = tr.Unicode(default_value="id")
     fpth = tr.Instance(klass=pathlib.Path, allow_none=False)
 
     @tr.observe("fpth")
-    def update_handler(self, change):       
-        self.datahandler.fn_get_all_data = functools.partial(load_json, fpth=self.fpth)
-        self.datahandler.fn_post = functools.partial(add_row, primary_key_name=self.primary_key_name, fpth=self.fpth)
-        self.datahandler.fn_patch = functools.partial(edit_row, primary_key_name=self.primary_key_name, fpth=self.fpth)
-        self.datahandler.fn_delete = functools.partial(delete_row, primary_key_name=self.primary_key_name, fpth=self.fpth)
-        self.datahandler.fn_copy = functools.partial(add_row, primary_key_name=self.primary_key_name, fpth=self.fpth)
-        self.datahandler.fn_io = functools.partial(self.handle_crud)
-
+    def update_handler(self, change):
+        if isinstance(getattr(self, "store", None), SqliteTable):
+            self.store.close()
+        self.store = get_store(self.fpth, self.schema, self.primary_key_name)
+        self.datahandler = self.store.datahandler(fn_io=self.handle_crud)
         self._set_datahandler(self.datahandler)
+        if not self.is_paged:  # i.e. the first page is loaded by _set_datahandler
+            self._reload_all_data()
         
     def __init__(
         self,
@@ -167,11 +474,15 @@ class EditGridFile(EditGrid):
     def fn_upload(self, value):
         self.value=value
         if self.ui_io is not None:
-            self.datahandler.fn_io(self.ui_io.changes)
+            self._call_datahandler(
+                self.datahandler.fn_io,
+                self.ui_io.changes,
+                then=lambda _: self.load_page(reload=True) if self.is_paged else None,
+            )
 
     # --- HANDLERS ---
     def handle_crud(self, changes: Changes):
-        handle_crud(self.ui_io.primary_key_name, changes, self.fpth)
+        self.store.handle_crud(changes)
 
 
 if __name__ == "__main__":
@@ -20,6 +20,7 @@ import xlsxdatagrid as xdg
 from pathlib import Path
 from ipyautoui.watch_validate import pydantic_validate
 from ipyautoui._utils import pydantic_model_from_json_schema
+from ipyautoui._utils_debounce import Debounced
 
 from ipyautoui.constants import BUTTON_WIDTH_MIN
 
@@ -132,7 +133,7 @@ def default_fn_upload(value):
     print(value)
 
 
-class EditTsv(CopyToClipboard):
+class EditTsv(CopyToClipboard, Debounced):
     _value = tr.List(value=None, trait=tr.Dict, allow_none=True)
     model = tr.Type(klass=BaseModel, default_value=None, allow_none=True)
     by_alias = tr.Bool(default_value=False)
@@ -219,6 +220,7 @@ class EditTsv(CopyToClipboard):
 
     @property
     def value(self):
+        self.flush()
         return self._value
 
     @value.setter
@@ -234,7 +236,7 @@ class EditTsv(CopyToClipboard):
             return data_to_tsv(self.value)
 
     def _init_contols(self):
-        self.text.observe(self._text, "value")
+        self.text.observe(self._observe_text, "value")
         self.bn_upload_text.on_click(self._bn_upload_text)
 
     def _bn_upload_text(self, on_click):
@@ -255,6 +257,9 @@ class EditTsv(CopyToClipboard):
             fpth = new_fpth
         return fpth
 
+    def _observe_text(self, change):
+        self.debounced(self._text)(change)  # e.g. parse once when pasting
+
     def _text(self, change):
         value = []
         if self.text.value:
@@ -446,10 +451,10 @@ class DisplayDeepDiff(w.VBox):
 
 
 class Changes(BaseModel):
-    deletions: list[ty.Union[str, int]]
-    edits: dict[ty.Union[str, int], dict]
-    additions: list[dict]
-    edited_rows: dict[ty.Union[str, int], dict]
+    deletions: list[ty.Union[str, int]] = []
+    edits: dict[ty.Union[str, int], dict] = {}
+    additions: list[dict] = []
+    edited_rows: dict[ty.Union[str, int], dict] = {}
 
 
 class EditTsvWithDiff(EditTsv):
@@ -465,6 +470,7 @@ class EditTsvWithDiff(EditTsv):
 
     @property
     def value(self):
+        self.flush()
         return self._value
 
     @value.setter
@@ -329,12 +329,14 @@ class FilesUploadToDir(Array, TitleDescription):
         MAP_CLEARFILEUPLOAD[self.use_vuetify](self.upld)
 
     def add_files(self, paths: list[str]):
-        for p in paths:
-            self.add_row(
-                widget=DisplayPath(
+        self.extend_rows(
+            widgets=[
+                DisplayPath(
                     str(p), **self.kwargs_display_path | dict(order=ORDER_NOTPATH)
                 )
-            )
+                for p in paths
+            ]
+        )
 
     def fn_remove_file(self, bx=None):
         p = pathlib.Path(bx.widget.value)
@@ -15,9 +15,11 @@ import traitlets as tr
 import typing as ty
 from IPython.display import display
 from ipyautoui.basemodel import BaseModel
+import copy
 import uuid
 from uuid import UUID
 import functools
+import collections
 from ipyautoui.constants import (
     ADD_BUTTON_KWARGS,
     REMOVE_BUTTON_KWARGS,
@@ -32,7 +34,7 @@ import string
 import random
 from ipyautoui.automapschema import from_schema_method, get_widget
 from jsonref import replace_refs
-from ipyautoui.watch_validate import WatchValidate
+from ipyautoui.watch_validate import WatchValidate, set_widget_value
 from ipyautoui._utils import remove_non_present_kwargs, traits_in_kwargs
 
 logger = logging.getLogger(__name__)
@@ -149,6 +151,71 @@ class Array(w.VBox, WatchValidate):
     min_items = tr.Int(default_value=0)
     max_items = tr.Int(default_value=None, allow_none=True)
     type = tr.Unicode(default_value="array")
+    pool_size = tr.Int(default_value=20)  # max removed rows kept for reuse. 0 to disable
+    window_size = tr.Int(default_value=None, allow_none=True)  # None: show all rows
+    window_start = tr.Int(default_value=0)
+    overscan = tr.Int(default_value=2)  # rows built (but hidden) either side of window
+
+    @tr.observe("pool_size")
+    def _pool_size(self, on_change):
+        self.pool = collections.deque(self.pool, maxlen=self.pool_size)
+
+    @tr.observe("fn_add")
+    def _fn_add(self, on_change):
+        self.pool.clear()  # pooled widgets were made by the old fn_add
+
+    def _release_box(self, bx):
+        """reset a removed row and keep it for reuse. only rows made by `fn_add()`
+        (without kwargs) are pooled."""
+        if not getattr(bx, "poolable", False) or self.pool_size == 0:
+            return
+        with self.silence_autoui_traits():
+            try:
+                set_widget_value(bx.widget, copy.deepcopy(bx.default_value))
+            except Exception as e:
+                logger.warning(f"row not pooled. failed to reset widget value: {e}")
+                return
+        self.pool.append(bx)
+
+    def _acquire_box(self) -> ty.Optional[ItemBox]:
+        if self.pool:
+            self.pool_hits += 1
+            return self.pool.pop()
+        self.pool_misses += 1
+        return None
+
+    @property
+    def pool_info(self) -> dict:
+        n = self.pool_hits + self.pool_misses
+        return dict(
+            hits=self.pool_hits,
+            misses=self.pool_misses,
+            hit_rate=self.pool_hits / n if n else 0.0,
+            maxsize=self.pool_size,
+            currsize=len(self.pool),
+        )
+
+    @property
+    def boxes(self) -> list:
+        return self.__dict__.get("_boxes", [])
+
+    @boxes.setter
+    def boxes(self, boxes):
+        self._boxes = list(boxes)
+        if not self.windowed:
+            self._reindex()
+
+    def _reindex(self):
+        """number the rows and update the key→index map. if windowed the map is
+        of `row_keys` (as only the rows in the window are built)."""
+        if self.windowed:
+            self.key_index = {k: n for n, k in enumerate(self.row_keys)}
+            return
+        if not self.sort_on_index:
+            self._boxes = sorted(self._boxes, key=lambda bx: str(bx.key))
+        for n, bx in enumerate(self._boxes):
+            bx.index = n
+        self.key_index = {bx.key: n for n, bx in enumerate(self._boxes)}
 
     def _get_widgets(self):
         return [bx.widget for bx in self.boxes]
@@ -171,22 +238,230 @@ class Array(w.VBox, WatchValidate):
         ]
         self.di_boxes = {box.key: box for box in self.boxes} # HACK: to match with AutoObject. TODO: update to di_boxes? to match AutoObject
 
+    def _make_box(self, index, key, add_kwargs=None, widget=None) -> ItemBox:
+        """get a row from the pool or make a new one"""
+        bx = None
+        if widget is None and not add_kwargs:
+            bx = self._acquire_box()
+        if bx is not None:
+            bx.index, bx.key = index, key
+            bx.add_remove_controls = self.add_remove_controls
+            return bx
+        new_obj = self.fn_add(**(add_kwargs or {})) if widget is None else widget
+        bx = ItemBox(
+            index=index,
+            key=key,
+            widget=new_obj,
+            add_remove_controls=self.add_remove_controls,
+        )
+        if widget is None and not add_kwargs:
+            bx.poolable = True
+            bx.default_value = copy.deepcopy(getattr(new_obj, "value", None))
+        return bx
+
+    # windowed rendering
+    # --------------------------------------------------------------------------
+    # NOTE: if `window_size` is set only the rows in the window (plus `overscan`)
+    #       are built. `row_keys` and `_value` hold the full list of rows and
+    #       `boxes` only the built rows, where `ItemBox.index` is the row index.
+
+    @property
+    def windowed(self) -> bool:
+        return self.window_size is not None and type(self._value) is list
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.row_keys) if self.windowed else len(self.boxes)
+
+    @tr.validate("window_size")
+    def _valid_window_size(self, proposal):
+        if proposal["value"] is not None and proposal["value"] < 1:
+            raise ValueError("window_size must be >= 1")
+        return proposal["value"]
+
+    @tr.observe("window_size")
+    def _window_size(self, on_change):
+        self.flush()
+        if self.windowed:
+            self.row_keys = [bx.key for bx in self.boxes]
+            self._reindex()
+        self._render_window()
+        self.hbx_window.layout.display = "" if self.windowed else "None"
+
+    @tr.observe("window_start")
+    def _window_start(self, on_change):
+        if self.windowed:
+            self.flush()
+            self._render_window()
+
+    def _window_prev(self, onclick):
+        self.window_start = max(0, self.window_start - self.window_size)
+
+    def _window_next(self, onclick):
+        if self.window_start + self.window_size < self.n_rows:
+            self.window_start = self.window_start + self.window_size
+
+    def show_row(self, index: int):
+        """move the window such that the row is visible"""
+        if not self.windowed:
+            return
+        start = self.window_start
+        if not start <= index < start + self.window_size:
+            self.window_start = (index // self.window_size) * self.window_size
+
+    def _render_window(self):
+        """build the rows in the window (recycling rows that leave the window) and
+        set their values from `_value`."""
+        if not self.windowed:
+            if getattr(self, "row_keys", None) is not None:  # i.e. windowing turned off
+                self.row_keys = None
+                self._reindex()
+                self._update_widgets_from_value()
+            return
+        n = len(self._value)
+        start = min(self.window_start, max(0, n - 1) // self.window_size * self.window_size)
+        if start != self.window_start:
+            self.window_start = start  # NOTE: observer re-renders
+            return
+        stop = start + self.window_size
+        lo, hi = max(0, start - self.overscan), min(n, stop + self.overscan)
+        existing = {bx.key: bx for bx in self.boxes}
+        boxes = []
+        with self.silence_autoui_traits():
+            for index in range(lo, hi):
+                key = self.row_keys[index]
+                bx = existing.pop(key, None)
+                if bx is None:
+                    bx = self._make_box(index, key)
+                    self._init_box_controls(bx)
+                bx.index = index
+                set_widget_value(bx.widget, self._value[index])
+                boxes.append(bx)
+        for bx in existing.values():
+            self._release_box(bx)
+        self.boxes = boxes
+        self._update_boxes()
+        self.length = n
+        self.html_window.value = f"{min(start + 1, n)}-{min(stop, n)} of {n}"
+
+    def _set_rows_value(self, v):
+        if v != self._value:
+            self._set_validate_value(v)
+            if hasattr(self, "savebuttonbar"):
+                self.savebuttonbar.unsaved_changes = True
+
+    def _default_row_value(self):
+        bx = self._make_box(0, uuid.uuid4())
+        v = copy.deepcopy(getattr(bx.widget, "value", None))
+        self._release_box(bx)
+        return v
+
+    def _insert_index(self, key) -> int:
+        """the index of the row after `key`. if key=None then the end"""
+        if key is None:
+            return self.n_rows
+        if self.windowed:
+            return self.key_index[key] + 1
+        return self._get_box(key).index + 1
+
+    def _insert_rows(self, index, new_keys, values=None, add_kwargs=None, widgets=None):
+        """insert rows at index. the children are updated once. `_value` is not
+        updated (unless windowed)."""
+
+        def get_widget(n):
+            return None if widgets is None else widgets[n]
+
+        if self.windowed:
+            self.flush()  # i.e. `_value` is up-to-date with the widgets
+            boxes = []
+            if widgets is not None or add_kwargs:
+                boxes = [
+                    self._make_box(index + n, k, add_kwargs=add_kwargs, widget=get_widget(n))
+                    for n, k in enumerate(new_keys)
+                ]
+            if values is None:
+                if boxes:
+                    values = [getattr(bx.widget, "value", None) for bx in boxes]
+                else:
+                    v = self._default_row_value()
+                    values = [copy.deepcopy(v) for _ in new_keys]
+            for bx in self.boxes:
+                if bx.index >= index:
+                    bx.index += len(new_keys)
+        else:
+            boxes = [
+                self._make_box(index + n, k, add_kwargs=add_kwargs, widget=get_widget(n))
+                for n, k in enumerate(new_keys)
+            ]
+        if values is not None:
+            with self.silence_autoui_traits():
+                for bx, v in zip(boxes, values):
+                    set_widget_value(bx.widget, v)
+        [self._init_box_controls(bx) for bx in boxes]
+
+        if self.windowed:
+            self._boxes.extend(boxes)  # NOTE: placed in the window by `_render_window`
+            self.row_keys[index:index] = new_keys
+            self._reindex()
+            v = list(self._value)
+            v[index:index] = values
+            self._set_rows_value(v)
+            self.show_row(index)
+            self._render_window()
+        else:
+            self._boxes[index:index] = boxes
+            self._reindex()
+            self._update_boxes()
+
+    def _drop_rows(self, keys, fn_remove=None):
+        """remove rows. the children are updated once. `_value` is not updated
+        (unless windowed)."""
+        keys = set(keys)
+        if not keys:
+            return
+        removed = [bx for bx in self.boxes if bx.key in keys]
+        if fn_remove is not None:
+            [fn_remove(bx) for bx in removed]
+        if self.windowed:
+            self.flush()
+            self._boxes = [bx for bx in self.boxes if bx.key not in keys]
+            keep = [n for n, k in enumerate(self.row_keys) if k not in keys]
+            self.row_keys = [self.row_keys[n] for n in keep]
+            self._reindex()
+            for bx in self.boxes:
+                bx.index = self.key_index[bx.key]
+            self._set_rows_value([self._value[n] for n in keep])
+        else:
+            self.boxes = [bx for bx in self.boxes if bx.key not in keys]
+        [self._release_box(bx) for bx in removed]
+        if self.windowed:
+            self._render_window()
+        else:
+            self._update_boxes()
+
     def _update_widgets_from_value(self):
-        diff = len(self.value) - len(self.boxes)
-        if diff < 0:
-            self.boxes = self.boxes[0 : len(self.value)]
-        elif diff > 0:
-            for n in range(0, diff):
-                self.add_row(update_value=False)
-        for n, v in enumerate(self.value):
+        n = len(self.value)
+        if self.windowed:
+            self.row_keys = self.row_keys[:n] + [
+                uuid.uuid4() for _ in range(n - len(self.row_keys))
+            ]
+            self._reindex()
+            self._render_window()
+            return
+        if len(self.boxes) > n:
+            self._drop_rows([bx.key for bx in self.boxes[n:]])
+        elif len(self.boxes) < n:
+            self._insert_rows(
+                len(self.boxes), [uuid.uuid4() for _ in range(n - len(self.boxes))]
+            )
+        for bx, v in zip(self.boxes, self.value):
             try:
-                self.boxes[n].widget.value = v
+                set_widget_value(bx.widget, v)
             except Exception as e:
                 raise ValueError(
-                    f"{e}, widget-type={str(type(self.boxes[n].widget))}, value={v}, also, ",
+                    f"{e}, widget-type={str(type(bx.widget))}, value={v}, also, ",
                     f"\n value (len={len(self.value)} and widgets (len={len(self.widgets)}) must be same length",
                 )
-        self._update_boxes()
 
     @tr.validate("type")
     def _type(self, proposal):
@@ -249,15 +524,26 @@ class Array(w.VBox, WatchValidate):
     def __init__(self, **kwargs):
         self.vbx_widget = w.VBox()
         self.vbx_error = w.VBox()
+        self.pool = collections.deque(maxlen=kwargs.get("pool_size", 20))
+        self.pool_hits, self.pool_misses = 0, 0
 
         self.bn_add_from_zero = w.Button(**ADD_BUTTON_KWARGS)
         self.bn_add_from_zero.layout.display = "None"
         self.bx_boxes = w.Box()
+        self.row_keys = None
+        self.key_index = {}  # key: row index
+        self.bn_window_prev = w.Button(icon="chevron-left", layout={"width": BUTTON_WIDTH_MIN})
+        self.bn_window_next = w.Button(icon="chevron-right", layout={"width": BUTTON_WIDTH_MIN})
+        self.html_window = w.HTML()
+        self.hbx_window = w.HBox(
+            [self.bn_window_prev, self.html_window, self.bn_window_next],
+            layout={"display": "None"},
+        )
         self._init_form_controls()
         self.widgets = self._init_widgets(kwargs)
         self.bn_add_from_zero.layout.display = ""
         super().__init__(**traits_in_kwargs(type(self), kwargs))
-        self.vbx_widget.children = [self.bn_add_from_zero, self.bx_boxes]
+        self.vbx_widget.children = [self.bn_add_from_zero, self.bx_boxes, self.hbx_window]
 
         self.layout.border = "1px solid #00a3e0"
         self._set_children()
@@ -278,21 +564,35 @@ class Array(w.VBox, WatchValidate):
     def _init_form_controls(self):
         self.bx_boxes.observe(self.get_length, "children")
         self.bn_add_from_zero.on_click(self._append_row)
+        self.bn_window_prev.on_click(self._window_prev)
+        self.bn_window_next.on_click(self._window_next)
 
     def get_length(self, on_change):
-        self.length = len(self.boxes)
+        self.length = self.n_rows
+
+    def _get_box(self, key):
+        if self.windowed:  # NOTE: only rows in the window are built
+            return [bx for bx in self.boxes if bx.key == key][0]
+        n = self.key_index.get(key)
+        if n is None or n >= len(self.boxes) or self.boxes[n].key != key:
+            self._reindex()  # e.g. boxes mutated in place
+            n = self.key_index[key]
+        return self.boxes[n]
 
     def _get_attribute(self, key, get):
-        return [getattr(bx, get) for bx in self.boxes if bx.key == key][0]
+        return getattr(self._get_box(key), get)
 
     def _init_row_controls(self, key=None):
-        self._get_attribute(key, "bn_add").on_click(
-            functools.partial(self._add_row, key=key)
-        )
-        self._get_attribute(key, "bn_remove").on_click(
-            functools.partial(self._remove_rows, key=key)
-        )
-        widget = self._get_attribute(key, "widget")
+        self._init_box_controls(self._get_box(key))
+
+    def _init_box_controls(self, bx):
+        if getattr(bx, "controls_init", False):
+            return  # a recycled row
+        bx.controls_init = True
+        # NOTE: the key is read on click as recycled rows are given a new key
+        bx.bn_add.on_click(lambda onclick: self._add_row(onclick, key=bx.key))
+        bx.bn_remove.on_click(lambda onclick: self._remove_rows(onclick, key=bx.key))
+        widget = bx.widget
         for watch in ["_value", "value"]:
             if widget.has_trait(watch):
                 # widget.observe(self._update_value, names=watch)
@@ -308,12 +608,15 @@ class Array(w.VBox, WatchValidate):
             sort = sorted(self.boxes, key=lambda k: k.index)
         else:
             sort = sorted(self.boxes, key=lambda k: str(k.key))
-        for n, s in enumerate(sort):
-            s.index = n
-        self.boxes = sort
+        self.boxes = sort  # NOTE: setter renumbers the rows
 
     def _get_value(self):
         get = lambda w: w.value if hasattr(w, "value") else None
+        if self.windowed:
+            v = list(self._value)
+            for bx in self.boxes:
+                v[bx.index] = get(bx.widget)
+            return v
         return [get(bx.widget) for bx in self.boxes]
 
     # def _update_value(self, on_change):
@@ -321,11 +624,17 @@ class Array(w.VBox, WatchValidate):
     #         self._value = [bx.widget.value for bx in self.boxes]
 
     def _update_boxes(self):
-        self.bx_boxes.children = self.boxes
+        if self.windowed:
+            start, stop = self.window_start, self.window_start + self.window_size
+            self.bx_boxes.children = [bx for bx in self.boxes if start <= bx.index < stop]
+        else:
+            self.bx_boxes.children = self.boxes
 
     def _append_row(self, onclick):
         key = None
-        if len(self.boxes) > 0:
+        if self.windowed:
+            key = self.row_keys[-1] if self.row_keys else None
+        elif len(self.boxes) > 0:
             key = self.boxes[-1].key
         self.add_row(key=key)
 
@@ -338,72 +647,102 @@ class Array(w.VBox, WatchValidate):
         self, key=None, new_key=None, add_kwargs=None, widget=None, update_value=True
     ):
         """add row to array after key. if key=None then append to end"""
-        if self.max_items is not None and len(self.boxes) >= self.max_items:
+        self.extend_rows(
+            key=key,
+            new_keys=None if new_key is None else [new_key],
+            add_kwargs=add_kwargs,
+            widgets=None if widget is None else [widget],
+            update_value=update_value,
+        )
+
+    def extend_rows(
+        self,
+        values: ty.Optional[list] = None,
+        n: ty.Optional[int] = None,
+        key=None,
+        new_keys: ty.Optional[list] = None,
+        add_kwargs: ty.Optional[dict] = None,
+        widgets: ty.Optional[list] = None,
+        update_value: bool = True,
+    ) -> list:
+        """add many rows after key. if key=None then append to end. the children
+        and the value are updated once.
+
+        Args:
+            values (list, optional): values of the new rows. Defaults to None
+                (i.e. the default value of `fn_add()`).
+            n (int, optional): the number of rows. Defaults to the length of
+                `values`, `new_keys` or `widgets` if given, else 1.
+            key (optional): the rows are added after this row. Defaults to None.
+            new_keys (list, optional): keys of the new rows. Defaults to uuids.
+            add_kwargs (dict, optional): passed to `fn_add`. Defaults to None.
+            widgets (list, optional): widgets of the new rows (rather than calling
+                `fn_add`). Defaults to None.
+            update_value (bool, optional): update the value. Defaults to True.
+
+        Returns:
+            list: the keys of the added rows
+        """
+        given = [x for x in (values, new_keys, widgets) if x is not None]
+        if n is None:
+            n = len(given[0]) if given else 1
+        if any(len(x) != n for x in given):
+            raise ValueError("values, new_keys and widgets must be of length n")
+        if self.max_items is not None and self.n_rows + n > self.max_items:
             logging.warning(
                 f"ERROR: you can't have more that {self.max_items} items. len(self.boxes) >= self.max_items"
             )
-            return None
-
-        if key is None:
-            if len(self.boxes) == 0:
-                index = 0
-            else:
-                # append
-                key = self.boxes[-1].key
-                index = self._get_attribute(key, "index")
-        else:
-            index = self._get_attribute(key, "index")
-        if new_key is not None:
-            if new_key in [i.key for i in self.boxes]:
-                logger.warning(f"ERROR: {new_key} already exists in keys")
-                return None
+            n = max(0, self.max_items - self.n_rows)
+        if n == 0:
+            return []
+        if new_keys is not None:
+            dup = [k for k in new_keys[:n] if k in self.key_index]
+            if dup or len(set(new_keys[:n])) < n:
+                logger.warning(f"ERROR: {dup} already exists in keys")
+                return []
         else:
-            new_key = uuid.uuid4()
+            new_keys = [uuid.uuid4() for _ in range(n)]
 
-        if add_kwargs is None:
-            add_kwargs = {}
+        def cut(x):
+            return None if x is None else list(x[:n])
 
-        if widget is None:
-            new_obj = self.fn_add(**add_kwargs)
-        else:
-            new_obj = widget
+        new_keys, values, widgets = cut(new_keys), cut(values), cut(widgets)
 
-        bx = ItemBox(
-            index=index,
-            key=new_key,
-            widget=new_obj,
-            add_remove_controls=self.add_remove_controls,
+        self._insert_rows(
+            self._insert_index(key),
+            new_keys,
+            values=values,
+            add_kwargs=add_kwargs,
+            widgets=widgets,
         )
-        self.boxes.insert(index + 1, bx)
-        self._sort_boxes()  # update map
-        self._init_row_controls(bx.key)  # init controls
-        self._update_boxes()
-        # self._update_value("")
-        if update_value:
+        if update_value and not self.windowed:
             self._watch_validate_update_value()
+        return new_keys
 
     def _remove_rows(self, onclick, key=None):
         self.remove_row(key=key)
 
     def remove_row(self, key=None, fn_onremove=None):
-        if self.min_items is not None and len(self.boxes) <= self.min_items:
+        if key is None:
+            key = self.row_keys[-1] if self.windowed else self.boxes[-1].key
+        self.remove_rows_many([key])
+
+    def remove_rows_many(self, keys: list, update_value: bool = True):
+        """remove many rows. `fn_remove` is called for each row. the children and
+        the value are updated once."""
+        keys = [k for k in keys if k in self.key_index]
+        if self.min_items is not None and self.n_rows - len(keys) < self.min_items:
             logging.warning(
-                f"ERROR: you can't have more that {self.max_items} items. len(self.boxes) <= self.min_items"
+                f"ERROR: you can't have less that {self.min_items} items. len(self.boxes) <= self.min_items"
             )
             return None
-        if len(self.boxes) <= 1:
+        if not keys:
+            return None
+        if self.n_rows - len(keys) < 1:
             self.display_bn_add_from_zero(display=True)
-        if key is None:
-            print("key is None")
-            key = self.iterable[-1].key
-        n = self._get_attribute(key, "index")
-        bx = self.boxes[n]
-        self.fn_remove(bx)
-        self.boxes.pop(n)
-        self._sort_boxes()
-        self._update_boxes()
-        # self._update_value("")
-        self._watch_validate_update_value()
+        self._drop_rows(keys, fn_remove=self.fn_remove)
+        if update_value and not self.windowed:
+            self._watch_validate_update_value()
 
 
 class Dictionary(Array):
@@ -432,10 +771,23 @@ class Dictionary(Array):
         else:
             return {}
 
+    def _update_widgets_from_value(self):
+        removed = [bx.key for bx in self.boxes if bx.key not in self.value]
+        if removed:  # NOTE: as `Array`, `fn_remove` is only called from the UI
+            self._drop_rows(removed)
+        added = [k for k in self.value.keys() if k not in self.key_index]
+        if added:
+            self._insert_rows(len(self.boxes), added)
+        for k, v in self.value.items():
+            set_widget_value(self._get_box(k).widget, v)
+
 
 class AutoArray(Array):
     allOf = tr.List(allow_none=True, default_value=None)
     items = tr.Dict(allow_none=True, default_value=None)
+    blueprint = tr.Instance(
+        klass="ipyautoui.blueprint.UiBlueprint", default_value=None, allow_none=True
+    )
     prefix_items = tr.Dict(allow_none=True, default_value=None)
     # ^ TODO: add functionality: https://json-schema.org/understanding-json-schema/reference/array.html#id7
     #       : adds tuple functionality
@@ -451,9 +803,14 @@ class AutoArray(Array):
         else:
             raise ValueError("allOf not supported from iterables")
 
-    @tr.observe("items")
+    @tr.observe("items", "blueprint")
     def _items(self, on_change):
-        self.fn_add = functools.partial(get_widget, self.items)
+        if on_change["name"] == "items" and on_change["old"] is not None:
+            self.blueprint = None  # the schema has changed
+        if self.blueprint is not None and self.blueprint.items is not None:
+            self.fn_add = self.blueprint.items.widget
+        else:
+            self.fn_add = functools.partial(get_widget, self.items)
 
     @classmethod
     def from_schema(cls, schema, value=None):
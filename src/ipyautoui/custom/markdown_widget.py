@@ -8,6 +8,7 @@ import functools
 import traitlets as tr
 from IPython.display import Markdown, clear_output, display
 from ipyautoui._utils import frozenmap
+from ipyautoui._utils_debounce import Debounced
 
 # TODO: update the renderer to use pandoc and/or myst, thus getting extended syntax
 
@@ -128,7 +129,7 @@ def markdown_buttons():
     )
 
 
-class MarkdownWidget(w.VBox):
+class MarkdownWidget(w.VBox, Debounced):
     """a simple markdown widget for editing snippets of markdown text"""
 
     _value = tr.Unicode(allow_none=True)  # default=""
@@ -143,6 +144,7 @@ class MarkdownWidget(w.VBox):
 
     @property
     def value(self):
+        self.flush()
         return self._value
 
     @value.setter
@@ -176,7 +178,7 @@ class MarkdownWidget(w.VBox):
         self.children = [self.bx_buttons, self.bx_markdown]
 
     def _init_controls(self):
-        self.text.observe(self._text, names="value")
+        self.text.observe(self._observe_text, names="value")
         self.bn_help.observe(self._bn_help, names="value")
         for k, v in MAP_MARKDOWN.items():
             getattr(self, k).on_click(
@@ -195,6 +197,9 @@ class MarkdownWidget(w.VBox):
         else:
             self.bx_markdown.children = [self.text, self.rendered]
 
+    def _observe_text(self, onchange):
+        self.debounced(self._text)(onchange)  # i.e. render once when typing
+
     def _text(self, onchange):
         self._value = self.text.value
         with self.rendered:
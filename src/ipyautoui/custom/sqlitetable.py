@@ -0,0 +1,364 @@
+"""a table of rows in a local SQLite database. the table is generated from the json
+schema of a row. it is a reference implementation of a paged `DataHandler` for
+`EditGrid`, where sorting and filtering are done by the database.
+
+Example:
+
+    from ipyautoui.custom.sqlitetable import SqliteTable
+    from ipyautoui.custom.editgrid import EditGrid
+
+    table = SqliteTable("schedule.db", schema=Row, primary_key_name="id")
+    table.insert_many(rows)
+    grid = EditGrid(schema=Grid, datahandler=table.datahandler(), page_size=500)
+"""
+
+import json
+import pathlib
+import sqlite3
+import typing as ty
+import logging
+from pydantic import BaseModel
+
+from ipyautoui.custom.editgrid import DataHandler
+from ipyautoui.custom.edittsv import Changes
+
+logger = logging.getLogger(__name__)
+
+MAP_JSONSCHEMA_SQLITE_TYPE = {
+    "integer": "INTEGER",
+    "number": "REAL",
+    "boolean": "INTEGER",
+    "string": "TEXT",
+}
+#: ipydatagrid filter operators. `{c}` is the column
+MAP_FILTER_OPERATOR_SQL = {
+    "<": "{c} < ?",
+    ">": "{c} > ?",
+    "<=": "{c} <= ?",
+    ">=": "{c} >= ?",
+    "=": "{c} = ?",
+    "!=": "{c} IS NOT ?",
+    "empty": "{c} IS NULL",
+    "notempty": "{c} IS NOT NULL",
+    "between": "({c} > ? AND {c} < ?)",
+    "startswith": "substr({c}, 1, length(?1)) = ?1",
+    "endswith": "substr({c}, -length(?1)) = ?1",
+    "stringContains": "instr(lower(CAST({c} AS TEXT)), lower(?)) > 0",
+    "contains": "instr({c}, ?) > 0",
+    "!contains": "instr({c}, ?) = 0",
+}
+
+
+def get_property_type(schema: dict) -> ty.Optional[str]:
+    """get the json type of a property. nullable types (`anyOf` with null) are
+    unwrapped. returns None if there is no single type."""
+    if "type" in schema:
+        t = schema["type"]
+        if isinstance(t, list):
+            t = [x for x in t if x != "null"]
+            return t[0] if len(t) == 1 else None
+        return t
+    if "anyOf" in schema:
+        types = [get_property_type(s) for s in schema["anyOf"]]
+        types = [t for t in types if t != "null"]
+        return types[0] if len(types) == 1 else None
+    return None
+
+
+def get_row_properties(schema: ty.Union[dict, ty.Type[BaseModel]]) -> dict:
+    """get the properties of a row from the schema of a row or of an array of rows"""
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        schema = schema.model_json_schema()
+    defs = schema.get("$defs", {})
+    if "items" in schema:
+        schema = schema["items"]
+    if "$ref" in schema:
+        schema = defs[schema["$ref"].split("/")[-1]]
+    return schema["properties"]
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteTable:
+    """a table of rows in a SQLite database. columns of arrays and objects are stored
+    as json. the primary key is an `INTEGER PRIMARY KEY`, i.e. it is assigned by the
+    database if a row is posted without it, and it is the key of the table's b-tree
+    (so lookups by primary key need no other index).
+
+    Args:
+        path (pathlib.Path): the database file. ":memory:" for an in-memory database
+        schema (dict | BaseModel): json schema (or model) of a row or of the grid
+        primary_key_name (str): must be an integer property of the row
+        table_name (str): Defaults to "data".
+    """
+
+    def __init__(
+        self,
+        path: ty.Union[str, pathlib.Path],
+        schema: ty.Union[dict, ty.Type[BaseModel]],
+        primary_key_name: str = "id",
+        table_name: str = "data",
+    ):
+        self.path = path
+        self.primary_key_name = primary_key_name
+        self.table_name = table_name
+        self.properties = get_row_properties(schema)
+        if primary_key_name not in self.properties:
+            raise ValueError(f"primary_key_name `{primary_key_name}` not in schema")
+        self.column_types = {
+            k: get_property_type(v) for k, v in self.properties.items()
+        }
+        self.columns = list(self.properties.keys())
+        self.json_columns = [
+            k
+            for k, v in self.column_types.items()
+            if v not in MAP_JSONSCHEMA_SQLITE_TYPE
+        ]
+        self._json_indexes = [self.columns.index(k) for k in self.json_columns]
+        self.bool_columns = [k for k, v in self.column_types.items() if v == "boolean"]
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.create()
+
+    def create(self):
+        """create the table (if it doesn't exist)"""
+        cols = []
+        for k, t in self.column_types.items():
+            if k == self.primary_key_name:
+                cols.append(f"{quote(k)} INTEGER PRIMARY KEY")
+            else:
+                cols.append(f"{quote(k)} {MAP_JSONSCHEMA_SQLITE_TYPE.get(t, 'TEXT')}")
+        with self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote(self.table_name)} ({', '.join(cols)})"
+            )
+
+    def close(self):
+        self.connection.close()
+
+    # sql
+    # --------------------------------------------------------------------------
+    def _column(self, name: str) -> str:
+        if name not in self.properties:
+            raise ValueError(f"`{name}` is not a column of {self.table_name}")
+        return quote(name)
+
+    def _encode(self, row: dict) -> list:
+        values = [row.get(k) for k in self.columns]
+        for i in self._json_indexes:
+            if values[i] is not None:
+                values[i] = json.dumps(values[i])
+        return values
+
+    def _decode(self, values: tuple) -> dict:
+        row = dict(zip(self.columns, values))
+        for k in self.json_columns:
+            if row[k] is not None:
+                row[k] = json.loads(row[k])
+        for k in self.bool_columns:
+            if row[k] is not None:
+                row[k] = bool(row[k])
+        return row
+
+    def _where(self, filter: ty.Optional[list[dict]]) -> tuple[str, list]:
+        """`filter` is a list of {"field", "operator", "value"}. operators are those
+        of ipydatagrid filter transforms."""
+        if not filter:
+            return "", []
+        clauses, params = [], []
+        for f in filter:
+            op, value = f["operator"], f.get("value")
+            c = self._column(f["field"])
+            if op == "in":
+                value = list(value)
+                clauses.append(f"{c} IN ({', '.join('?' * len(value))})")
+                params += value
+            elif op in MAP_FILTER_OPERATOR_SQL:
+                sql = MAP_FILTER_OPERATOR_SQL[op].format(c=c)
+                if "?1" in sql:  # i.e. numbered parameter used twice
+                    sql = sql.replace("?1", f"?{len(params) + 1}")
+                    params.append(value)
+                elif op == "between":
+                    params += list(value)
+                elif "?" in sql:
+                    params.append(value)
+                clauses.append(sql)
+            else:
+                raise ValueError(f"filter operator `{op}` not supported")
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _order_by(self, sort: ty.Optional[list[dict]]) -> str:
+        """`sort` is a list of {"field", "desc"}. the primary key is always last such
+        that pages are stable."""
+        sort = list(sort or [])
+        terms = [
+            f"{self._column(s['field'])} {'DESC' if s.get('desc') else 'ASC'}"
+            for s in sort
+        ]
+        if self.primary_key_name not in [s["field"] for s in sort]:
+            terms.append(quote(self.primary_key_name))
+        return " ORDER BY " + ", ".join(terms)
+
+    # read
+    # --------------------------------------------------------------------------
+    def count(self, filter: ty.Optional[list[dict]] = None) -> int:
+        where, params = self._where(filter)
+        sql = f"SELECT COUNT(*) FROM {quote(self.table_name)}{where}"
+        return self.connection.execute(sql, params).fetchone()[0]
+
+    def get_page(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        sort: ty.Optional[list[dict]] = None,
+        filter: ty.Optional[list[dict]] = None,
+    ) -> list[dict]:
+        where, params = self._where(filter)
+        cols = ", ".join(quote(c) for c in self.columns)
+        sql = (
+            f"SELECT {cols} FROM {quote(self.table_name)}{where}{self._order_by(sort)}"
+            " LIMIT ? OFFSET ?"
+        )
+        rows = self.connection.execute(sql, params + [limit, offset])
+        return [self._decode(r) for r in rows]
+
+    def get_all(self) -> list[dict]:
+        return self.get_page(offset=0, limit=-1)
+
+    # write
+    # --------------------------------------------------------------------------
+    def _insert_sql(self, cols: list[str]) -> str:
+        return (
+            f"INSERT INTO {quote(self.table_name)} ({', '.join(quote(c) for c in cols)})"
+            f" VALUES ({', '.join('?' * len(cols))})"
+        )
+
+    def _without_key(self, row: dict) -> list:
+        values = self._encode(row)
+        del values[self.columns.index(self.primary_key_name)]
+        return values
+
+    def insert_many(self, rows: ty.Iterable[dict]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                self._insert_sql(self.columns), (self._encode(r) for r in rows)
+            )
+
+    def _post_many(self, rows: list[dict]) -> list[dict]:
+        sql = self._insert_sql([c for c in self.columns if c != self.primary_key_name])
+        inserted = []
+        for row in rows:
+            key = self.connection.execute(sql, self._without_key(row))
+            inserted.append(
+                {c: row.get(c) for c in self.columns}
+                | {self.primary_key_name: key.lastrowid}
+            )
+        return inserted
+
+    def post_many(self, rows: list[dict]) -> list[dict]:
+        """insert rows in one transaction. primary keys are assigned by the database.
+        returns the rows as inserted."""
+        with self.connection:
+            return self._post_many(rows)
+
+    def post(self, row: dict) -> int:
+        """insert a row. the primary key is assigned by the database. returns it."""
+        return self.post_many([row])[0][self.primary_key_name]
+
+    def _patch_many(self, rows: list[dict]) -> None:
+        by_cols = {}
+        for row in rows:
+            cols = tuple(
+                c
+                for c in row.keys()
+                if c in self.properties and c != self.primary_key_name
+            )
+            values = dict(zip(self.columns, self._encode(row)))
+            by_cols.setdefault(cols, []).append(
+                [values[c] for c in cols] + [row[self.primary_key_name]]
+            )
+        for cols, params in by_cols.items():
+            if not cols:
+                continue
+            sql = (
+                f"UPDATE {quote(self.table_name)}"
+                f" SET {', '.join(f'{quote(c)} = ?' for c in cols)}"
+                f" WHERE {quote(self.primary_key_name)} = ?"
+            )
+            self.connection.executemany(sql, params)
+
+    def patch_many(self, rows: list[dict]) -> list[dict]:
+        """update the rows with the same primary keys in one transaction. only the
+        fields given are updated."""
+        with self.connection:
+            self._patch_many(rows)
+        return rows
+
+    def patch(self, row: dict) -> None:
+        """update the row with the same primary key"""
+        self.patch_many([row])
+
+    def _delete_many(self, rows: list[ty.Union[dict, int]]) -> None:
+        keys = [[r[self.primary_key_name] if isinstance(r, dict) else r] for r in rows]
+        sql = (
+            f"DELETE FROM {quote(self.table_name)}"
+            f" WHERE {quote(self.primary_key_name)} = ?"
+        )
+        self.connection.executemany(sql, keys)
+
+    def delete_many(self, rows: list[ty.Union[dict, int]]) -> None:
+        """delete rows (or primary keys) in one transaction"""
+        with self.connection:
+            self._delete_many(rows)
+
+    def delete(self, row: ty.Union[dict, int]) -> None:
+        """delete a row (or primary key)"""
+        self.delete_many([row])
+
+    def copy_many(self, rows: list[dict]) -> list[dict]:
+        """insert copies of the rows with new primary keys"""
+        return self.post_many(rows)
+
+    def copy(self, row: dict) -> int:
+        """insert a copy of the row with a new primary key"""
+        return self.post(row)
+
+    def handle_crud(self, changes: Changes) -> None:
+        """Apply delete → insert → update in order, in one transaction. additions
+        are given new primary keys."""
+        with self.connection:
+            self._delete_many(changes.deletions)
+            self.connection.executemany(
+                self._insert_sql(
+                    [c for c in self.columns if c != self.primary_key_name]
+                ),
+                (self._without_key(r) for r in changes.additions),
+            )
+            self._patch_many(
+                [
+                    fields | {self.primary_key_name: key}
+                    for key, fields in changes.edits.items()
+                ]
+            )
+
+    def datahandler(self, **kwargs) -> DataHandler:
+        """get a DataHandler. kwargs override the defaults"""
+        return DataHandler(
+            **dict(
+                fn_get_all_data=self.get_all,
+                fn_post=self.post,
+                fn_patch=self.patch,
+                fn_delete=self.delete,
+                fn_copy=self.copy,
+                fn_post_many=self.post_many,
+                fn_patch_many=self.patch_many,
+                fn_delete_many=self.delete_many,
+                fn_copy_many=self.copy_many,
+                fn_get_page=self.get_page,
+                fn_count=self.count,
+                fn_io=self.handle_crud,
+                primary_key_name=self.primary_key_name,
+            )
+            | kwargs
+        )
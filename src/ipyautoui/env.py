@@ -15,6 +15,14 @@ class Env(BaseSettings):
         " Required for AutoDisplay to find relative paths to: pdfs, vega, ...",
     )
 
+    IPYAUTOUI_CACHEDIR: ty.Optional[pathlib.Path] = Field(
+        None,
+        description="opt-in. if set, compiled UI blueprints (normalised schema and"
+        " mapped widgets) are cached to this directory and reused across kernel"
+        " restarts. entries are invalidated when the schema or ipyautoui version"
+        " changes.",
+    )
+
     @field_validator("IPYAUTOUI_ROOTDIR")
     @classmethod
     def _IPYAUTOUI_ROOTDIR(cls, v):
@@ -81,8 +81,10 @@ class Nullable(w.HBox):
         return self._value
 
     def update_value(self, value):
+        from ipyautoui.watch_validate import set_widget_value
+
         self.bn.value = False
-        self.widget.value = value
+        set_widget_value(self.widget, value)
         # note. as the self.widget.value still exists in the background,
         #       this may not trigger a change event...
         #       so we'll manually do it too (below)
@@ -1,12 +1,18 @@
 import traitlets as tr
 import typing as ty
+import asyncio
+import functools
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import ipywidgets as w
 from IPython.display import clear_output
 import contextlib
-from pydantic import BaseModel, RootModel, ValidationError
+from pydantic import BaseModel, RootModel, ValidationError, TypeAdapter
+from pydantic.errors import PydanticUserError
 from jsonref import replace_refs
 import json
 import logging
+from ipyautoui._utils_debounce import Debounced
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,95 @@ def pydantic_validate(model: BaseModel, value, by_alias: bool = False, mode:str=
     return model.model_validate(value).model_dump(mode=mode, by_alias=by_alias)
 
 
+#: count of values assigned to (non-container) widgets by `set_widget_value`.
+#: keyed by widget class name. useful for checking that only changed widgets are set.
+WIDGET_ASSIGNMENTS = collections.Counter()
+
+
+def set_widget_value(widget, value) -> bool:
+    """set the value of a widget only if it has changed. returns True if set.
+    containers (e.g. AutoObject, Array, Nullable) diff the value against their own
+    children so only leaf widgets are counted in `WIDGET_ASSIGNMENTS`.
+    """
+    from ipyautoui.nullable import Nullable
+
+    try:
+        if widget.value == value:
+            return False
+    except Exception:  # e.g. comparing DataFrames
+        pass
+    widget.value = value
+    if not isinstance(widget, (WatchValidate, Nullable)):
+        WIDGET_ASSIGNMENTS[type(widget).__name__] += 1
+    return True
+
+
+#: worker used when `validate_in_thread=True`. a single worker such that superseded
+#: validations still waiting in the queue can be cancelled.
+VALIDATION_EXECUTOR = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="ipyautoui-validate"
+)
+
+
+def _validate(model, value) -> tuple[ty.Any, ty.Optional[ValidationError]]:
+    """returns the validated value, or the given value and the error"""
+    try:
+        return pydantic_validate(model, value), None
+    except ValidationError as e:
+        return value, e
+
+
+@functools.lru_cache(maxsize=128)
+def get_field_adapters(model: ty.Type[BaseModel]) -> ty.Optional[dict]:
+    """get a TypeAdapter for each field of a model such that fields can be validated
+    individually. fields with validators or serializers are excluded (these are
+    validated with the whole model). returns None if the model must always be
+    validated as a whole (e.g. it has model validators or computed fields).
+    keys are the field name and alias.
+    """
+    if issubclass(model, RootModel):
+        return None
+    decorators = model.__pydantic_decorators__
+    if (
+        decorators.model_validators
+        or decorators.model_serializers
+        or model.model_computed_fields
+    ):
+        return None
+    excluded = set()
+    for d in [*decorators.field_validators.values(), *decorators.field_serializers.values()]:
+        excluded |= set(d.info.fields)
+    if "*" in excluded:
+        return None
+
+    adapters = {}
+    for name, field in model.model_fields.items():
+        if name in excluded or field.exclude:
+            continue
+        t = ty.Annotated[field.annotation, field]
+        try:
+            adapter = TypeAdapter(t, config=model.model_config)
+        except PydanticUserError:  # config cannot be given for models, dataclasses, etc.
+            adapter = TypeAdapter(t)
+        adapters[name] = adapter
+        if field.alias is not None:
+            adapters[field.alias] = adapter
+    return adapters
+
+
+def get_error_paths(e: ValidationError, prefix: tuple = ()) -> dict:
+    """get validation errors keyed by field path. e.g. {("nested", "int_text"): msg}"""
+    return {prefix + tuple(err["loc"]): err["msg"] for err in e.errors()}
+
+
+def format_error_paths(model: ty.Type[BaseModel], errors: dict) -> str:
+    n = len(errors)
+    s = f"{n} validation error{'s' if n > 1 else ''} for {model.__name__}"
+    return s + "".join(
+        f"\n{'.'.join(str(p) for p in path)}\n  {msg}" for path, msg in errors.items()
+    )
+
+
 class _WatchSilent(tr.HasTraits):  # TODO: contains context manager for silencing traits
     pass
 
@@ -30,13 +125,18 @@ def summarize_di_callers(obj):  # : AutoObject
         return fn_item(obj.caller)
 
 
-class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
+class WatchValidate(Debounced):  # TODO: _WatchValidate
     error = tr.Unicode(default_value=None, allow_none=True)
+    errors = tr.Dict(default_value={})  # NOTE: keyed by field path. e.g. ("a", 0, "b")
+    incremental_validation = tr.Bool(default_value=True)
+    validate_in_thread = tr.Bool(default_value=False)
+    validation_pending = tr.Bool(default_value=False)
     schema = tr.Dict(default_value=None, allow_none=True)
     model = tr.Type(klass=BaseModel, default_value=None, allow_none=True)
     show_validation = tr.Bool(default_value=True)
     _value = tr.Any()  # TODO: update trait type on schema change
     _silent = tr.Bool(default_value=False)
+    _validation_count = 0  # i.e. validations started in a thread (or superseded)
 
     @contextlib.contextmanager
     def silence_autoui_traits(self):
@@ -64,6 +164,11 @@ class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
                     logging.error(self.error)
             self.is_valid.value = False
 
+    @tr.observe("validation_pending")
+    def _validation_pending(self, on_change):
+        if hasattr(self, "spinner_validation"):
+            self.spinner_validation.show = self.validation_pending
+
     @tr.observe("show_validation")
     def _show_validation(self, on_change):
         if hasattr(self, "out_error"):
@@ -74,16 +179,15 @@ class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
 
     @property
     def value(self):
+        self.flush()
         return self._value
 
     @value.setter
     def value(self, value: ty.Any):
         if self.model is not None:
-            try:
-                value = pydantic_validate(self.model, value)
-                self.error = None
-            except ValidationError as e:
-                self.error = str(e)
+            if not (self.validate_in_thread and self._validate_in_thread(value)):
+                value, e = _validate(self.model, value)
+                self._set_error(e)
         if value != self._value:
             with self.hold_trait_notifications():
                 # these means that change events will be squashed
@@ -104,14 +208,117 @@ class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
         else:
             return json.dumps(self.value, indent=4)
 
-    def _set_validate_value(self, v):  # this is called on change of the UI
-        if self.model is not None:
+    def _changed_fields(self, v) -> ty.Optional[list]:
+        """changed keys that can be validated individually. None if the whole model
+        must be validated."""
+        if not self.incremental_validation:
+            return None
+        adapters = get_field_adapters(self.model)
+        if adapters is None or not isinstance(v, dict) or not isinstance(self._value, dict):
+            return None
+        if v.keys() != self._value.keys():
+            return None
+        keys = [k for k, _v in v.items() if _v != self._value[k]]
+        if not keys or any(k not in adapters for k in keys):
+            return None
+        return keys
+
+    def _set_validate_fields(self, v, keys):
+        adapters = get_field_adapters(self.model)
+        errors = {p: m for p, m in self.errors.items() if not p or p[0] not in keys}
+        v_ = dict(v)
+        for k in keys:
             try:
-                v_ = pydantic_validate(self.model, v)
-                self.error = None
+                adapter = adapters[k]
+                v_[k] = adapter.dump_python(adapter.validate_python(v[k]), mode="json")
             except ValidationError as e:
-                self.error = str(e)
-                v_ = v
+                errors |= get_error_paths(e, prefix=(k,))
+        self.errors = errors
+        self.error = format_error_paths(self.model, errors) if errors else None
+        self._value = v_
+        if v_ != v:
+            with self.silence_autoui_traits():
+                # push validated value back to the changed widgets only
+                for k in keys:
+                    if v_[k] != v[k]:
+                        self._update_widget_from_value(k)
+
+    def _set_error(self, e: ty.Optional[ValidationError]):
+        if e is None:
+            self.errors = {}
+            self.error = None
+        else:
+            self.errors = get_error_paths(e)
+            self.error = str(e)
+
+    def _validate_in_thread(self, v) -> bool:
+        """validate on a worker thread and apply the result on the event loop.
+        pending validations are superseded. returns False if there is no running
+        event loop (the caller should validate synchronously)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._supersede_validation()
+        n = self._validation_count
+        self.validation_pending = True
+        future = VALIDATION_EXECUTOR.submit(_validate, self.model, v)
+        self._validation_future = future
+
+        def done(future):
+            try:
+                loop.call_soon_threadsafe(self._apply_validation, n, future)
+            except RuntimeError:  # loop closed
+                pass
+
+        future.add_done_callback(done)
+        return True
+
+    def _supersede_validation(self):
+        self._validation_count += 1
+        future = getattr(self, "_validation_future", None)
+        if future is not None:
+            future.cancel()  # if not yet started
+        self.validation_pending = False
+
+    def _apply_validation(self, n, future):
+        if n != self._validation_count or future.cancelled():
+            return  # superseded by a newer validation
+        self.validation_pending = False
+        try:
+            value, e = future.result()
+        except Exception as e:  # i.e. not a ValidationError
+            logger.exception("validation failed")
+            self.errors = {}
+            self.error = f"validation failed: {e!r}"
+            return
+        self._set_error(e)
+        if e is None and value != self._value:
+            with self.hold_trait_notifications():
+                self._value = value
+                with self.silence_autoui_traits():
+                    self._update_widgets_from_value()
+
+    def validate(self):
+        """validate the whole model (e.g. to run model validators). incremental
+        validation (see `incremental_validation`) only validates changed fields.
+        always synchronous."""
+        self._set_validate_value(self._value, incremental=False, thread=False)
+        return self.error is None
+
+    def _set_validate_value(self, v, incremental=True, thread=True):  # this is called on change of the UI
+        if self.model is not None:
+            keys = self._changed_fields(v) if incremental else None
+            if keys is not None:
+                self._set_validate_fields(v, keys)
+                return
+            if self.validate_in_thread:
+                if thread and self._validate_in_thread(v):
+                    self._value = v  # validated value applied when ready
+                    return
+                self._supersede_validation()
+            v_, e = _validate(self.model, v)
+            self._set_error(e)
             if v_ != v:
                 try:
                     with self.silence_autoui_traits():
@@ -144,7 +351,8 @@ class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
         message = f'change: {str(on_change["old"])} --> {str(on_change["new"])}'
         logger.info(message)
         if not self._silent:
-            self._watch_validate_update_value()
+            # NOTE: bursts of changes (e.g. typing) are validated once
+            self.debounced(self._watch_validate_update_value)()
 
     @classmethod
     def from_jsonschema(cls, schema: dict, value: ty.Any = None, **kwargs):
@@ -175,11 +383,11 @@ class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
         if not (issubclass(model, BaseModel) or issubclass(model, RootModel)):
             raise ValueError(f"schema must be a pydantic model, not {type(model)}")
         else:
-            schema = model.model_json_schema(by_alias=by_alias)
+            from ipyautoui.automapschema import _init_model_schema
+
+            _, schema = _init_model_schema(model, by_alias=by_alias)
             if "by_alias" in kwargs.keys():
                 by_alias = kwargs["by_alias"]
-            schema = replace_refs(schema, merge_props=True)
-            schema = {k: v for k, v in schema.items() if k != "$defs"}
         if value is not None:
             schema["value"] = value
         schema = {**schema, **kwargs}
@@ -194,7 +402,25 @@ class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
         if self.model is not None:
             self.out_error = w.Output()
             self.is_valid = w.Valid(value=True)
-            self.vbx_error.children = [self.is_valid, self.out_error]
+            self.hbx_valid = w.HBox([self.is_valid])
+            self.vbx_error.children = [self.hbx_valid, self.out_error]
+            self._init_spinner_validation()
+
+    @tr.observe("validate_in_thread")
+    def _init_spinner_validation(self, on_change=None):
+        # NOTE: validation is only pending (i.e. the spinner shown) if in a thread
+        if (
+            not self.validate_in_thread
+            or not hasattr(self, "hbx_valid")
+            or hasattr(self, "spinner_validation")
+        ):
+            return
+        from ipyautoui.custom.svgspinner import SvgSpinner
+
+        self.spinner_validation = SvgSpinner(
+            show=self.validation_pending, tooltip="validation pending"
+        )
+        self.hbx_valid.children = [self.is_valid, self.spinner_validation]
 
     @property
     def jsonschema_caller(self):
@@ -214,6 +440,11 @@ class WatchValidate(tr.HasTraits):  # TODO: _WatchValidate
         #       calling this method
         pass
 
+    def _update_widget_from_value(self, key):
+        # NOTE: update the widget of a single field. used by incremental validation.
+        #       override this method if the widget can be found by key.
+        self._update_widgets_from_value()
+
     def _get_value(self, **kwargs):
         # NOTE: fn name requried by WatchValidate base class
         pass  # NOTE: implement this method in your class
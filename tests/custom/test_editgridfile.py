@@ -0,0 +1,163 @@
+import json
+import typing as ty
+import pytest
+from pydantic import BaseModel, RootModel
+
+from ipyautoui.custom import editgridfile
+from ipyautoui.custom.editgridfile import JsonFileStore, EditGridFile, load_json
+from ipyautoui.custom.edittsv import Changes
+from ipyautoui.custom.sqlitetable import SqliteTable
+
+
+class Row(BaseModel):
+    id: int = 1
+    string: str = "string"
+    integer: int = 1
+
+
+class Grid(RootModel):
+    root: ty.List[Row]
+
+
+def make_file(tmp_path, n=5):
+    fpth = tmp_path / "data.json"
+    fpth.write_text(
+        json.dumps([dict(id=i, string=f"s{i}", integer=i) for i in range(1, n + 1)])
+    )
+    return fpth
+
+
+def test_store(tmp_path):
+    fpth = make_file(tmp_path)
+    store = JsonFileStore(fpth, compact_every=100)
+    assert store.add([{"id": 1, "string": "new", "integer": 0}])[0]["id"] == 6
+    store.edit({"2": {"string": "edited"}})
+    store.delete([3, {"id": 6}])
+    store.handle_crud(Changes(deletions=[1], edits={4: {"integer": -4}}))
+    value = store.get_all()
+    assert [r["id"] for r in value] == [2, 4, 5]
+    assert store.get(2)["string"] == "edited" and store.get(4)["integer"] == -4
+    assert len(load_json(fpth)) == 5  # i.e. not rewritten
+    assert len(store.fpth_log.read_text().splitlines()) == 5
+
+    with store.fpth_log.open("a") as f:
+        f.write('{"op": "delete", "ke')  # i.e. stopped mid write
+    store = JsonFileStore(fpth)
+    assert store.get_all() == value  # i.e. log replayed
+    assert store.n_logged == 0  # i.e. compacted
+
+
+def test_compact(tmp_path):
+    fpth = make_file(tmp_path)
+    store = JsonFileStore(fpth, compact_every=3)
+    store.add([{"string": "a"}])
+    store.delete([6])
+    assert store.fpth_log.exists() and len(load_json(fpth)) == 5
+    store.delete([5])  # i.e. compacts
+    assert load_json(fpth) == store.get_all()
+    assert [r["id"] for r in load_json(fpth)] == [1, 2, 3, 4]
+    assert store.n_logged == 0
+    assert list(tmp_path.glob("*.tmp")) == []
+    assert JsonFileStore(fpth).add([{"string": "b"}])[0]["id"] == 7  # i.e. not reused
+
+
+def test_editgridfile_patches_in_place(tmp_path):
+    fpth = make_file(tmp_path)
+    grid = EditGridFile(schema=Grid, fpth=fpth)
+    assert [v["id"] for v in grid.value] == [1, 2, 3, 4, 5]
+    grid.datahandler.fn_get_all_data = None  # i.e. fail if reloaded
+    grid.grid.selections = [{"r1": 0, "r2": 1, "c1": 0, "c2": 2}]
+    grid._delete_selected()
+    grid.grid.selections = [{"r1": 0, "r2": 0, "c1": 0, "c2": 2}]
+    grid._copy()
+    assert [v["id"] for v in grid.value] == [3, 4, 5, 6]
+    assert [r["id"] for r in JsonFileStore(fpth).get_all()] == [3, 4, 5, 6]
+
+
+def test_editgridfile_sqlite(tmp_path):
+    fpth = tmp_path / "data.db"
+    grid = EditGridFile(schema=Grid, fpth=fpth, page_size=2, page_prefetch=0)
+    assert isinstance(grid.store, SqliteTable) and grid.is_paged
+    grid.store.insert_many(json.loads(make_file(tmp_path).read_text()))
+    grid.handle_crud(
+        Changes(
+            deletions=[1],
+            edits={"2": {"string": "edited"}},
+            additions=[{"id": 1, "string": "new", "integer": 0}],
+        )
+    )
+    grid._reload_datahandler()
+    assert grid.n_rows == 5
+    assert list(grid.value) == [
+        dict(id=2, string="edited", integer=2),
+        dict(id=3, string="s3", integer=3),
+    ]
+    assert grid.store.get_page(4, 1)[0]["string"] == "new"  # i.e. new id
+    grid.store.close()
+
+
+def test_store_cache(tmp_path, monkeypatch):
+    fpth = make_file(tmp_path)
+    store = JsonFileStore(fpth)
+    store.edit({1: {"string": "edited"}})
+    monkeypatch.setattr(editgridfile, "load_json", lambda fpth: pytest.fail())
+    assert JsonFileStore(fpth).get_all() == store.get_all()  # i.e. not read
+    assert store.reload() is None and not store.is_modified
+
+    other = JsonFileStore(fpth)  # i.e. another process
+    other.add([{"string": "new"}])
+    other.delete([2])
+    other.edit({3: {"integer": -3}})
+    changes = store.reload()
+    assert changes.deletions == [2] and changes.additions == [other.get(6)]
+    assert changes.edits == {3: other.get(3)}
+    assert store.get_all() == other.get_all()
+
+
+def test_editgridfile_reloads_changes(tmp_path):
+    fpth = make_file(tmp_path)
+    grid = EditGridFile(schema=Grid, fpth=fpth)
+    data = grid.grid._data
+    grid._reload_all_data()
+    assert grid.grid._data is data  # i.e. unchanged, not reset
+
+    other = JsonFileStore(fpth)  # i.e. another process
+    other.delete([1])
+    other.edit({2: {"string": "edited"}})
+    other.add([{"string": "new", "integer": 6}])
+    grid._reload_all_data()  # i.e. as polled with `reload_interval`
+    assert list(grid.value) == other.get_all()
+    assert [v["id"] for v in grid.value] == [2, 3, 4, 5, 6]
+
+    other.edit({3: {"string": "edited"}})
+    other.add([{"string": "other", "integer": 7}])
+    grid.grid.selections = [{"r1": 2, "r2": 2, "c1": 0, "c2": 2}]  # i.e. id=4
+    grid._delete_selected()  # i.e. the store reads the changes by other first
+    grid._reload_all_data()
+    assert list(grid.value) == grid.store.get_all() == JsonFileStore(fpth).get_all()
+    strings = ["edited", "edited", "s5", "new", "other"]
+    assert [v["string"] for v in grid.value] == strings
+
+
+def test_stores_on_one_file(tmp_path):
+    fpth = make_file(tmp_path)
+    a, b = JsonFileStore(fpth), JsonFileStore(fpth)  # e.g. two kernels
+    assert a.add([{"string": "a"}])[0]["id"] == 6
+    assert b.add([{"string": "b"}])[0]["id"] == 7  # i.e. not 6 again
+    a.edit({7: {"integer": 7}})
+    b.compact()  # i.e. doesn't write a stale snapshot
+    rows = load_json(fpth)
+    assert rows == a.get_all() == b.get_all()
+    assert [r["string"] for r in rows[-2:]] == ["a", "b"] and rows[-1]["integer"] == 7
+
+
+def test_store_cache_copies_external(tmp_path):
+    fpth = make_file(tmp_path)
+    store = JsonFileStore(fpth)
+    JsonFileStore(fpth).delete([1])  # i.e. another process
+    store.edit({2: {"string": "edited"}})  # i.e. reads the delete first
+    cached = JsonFileStore(fpth)  # i.e. from the cache
+    assert cached._external == store._external == {"1": (1, True)}
+    assert cached._external is not store._external
+    _, changes = store.get_changes_since(store._signature)
+    assert changes.deletions == [1] and cached._external == {"1": (1, True)}
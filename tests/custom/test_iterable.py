@@ -0,0 +1,154 @@
+import ipywidgets as w
+from ipyautoui.custom.iterable import Array, AutoArray, Dictionary
+
+
+def make_array(**kwargs):
+    return Array(fn_add=lambda **kw: w.IntText(**kw), **kwargs)
+
+
+class TestPool:
+    def test_removed_rows_are_recycled(self):
+        arr = make_array()
+        for _ in range(3):
+            arr.add_row()
+        widgets = arr.widgets
+        arr.boxes[1].widget.value = 5
+        arr.remove_row(key=arr.boxes[1].key)
+        assert arr.pool_info["currsize"] == 1
+
+        arr.add_row()
+        assert arr.pool_info["hits"] == 1
+        assert arr.boxes[-1].widget is widgets[1]
+        assert arr.value == [0, 0, 0]  # recycled widget is reset
+
+        # the controls of a recycled row use its new key
+        arr.boxes[-1].bn_remove.click()
+        assert len(arr.boxes) == 2
+
+    def test_pool_is_bounded(self):
+        arr = make_array(pool_size=2)
+        for _ in range(5):
+            arr.add_row()
+        arr.value = []
+        assert arr.pool_info["currsize"] == 2
+        arr.pool_size = 0
+        assert arr.pool_info["currsize"] == 0
+
+    def test_auto_array_reload(self):
+        schema = {"type": "array", "items": {"type": "integer"}}
+        arr = AutoArray(**schema)
+        arr.value = list(range(10))
+        arr.value = []
+        arr.value = list(range(10))
+        assert arr.pool_info["hits"] == 10
+        assert arr.value == list(range(10))
+
+
+class TestWindow:
+    def test_only_window_is_built(self):
+        arr = make_array(window_size=10, overscan=2)
+        arr.value = list(range(1000))
+        assert len(arr.boxes) == 12
+        assert [bx.widget.value for bx in arr.bx_boxes.children] == list(range(10))
+        assert arr.length == 1000
+
+        arr.bn_window_next.click()
+        assert arr.window_start == 10
+        assert [bx.index for bx in arr.bx_boxes.children] == list(range(10, 20))
+        assert len(arr.boxes) == 14  # overscan either side
+
+        arr.bx_boxes.children[0].widget.value = -1  # edit in window
+        assert arr.value[10] == -1
+        assert arr.value[:10] == list(range(10))  # outside the window
+
+    def test_add_remove_on_full_list(self):
+        arr = make_array(window_size=10)
+        arr.value = list(range(100))
+        arr.window_start = 50
+        arr.add_row(key=arr.row_keys[4])  # outside the window
+        assert len(arr.value) == 101
+        assert arr.value[4:7] == [4, 0, 5]
+        assert arr.window_start == 0  # moved to show the new row
+
+        arr.remove_row(key=arr.row_keys[0])
+        assert arr.value[:3] == [1, 2, 3] and len(arr.value) == 100
+        arr.window_start = 90
+        arr.bx_boxes.children[-1].bn_remove.click()
+        assert arr.value[-1] == 98
+
+    def test_validation_of_full_list(self):
+        schema = {"type": "array", "items": {"type": "integer"}}
+        arr = AutoArray(window_size=5, **schema)
+        arr.value = list(range(50))
+        assert len(arr.boxes) == 7
+        arr.window_size = None  # build all rows
+        assert len(arr.boxes) == 50
+        assert arr.value == list(range(50))
+
+
+class TestBulk:
+    def test_extend_rows(self):
+        arr = make_array()
+        arr.add_row()
+        n_children, n_values = [], []
+        arr.bx_boxes.observe(lambda c: n_children.append(c), "children")
+        arr.observe(lambda c: n_values.append(c), "_value")
+        keys = arr.extend_rows(values=list(range(1, 101)))
+        assert len(keys) == 100
+        assert arr.value == list(range(101))
+        assert len(n_children) == 1 and len(n_values) == 1
+
+        arr.extend_rows(values=[-1, -2], key=arr.boxes[0].key)  # insert
+        assert arr.value[:4] == [0, -1, -2, 1]
+        assert [bx.index for bx in arr.boxes] == list(range(103))
+        assert all(arr.key_index[bx.key] == bx.index for bx in arr.boxes)
+
+    def test_extend_rows_max_items(self):
+        arr = make_array(max_items=3)
+        arr.extend_rows(n=5)
+        assert arr.value == [0, 0, 0]
+        assert arr.extend_rows(new_keys=["a"]) == []
+
+    def test_remove_rows_many(self):
+        arr = make_array()
+        arr.value = list(range(10))
+        n_children = []
+        arr.bx_boxes.observe(lambda c: n_children.append(c), "children")
+        removed = []
+        arr.fn_remove = lambda bx: removed.append(bx.widget.value)
+        arr.remove_rows_many([bx.key for bx in arr.boxes[::2]])
+        assert arr.value == [1, 3, 5, 7, 9]
+        assert removed == [0, 2, 4, 6, 8]
+        assert len(n_children) == 1
+        assert arr._get_attribute(arr.boxes[2].key, "index") == 2
+
+    def test_set_value_in_one_update(self):
+        arr = make_array()
+        n_children = []
+        arr.bx_boxes.observe(lambda c: n_children.append(c), "children")
+        arr.value = list(range(50))
+        arr.value = list(range(20))
+        assert len(n_children) == 2
+        assert [bx.widget.value for bx in arr.boxes] == list(range(20))
+
+    def test_dictionary(self):
+        di = Dictionary(fn_add=lambda **kw: w.IntText(**kw))
+        di.value = {"b": 2, "a": 1}
+        assert [bx.key for bx in di.boxes] == ["a", "b"]  # sorted on key
+        di.value = {"c": 3, "a": 0}  # NOTE: dict values are merged
+        assert di.value == {"a": 0, "b": 2, "c": 3}
+        assert di._get_box("c").index == 2
+
+    def test_set_value_does_not_call_fn_remove(self):
+        removed = []
+        arr = make_array()
+        arr.fn_remove = lambda bx: removed.append(bx.key)
+        arr.value = [1, 2, 3]
+        arr.value = [1]
+        di = Dictionary(fn_add=lambda **kw: w.IntText(**kw))
+        di.fn_remove = lambda bx: removed.append(bx.key)
+        di.value = {"a": 1, "b": 2}
+        di._value = {"a": 1}
+        di._update_widgets_from_value()
+        assert [bx.key for bx in di.boxes] == ["a"]
+        assert removed == []
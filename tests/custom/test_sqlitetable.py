@@ -0,0 +1,147 @@
+import typing as ty
+import pytest
+from pydantic import BaseModel, RootModel, Field
+
+from ipyautoui.custom.editgrid import EditGrid
+from ipyautoui.custom.sqlitetable import SqliteTable
+from ipyautoui.custom.edittsv import Changes
+
+
+class Row(BaseModel):
+    id: int = 0
+    name: str = "name"
+    value: float = 0.0
+    tags: list[str] = Field(default_factory=list)
+    ok: bool = True
+    note: ty.Optional[str] = None
+
+
+class Grid(RootModel):
+    root: ty.List[Row]
+
+
+def get_rows(n):
+    return (
+        dict(
+            id=i,
+            name=f"n{i:07}",
+            value=i / 2,
+            tags=[str(i % 3)],
+            ok=i % 2 == 0,
+            note=None,
+        )
+        for i in range(n)
+    )
+
+
+@pytest.fixture
+def table(tmp_path):
+    table = SqliteTable(tmp_path / "data.db", schema=Grid)
+    table.insert_many(get_rows(20))
+    yield table
+    table.close()
+
+
+def test_crud(table):
+    assert table.json_columns == ["tags"]
+    assert table.get_page(0, 1)[0] == dict(
+        id=0, name="n0000000", value=0.0, tags=["0"], ok=True, note=None
+    )
+    key = table.post(Row(name="new").model_dump())
+    assert key == 20 and table.count() == 21
+    table.patch({"id": key, "name": "patched"})
+    assert table.get_page(20, 1)[0]["name"] == "patched"
+    table.delete({"id": key})
+    table.delete(0)
+    assert table.count() == 19
+
+
+def test_sort_filter(table):
+    sort = [{"field": "value", "desc": True}]
+    assert [r["id"] for r in table.get_page(0, 3, sort=sort)] == [19, 18, 17]
+    filter = [
+        {"field": "value", "operator": "between", "value": [2, 8]},
+        {"field": "name", "operator": "endswith", "value": "5"},
+    ]
+    assert [r["id"] for r in table.get_page(0, 10, filter=filter)] == [5, 15]
+    assert table.count(filter) == 2
+    filter = [{"field": "id", "operator": "in", "value": [1, 2]}]
+    assert table.count(filter) == 2
+    with pytest.raises(ValueError):
+        table.count([{"field": "id; DROP TABLE data", "operator": "=", "value": 1}])
+
+
+def test_editgrid_pages_1m_rows(tmp_path):
+    n = 1_000_000
+    table = SqliteTable(tmp_path / "data.db", schema=Grid)
+    with table.connection:  # i.e. get_rows(n) generated by sqlite
+        table.connection.execute(
+            "WITH RECURSIVE s(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM s WHERE i < ?)"
+            " INSERT INTO data SELECT i, printf('n%07d', i), i / 2.0,"
+            " json_array(CAST(i % 3 AS TEXT)), i % 2 = 0, NULL FROM s",
+            [n - 1],
+        )
+    assert table.get_page(7, 1) == list(get_rows(8))[7:]
+    calls = []
+    datahandler = table.datahandler()
+    get_page = datahandler.fn_get_page
+    datahandler.fn_get_page = lambda *args: calls.append(args[:2]) or get_page(*args)
+    datahandler.fn_get_all_data = None  # i.e. fail if all the data is loaded
+
+    grid = EditGrid(
+        schema=Grid, datahandler=datahandler, page_size=100, page_prefetch=100
+    )
+    assert grid.n_rows == n
+    assert len(grid.value) == 100 and grid.value[0]["id"] == 0
+    assert calls == [(0, 200)]
+    grid._page_next(None)
+    assert grid.value[0]["id"] == 100
+    assert len(calls) == 1  # i.e. from the prefetched rows
+    grid.load_page(n - 50)
+    assert [v["id"] for v in grid.value] == list(range(n - 50, n))
+    assert grid.html_page.value == f"{n - 49}-{n} of {n}"
+
+    grid.grid.transform([{"type": "sort", "columnIndex": 1, "desc": True}])
+    assert grid.page_offset == 0
+    assert grid.value[0]["id"] == n - 1
+    grid.grid.transform(
+        [{"type": "filter", "columnIndex": 3, "operator": "<", "value": 10}]
+    )
+    assert grid.n_rows == 20
+    assert [v["id"] for v in grid.value] == list(range(20))
+
+    table.post(Row(name="new", value=n).model_dump())
+    grid._reload_datahandler()
+    assert grid.n_rows == 20  # i.e. still filtered
+    grid.grid.transform([])
+    assert grid.n_rows == n + 1
+    table.close()
+
+
+def test_many(table):
+    rows = table.post_many([Row(name="a").model_dump(), Row(name="b").model_dump()])
+    assert [(r["id"], r["name"]) for r in rows] == [(20, "a"), (21, "b")]
+    table.patch_many([{"id": 20, "name": "A"}, {"id": 1, "value": -1.0}])
+    assert table.get_page(1, 1)[0]["value"] == -1.0
+    assert table.get_page(20, 1)[0]["name"] == "A"
+    table.delete_many(rows + [0])
+    assert table.count() == 19
+
+
+def test_handle_crud(table):
+    changes = Changes(
+        deletions=[0, 1],
+        edits={2: {"name": "edited"}, "3": {"value": -1.0}},
+        additions=[Row(id=2, name="new").model_dump()],
+    )
+    table.handle_crud(changes)
+    assert table.count() == 19
+    assert [(r["id"], r["name"]) for r in table.get_page(0, 1)] == [(2, "edited")]
+    assert table.get_page(1, 1)[0]["value"] == -1.0
+    assert table.get_page(18, 1)[0] | {"id": 0} == Row(name="new").model_dump()
+    assert table.get_page(18, 1)[0]["id"] == 20
+
+    bad = Row().model_dump() | {"tags": {"not json"}}
+    with pytest.raises(TypeError):  # i.e. rolled back
+        table.handle_crud(Changes(deletions=[2], additions=[bad]))
+    assert table.count() == 19
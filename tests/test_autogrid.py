@@ -5,7 +5,7 @@ import typing as ty
 from datetime import datetime
 from pydantic import BaseModel, Field, RootModel
 
-from ipyautoui.custom.autogrid import AutoGrid, GridSchema
+from ipyautoui.custom.autogrid import AutoGrid, GridSchema, fill_with_defaults
 from ipyautoui.automapschema import _init_model_schema
 from ipyautoui.demo_schemas.editable_datagrid import EditableGrid, DATAGRID_TEST_VALUE
 
@@ -767,3 +767,171 @@ class TestAutoGrid:
         json_schema_copy.pop("$defs", None)
         # Now compare the modified copies
         assert schema_copy == json_schema_copy
+
+    @pytest.mark.parametrize("transposed", [False, True])
+    def test_set_values_in_one_update(self, transposed: bool):
+        value = [
+            dict(id=n, string=f"s{n}", integer=n, floater=1.5, something_else=1)
+            for n in range(3)
+        ]
+        grid = AutoGrid(
+            schema=EditableGrid, data=pd.DataFrame(value), transposed=transposed
+        )
+        messages = []
+        grid._notify_cell_change = lambda *args: messages.append(args)
+        grid._notify_row_change = lambda *args: messages.append(args)
+        count_changes = grid.count_changes
+
+        new = value[1] | dict(string="new", integer=10)
+        if transposed:
+            changes = grid.set_col_value(1, new)
+        else:
+            changes = grid.set_row_value(1, new)
+        assert len(messages) == (2 if transposed else 1)  # i.e. one per changed row
+        assert grid.count_changes == count_changes + 2
+        assert [(c["column_name"], c["old_value"], c["new_value"]) for c in changes] == (
+            [("String", "s1", "new"), ("Integer", 1, 10)]
+            if not transposed
+            else [(1, "s1", "new"), (1, 1, 10)]
+        )
+        assert grid.records()[1] == new
+        assert grid.set_item_value(1, new) == []
+
+    def test_set_row_values(self):
+        value = [
+            dict(id=n, string=f"s{n}", integer=n, floater=1.5, something_else=1)
+            for n in range(4)
+        ]
+        grid = AutoGrid(schema=EditableGrid, data=pd.DataFrame(value))
+        new = pd.DataFrame([value[0] | dict(integer=-1), value[3] | dict(floater=0.5)])
+        changes = grid.set_row_values(new, index=[0, 3])
+        assert [(c["primary_key_value"], c["new_value"]) for c in changes] == [
+            (0, -1),
+            (3, 0.5),
+        ]
+        assert grid.records()[3]["floater"] == 0.5
+        with pytest.raises(ValueError):
+            grid.set_row_values([value[0]], index=[10])
+
+    def test_set_row_values_lists(self):
+        class Row(BaseModel):
+            a: int = 1
+            tags: list[str] = []
+
+        class Grid(RootModel):
+            root: ty.List[Row]
+
+        grid = AutoGrid(
+            schema=Grid, data=pd.DataFrame([dict(a=1, tags=["x"]), dict(a=2, tags=[])])
+        )
+        grid.records()  # i.e. cached
+        new = pd.DataFrame([dict(a=5, tags=["z"]), dict(a=2, tags=["y", "w"])])
+        changes = grid.set_row_values(new, index=[0, 1])
+        assert grid.records() == [dict(a=5, tags=["z"]), dict(a=2, tags=["y", "w"])]
+        assert grid.records() == grid._get_records()
+        assert all(type(c["primary_key_value"]) is int for c in changes)
+
+    def test_records_cached(self):
+        value = [
+            dict(id=n, string=f"s{n}", integer=n, floater=1.5, something_else=1)
+            for n in range(3)
+        ]
+        grid = AutoGrid(schema=EditableGrid, data=pd.DataFrame(value))
+        records = grid.records()
+        assert grid.records(keys_as_title=True)[0]["String"] == "s0"
+        grid._get_records = None  # i.e. fail if rebuilt
+        grid.set_cell_value("Integer", 1, 10)
+        assert grid.records()[1] == value[1] | dict(integer=10)
+        assert grid.records(keys_as_title=True)[1]["Integer"] == 10
+        assert records[1]["integer"] == 1  # copy on write
+        records = grid.records()
+        records[0]["integer"] = -1  # i.e. mutating the result ...
+        records.pop()
+        assert grid.records()[0]["integer"] == 0  # ... does not change the cache
+        assert len(grid.records()) == 3
+
+        del grid._get_records
+        grid.data = grid._init_data(pd.DataFrame(value[:2]))  # clears the cache
+        assert grid.records() == value[:2]
+
+
+def test_fill_with_defaults():
+    data = pd.DataFrame(
+        {
+            "a": [1.0, None, 3.0],
+            "b": ["x", None, float("nan")],
+            "c": [[1], [None], None],
+            "d": [None, 2, None],
+        }
+    )
+    filled = fill_with_defaults(data, {"a": 0, "b": "default", "c": [0], "d": None})
+    assert filled["a"].tolist() == [1.0, 0.0, 3.0]
+    assert filled["b"].tolist() == ["x", "default", "default"]
+    assert filled["c"].tolist() == [[1], [0], [0]]  # list of missing is missing
+    assert filled["d"].isna().tolist() == [True, False, True]  # no default
+    assert data["a"].isna().sum() == 1  # input not modified
+
+
+def test_gridschema_cached(monkeypatch):
+    from ipyautoui.custom import autogrid
+
+    built = []
+    init = GridSchema.__init__
+    monkeypatch.setattr(
+        GridSchema, "__init__", lambda self, *a, **k: built.append(1) or init(self, *a, **k)
+    )
+    autogrid.GRIDSCHEMA_CACHE.clear()
+
+    class A(BaseModel):
+        a: int = 1
+
+    class B(BaseModel):
+        b: str = "b"
+
+    class GridA(RootModel):
+        root: ty.List[A]
+
+    class GridB(RootModel):
+        root: ty.List[B]
+
+    grid = AutoGrid(schema=GridA, global_decimal_places=2)
+    gridschema = grid.gridschema
+    grid.update_from_schema(GridB)
+    grid.update_from_schema(GridA, global_decimal_places=2)
+    assert len(built) == 2
+    column_widths = gridschema.column_widths
+    assert grid.gridschema.column_widths is column_widths  # i.e. from the cache
+    assert grid.global_decimal_places == 2
+    other = AutoGrid(schema=GridA, global_decimal_places=2).gridschema
+    assert other.column_widths is column_widths
+    assert other.schema == gridschema.schema
+    assert other.schema is not gridschema.schema  # i.e. not aliased
+    other = AutoGrid(schema=GridA).gridschema  # kwargs differ
+    assert other.column_widths is not column_widths
+
+    _, schema = _init_model_schema(GridA)
+    autogrid.get_gridschema(schema)
+    autogrid.get_gridschema(schema)
+    assert "datagrid_index_name" not in schema  # i.e. not mutated
+
+
+def test_gridschema_datagrid_traits():
+    from ipydatagrid import TextRenderer
+    from ipyautoui.custom import autogrid
+
+    class A(BaseModel):
+        a: float = 1.5
+
+    class GridA(RootModel):
+        root: ty.List[A]
+
+    autogrid.GRIDSCHEMA_CACHE.clear()
+    renderer = TextRenderer()
+    grid = AutoGrid(schema=GridA, global_decimal_places=2, renderers={"a": renderer})
+    traits = grid.gridschema.datagrid_traits
+    assert traits["global_decimal_places"] == 2
+    other = AutoGrid(schema=GridA, global_decimal_places=2, renderers={"a": renderer})
+    assert other.gridschema._datagrid_traits is grid.gridschema._datagrid_traits
+    # ^ i.e. shared via the cache entry
+    cached, values = next(iter(autogrid.GRIDSCHEMA_CACHE._data.values()))
+    assert {"a": renderer} in values  # i.e. identity-keyed kwargs kept alive
@@ -2,10 +2,21 @@ import pytest
 import pathlib
 import sys
 from pytest_examples import find_examples, CodeExample, EvalExample
+import copy
+import ipywidgets as w
 from ipyautoui.automapschema import (
     _init_model_schema,
     map_widget,
+    get_widgets_map,
+    get_dispatch_key,
+    compile_widgets_map,
+    find_matches,
+    find_matches_linear,
+    WidgetMapper,
+    SCHEMA_CACHE,
+    invalidate_schema_cache,
 )
+from ipyautoui import demo_schemas
 import casefy
 from pydantic import BaseModel, Field, conint
 from ipyautoui.demo_schemas import (
@@ -322,4 +333,95 @@ def test_pydantic_model_from_json_schema_project_building_area_int_enum():
         ]
     )
     
-    assert validated, validated_string_date
\ No newline at end of file
+    assert validated, validated_string_date
+
+def iter_property_schemas(di, visited=None):
+    """yield all property schemas in a (ref resolved) schema. stops on recursion."""
+    if visited is None:
+        visited = set()
+    if id(di) in visited:
+        return
+    visited.add(id(di))
+    for v in di.get("properties", {}).values():
+        yield v
+        yield from iter_property_schemas(v, visited)
+    if isinstance(di.get("items"), dict):
+        yield di["items"]
+        yield from iter_property_schemas(di["items"], visited)
+    for l in di.get("anyOf", []):
+        yield from iter_property_schemas(l, visited)
+
+
+@pytest.mark.parametrize(
+    "model", [getattr(demo_schemas, n) for n in dir(demo_schemas) if n[0].isupper()]
+)
+def test_find_matches_same_as_linear_scan(model):
+    widgets_map = get_widgets_map()
+    _, schema = _init_model_schema(model)
+    for di in [schema, *iter_property_schemas(schema)]:
+        di_linear, di_index = copy.deepcopy(di), copy.deepcopy(di)
+        try:
+            target = find_matches_linear(di_linear, widgets_map)
+        except Exception as e:
+            with pytest.raises(type(e)):
+                find_matches(di_index, widgets_map)
+            continue
+        assert find_matches(di_index, widgets_map) == target
+        assert di_index.keys() == di_linear.keys()
+
+
+def test_find_matches_custom_filter():
+    is_Custom = lambda di, **kwargs: ("custom" in di, False)
+    widgets_map = get_widgets_map(
+        {"Custom": WidgetMapper(fn_filt=is_Custom, widget=w.Text)}
+    )
+    di = {"type": "integer", "custom": True}
+    assert find_matches(di, widgets_map) == find_matches_linear(di, widgets_map)
+    assert "Custom" in compile_widgets_map(widgets_map).candidates(
+        get_dispatch_key(di)
+    )
+    with pytest.raises(ValueError):
+        map_widget(di, widgets_map=widgets_map, fail_on_error=True)
+
+
+def test_compile_widgets_map_cached():
+    widgets_map = get_widgets_map()
+    index = compile_widgets_map(widgets_map)
+    assert compile_widgets_map(widgets_map) is index  # i.e. by identity
+    assert compile_widgets_map(get_widgets_map()) is index  # i.e. equal maps
+
+
+class TestSchemaCache:
+    def test_model_cached(self):
+        invalidate_schema_cache()
+        SCHEMA_CACHE.clear()
+        _init_model_schema(CoreIpywidgets)
+        assert SCHEMA_CACHE.info()["misses"] == 1
+        model, schema = _init_model_schema(CoreIpywidgets)
+        assert model is CoreIpywidgets
+        assert SCHEMA_CACHE.info()["hits"] == 1
+        _init_model_schema(CoreIpywidgets, by_alias=True)
+        assert SCHEMA_CACHE.info()["misses"] == 2
+
+    def test_returns_copy(self):
+        _, schema = _init_model_schema(CoreIpywidgets)
+        schema["properties"]["int_slider"]["title"] = "mutated"
+        del schema["title"]
+        _, schema1 = _init_model_schema(CoreIpywidgets)
+        assert schema1["properties"]["int_slider"]["title"] != "mutated"
+        assert "title" in schema1
+
+    def test_json_schema_cached(self):
+        di = RootEnum.model_json_schema()
+        _, schema = _init_model_schema(di)
+        hits = SCHEMA_CACHE.hits
+        _, schema1 = _init_model_schema(copy.deepcopy(di))
+        assert SCHEMA_CACHE.hits == hits + 1
+        assert schema == schema1
+        assert "$defs" not in schema1
+
+    def test_invalidate(self):
+        _init_model_schema(CoreIpywidgets)
+        assert (CoreIpywidgets, False) in SCHEMA_CACHE
+        invalidate_schema_cache(CoreIpywidgets)
+        assert (CoreIpywidgets, False) not in SCHEMA_CACHE
@@ -245,3 +245,55 @@ def test_non_nullable_have_values():
     assert ui.value == {"a": "TEST", "b": "B"}
     ui.value = {"b": "TEST"}
     assert ui.value == {"a": "A", "b": "TEST"}
+
+
+class TestLazy:
+    @staticmethod
+    def deep_model(levels=6):
+        class Leaf(BaseModel):
+            a: int = 1
+            b: str = "x"
+
+        model = Leaf
+        for n in range(levels):
+            model = type(
+                f"Level{n}",
+                (BaseModel,),
+                {"__annotations__": {"a": int, "child": model}, "a": 1},
+            )
+        return model
+
+    def test_lazy_builds_on_expand(self):
+        import ipywidgets as w
+        from ipyautoui.autoobject import LazyWidget
+
+        model = self.deep_model()
+        n = len(w.Widget.widgets)
+        eager = AutoObject.from_pydantic_model(model)
+        n_eager = len(w.Widget.widgets) - n
+        n = len(w.Widget.widgets)
+        ui = AutoObject.from_pydantic_model(model, lazy=True)
+        n_lazy = len(w.Widget.widgets) - n
+
+        assert n_lazy < n_eager / 4
+        assert ui.lazy_keys == ["child"]
+        assert ui.value == eager.value
+
+        ui.di_boxes["child"].tgl.value = True
+        child = ui.di_widgets["child"]
+        assert not isinstance(child, LazyWidget)
+        assert child.lazy is True and child.lazy_keys == ["child"]
+        child.di_widgets["a"].value = 3
+        assert ui.value["child"]["a"] == 3
+
+    def test_lazy_keeps_value_and_validates(self):
+        model = self.deep_model(2)
+        ui = AutoObject.from_pydantic_model(model, lazy=True)
+        v = {"a": 1, "child": {"a": 5, "child": {"a": 1, "b": "x"}}}
+        ui.value = v
+        assert ui.lazy_keys == ["child"]
+        assert ui.value["child"]["a"] == 5
+        assert ui.build_lazy("child").di_widgets["a"].value == 5
+
+        ui.value = v | {"child": v["child"] | {"a": "not an int"}}
+        assert ui.error is not None
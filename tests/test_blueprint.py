@@ -0,0 +1,105 @@
+import pytest
+import ipyautoui.automapschema as aumap
+from ipyautoui.autoui import get_autoui, get_autoui_class
+from ipyautoui.autoobject import AutoObject
+from ipyautoui.blueprint import (
+    get_blueprint,
+    BLUEPRINT_CACHE,
+    BLUEPRINT_DISK_CACHE,
+)
+from ipyautoui.demo_schemas import CoreIpywidgets, Nested, ArrayObjectDataframe
+
+
+def disable_mapping(monkeypatch):
+    """raise if map_widget searches the widgets_map"""
+
+    def find_matches(*args, **kwargs):
+        raise AssertionError("map_widget called")
+
+    monkeypatch.setattr(aumap, "find_matches", find_matches)
+
+
+def test_get_blueprint_cached():
+    _, schema = aumap._init_model_schema(Nested)
+    bp = get_blueprint(schema)
+    assert get_blueprint(schema) is bp
+    assert BLUEPRINT_CACHE.info()["hits"] > 0
+    assert bp.is_container
+    assert set(bp.properties.keys()) == set(schema["properties"].keys())
+
+
+@pytest.mark.parametrize("model", [CoreIpywidgets, Nested, ArrayObjectDataframe])
+def test_autoui_from_blueprint_maps_nothing(model, monkeypatch):
+    ui = get_autoui(model)
+    ui0 = AutoObject.from_pydantic_model(model)  # no blueprint
+    disable_mapping(monkeypatch)
+    ui1, ui2 = ui(), ui()
+    assert ui1.value == ui2.value == ui0.value
+    assert ui1.di_widgets.keys() == ui0.di_widgets.keys()
+    assert [type(v).__name__ for v in ui1.di_widgets.values()] == [
+        type(v).__name__ for v in ui0.di_widgets.values()
+    ]
+
+
+def test_array_rows_from_blueprint(monkeypatch):
+    ui = get_autoui(ArrayObjectDataframe)()
+    disable_mapping(monkeypatch)
+    arr = ui.di_widgets["auto_array"]
+    n = len(arr.boxes)
+    arr.add_row()
+    assert len(arr.boxes) == n + 1
+    assert len(ui.value["auto_array"]) == n + 1
+
+
+def test_autoui_class_cached():
+    get_autoui(CoreIpywidgets)
+    AutoUi = get_autoui_class(AutoObject)
+    assert get_autoui_class(AutoObject) is AutoUi
+
+
+class TestDiskCache:
+    @pytest.fixture
+    def cachedir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("IPYAUTOUI_CACHEDIR", str(tmp_path))
+        BLUEPRINT_CACHE.clear()
+        BLUEPRINT_DISK_CACHE.clear()
+        yield tmp_path
+        BLUEPRINT_CACHE.clear()
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("IPYAUTOUI_CACHEDIR", raising=False)
+        assert not BLUEPRINT_DISK_CACHE.enabled
+
+    @pytest.mark.parametrize("model", [CoreIpywidgets, Nested, ArrayObjectDataframe])
+    def test_load_from_disk(self, model, cachedir, monkeypatch):
+        _, schema = aumap._init_model_schema(model)
+        bp = get_blueprint(schema)
+        assert len(list((cachedir / "blueprints").glob("*.json"))) == 1
+
+        BLUEPRINT_CACHE.clear()  # i.e. kernel restart
+        disable_mapping(monkeypatch)
+        bp1 = get_blueprint(schema)
+        assert BLUEPRINT_DISK_CACHE.hits == 1
+        assert bp1 is not bp
+        assert bp1.model_dump() == bp.model_dump()
+        assert bp1.widget().value == bp.widget().value
+
+    def test_invalidated_by_version(self, cachedir, monkeypatch):
+        _, schema = aumap._init_model_schema(CoreIpywidgets)
+        get_blueprint(schema)
+        BLUEPRINT_CACHE.clear()
+        monkeypatch.setattr(
+            "ipyautoui._utils.get_ipyautoui_version", lambda: "0.0.0-test"
+        )
+        get_blueprint(schema)
+        assert BLUEPRINT_DISK_CACHE.hits == 0
+        assert len(list((cachedir / "blueprints").glob("*.json"))) == 2
+
+    def test_corrupt_file_is_a_miss(self, cachedir):
+        _, schema = aumap._init_model_schema(CoreIpywidgets)
+        get_blueprint(schema)
+        BLUEPRINT_CACHE.clear()
+        for f in (cachedir / "blueprints").glob("*.json"):
+            f.write_text("{not json")
+        assert get_blueprint(schema).is_container
+        assert BLUEPRINT_DISK_CACHE.hits == 0
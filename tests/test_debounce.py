@@ -0,0 +1,98 @@
+import asyncio
+from pydantic import BaseModel
+from ipyautoui import _utils_debounce
+from ipyautoui._utils_debounce import Debouncer, PENDING
+from ipyautoui.autoobject import AutoObject
+from ipyautoui.custom.markdown_widget import MarkdownWidget
+
+
+def test_debouncer_no_loop_calls_immediately():
+    calls = []
+    d = Debouncer(calls.append, wait=10)
+    d(1)
+    d(2)
+    assert calls == [1, 2]
+
+
+def test_debouncer_coalesces():
+    calls = []
+
+    async def main():
+        d = Debouncer(calls.append, wait=0.05)
+        for n in range(10):
+            d(n)
+        assert calls == [] and d.pending
+        await asyncio.sleep(0.15)
+        return d
+
+    d = asyncio.run(main())
+    assert calls == [9]
+    assert (d.calls, d.runs) == (10, 1)
+
+
+def test_debouncer_max_latency_and_flush():
+    calls = []
+
+    async def main():
+        d = Debouncer(calls.append, wait=0.05, max_latency=0.1)
+        for n in range(10):  # keeps postponing the call...
+            d(n)
+            await asyncio.sleep(0.02)
+        assert len(calls) >= 1  # ... until max_latency is reached
+        d("last")
+        d.flush()
+        assert calls[-1] == "last" and not d.pending
+
+    asyncio.run(main())
+
+
+def test_watch_validate_debounced():
+    class Model(BaseModel):
+        text: str = "a"
+        integer: int = 1
+
+    async def main():
+        ui = AutoObject.from_pydantic_model(Model)
+        for s in ["b", "bo", "bob"]:
+            ui.di_widgets["text"].value = s
+        d = ui.debouncers["_watch_validate_update_value"]
+        assert d.pending
+        assert ui.value["text"] == "bob"  # reading the value flushes
+        assert (d.calls, d.runs) == (3, 1)
+
+    asyncio.run(main())
+
+
+def test_watch_validate_flushes_nested(monkeypatch):
+    class Inner(BaseModel):
+        text: str = "a"
+
+    class Outer(BaseModel):
+        inner: Inner = Inner()
+
+    async def main():
+        ui = AutoObject.from_pydantic_model(Outer)
+        ui.di_widgets["inner"].di_widgets["text"].value = "b"
+        assert len(PENDING) > 0
+        assert ui.value == {"inner": {"text": "b"}}
+        assert len(PENDING) == 0
+
+        def fail(widget):
+            raise AssertionError("walked the children with nothing pending")
+
+        monkeypatch.setattr(_utils_debounce, "_get_children", fail)
+        assert ui.value == {"inner": {"text": "b"}}
+
+    asyncio.run(main())
+
+
+def test_markdown_debounced():
+    async def main():
+        ui = MarkdownWidget(debounce_wait=0.01)
+        for s in ["#", "# a", "# ab"]:
+            ui.text.value = s
+        assert ui._value == ""
+        await asyncio.sleep(0.1)
+        assert ui._value == "# ab"
+
+    asyncio.run(main())
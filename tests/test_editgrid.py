@@ -1,9 +1,13 @@
+import pytest
 from pydantic import BaseModel, Field, RootModel
+import asyncio
+import functools
 import typing as ty
 import pandas as pd
 
 from .constants import DIR_TESTS
-from ipyautoui.custom.editgrid import EditGrid
+from ipyautoui.custom.editgrid import EditGrid, DataHandler, is_coroutine_function
+from ipyautoui.custom.edittsv import Changes
 from ipyautoui.custom.buttonbars import CrudButtonBar
 from ipyautoui.demo_schemas.editable_datagrid import EditableGrid, DataFrameCols
 from ipyautoui import AutoUi
@@ -187,6 +191,73 @@ class TestEditGrid:
         assert list(editgrid.value) == value
 
 
+class TestApplyChanges:
+    @staticmethod
+    def make_grid(n=5):
+        value = [
+            DataFrameCols(string=f"s{i}", integer=i).model_dump(mode="json")
+            for i in range(n)
+        ]
+        return EditGrid(schema=EditableGrid, value=value), value
+
+    def test_apply_changes(self, monkeypatch):
+        grid, value = self.make_grid()
+        coerced = []
+        init_data = grid.grid._init_data
+        monkeypatch.setattr(
+            grid.grid, "_init_data", lambda df: coerced.append(len(df)) or init_data(df)
+        )
+        changes = Changes(
+            deletions=["1"],
+            edits={"3": {"string": "edited"}},
+            additions=[value[0] | {"string": "new"}],
+        )
+        grid.apply_changes(changes)
+        assert coerced == [1]  # only the added row is coerced
+        assert [v["string"] for v in grid.value] == ["s0", "s2", "edited", "s4", "new"]
+        assert list(grid.grid.data.index) == list(range(5))
+        assert grid.grid.records() == list(grid.value)
+
+    def test_apply_changes_by_primary_key(self):
+        grid, value = self.make_grid()
+        grid.apply_changes(
+            Changes(deletions=[0], edits={4: {"integer": -1}}),
+            primary_key_name="integer",
+        )
+        assert [v["integer"] for v in grid.value] == [1, 2, 3, -1]
+
+    def test_cell_edit_does_not_rebuild_records(self, monkeypatch):
+        grid, value = self.make_grid(1000)
+        monkeypatch.setattr(grid.grid, "_get_records", None)  # i.e. fail if rebuilt
+        grid.grid.set_cell_value("String", 500, "edited")
+        assert grid.value[500]["string"] == "edited"
+        assert grid.value[499] == value[499]
+
+    def test_keeps_selections_and_transforms(self):
+        grid, value = self.make_grid()
+        transforms = [{"type": "sort", "columnIndex": 1, "desc": True}]
+        grid.grid.transform(transforms)
+        grid.grid.selections = [{"r1": 3, "r2": 3, "c1": 0, "c2": 4}]
+        grid._save_add_to_grid()
+        assert grid.grid._transforms == transforms
+        assert grid.grid.selections == [{"r1": 3, "r2": 3, "c1": 0, "c2": 4}]
+        assert len(grid.value) == 6
+
+        grid.grid.transform([])
+        grid.grid.selections = [{"r1": 0, "r2": 1, "c1": 0, "c2": 4}]
+        grid._copy_selected_to_end()
+        assert [v["string"] for v in grid.value][-2:] == ["s0", "s1"]
+        grid.grid.selections = [{"r1": 1, "r2": 3, "c1": 0, "c2": 4}]
+        grid.apply_changes(Changes(deletions=[2]))  # i.e. within the selection
+        assert grid.grid.selections == [{"r1": 1, "r2": 2, "c1": 0, "c2": 4}]
+
+    def test_transposed(self):
+        grid, value = self.make_grid()
+        grid.grid.transposed = True
+        grid.apply_changes(Changes(deletions=[0], edits={1: {"string": "edited"}}))
+        assert [v["string"] for v in grid.value] == ["edited", "s2", "s3", "s4"]
+
+
 def test_show_hide_nullable():
     class TestProperties(BaseModel):
         string: str
@@ -249,3 +320,355 @@ class TestAutoEditGrid:
         grid._save_add_to_grid()
         assert v != grid.value
         assert v != grid._value
+
+
+class LatencyBackend:
+    """stand-in for a remote backend. every call awaits `latency` seconds"""
+
+    def __init__(self, rows: list[dict], latency: float = 0.02):
+        self.rows, self.latency, self.calls = list(rows), latency, []
+
+    async def _call(self, name):
+        self.calls.append(name)
+        await asyncio.sleep(self.latency)
+
+    async def get_all(self):
+        await self._call("get")
+        return list(self.rows)
+
+    async def post(self, value):
+        await self._call("post")
+        self.rows.append(value)
+
+    async def delete(self, value):
+        await self._call("delete")
+        if value.get("string") == "error":
+            raise ValueError("backend error")
+        self.rows.remove(value)
+
+    def datahandler(self):
+        return DataHandler(
+            fn_get_all_data=self.get_all,
+            fn_post=self.post,
+            fn_patch=self.post,
+            fn_delete=self.delete,
+            fn_copy=self.post,
+        )
+
+
+def test_is_coroutine_function():
+    class Call:
+        async def __call__(self, v):
+            return v
+
+    backend = LatencyBackend([])
+    assert is_coroutine_function(functools.partial(backend.post, {}))
+    assert is_coroutine_function(Call())
+    assert not is_coroutine_function(lambda v: v)
+    assert not is_coroutine_function(print)
+
+
+class TestAsyncDataHandler:
+    rows = [DataFrameCols(string=f"s{i}").model_dump(mode="json") for i in range(3)]
+
+    def test_no_running_loop(self):
+        backend = LatencyBackend(self.rows, latency=0)
+        grid = EditGrid(schema=EditableGrid, datahandler=backend.datahandler())
+        grid._reload_all_data()  # i.e. run to completion
+        assert list(grid.value) == self.rows
+
+    def test_queued_on_loop(self):
+        async def main():
+            backend = LatencyBackend(self.rows)
+            grid = EditGrid(schema=EditableGrid, datahandler=backend.datahandler())
+            bar = grid.buttonbar_grid
+            assert not hasattr(bar, "spinner")  # i.e. built when first busy
+            for _ in range(3):
+                grid._reload_datahandler()
+            assert bar.busy and bar.add.disabled and bar.spinner.show
+            assert backend.calls == []  # i.e. the kernel is not blocked
+            await grid.wait_datahandler()
+            assert backend.calls == ["get"]  # i.e. serialised into one reload
+            assert not bar.busy and not bar.add.disabled and not bar.spinner.show
+            assert list(grid.value) == self.rows
+
+            grid.ui_add.value = self.rows[0] | {"string": "new"}
+            grid._post()
+            grid._save_add_to_grid()
+            await grid.wait_datahandler()
+            assert backend.calls[1:] == ["post", "get"]
+            assert grid.value[-1]["string"] == "new"
+
+            for string in ["a", "b"]:  # i.e. a reload is queued after each post
+                grid.ui_add.value = self.rows[0] | {"string": string}
+                grid._post()
+                grid._save_add_to_grid()
+            await grid.wait_datahandler()
+            assert backend.calls[3:] == ["post", "get", "post", "get"]
+            assert [v["string"] for v in grid.value][-2:] == ["a", "b"]
+
+            grid._call_datahandler(backend.delete, {"string": "error"})
+            await grid.wait_datahandler()
+            assert "backend error" in bar.message.value
+            assert not bar.busy
+
+        asyncio.run(main())
+
+
+class TestBatchDataHandler:
+    @staticmethod
+    def make_grid(n=5):
+        rows = [DataFrameCols(string=f"s{i}").model_dump(mode="json") for i in range(n)]
+        calls = []
+        log = lambda name, rv=None: lambda v: calls.append((name, len(v))) or rv
+        datahandler = DataHandler(
+            fn_get_all_data=log("get_all"),
+            fn_post=log("post"),
+            fn_patch=log("patch"),
+            fn_delete=log("delete"),
+            fn_copy=log("copy"),
+            fn_delete_many=log("delete_many"),
+            fn_copy_many=lambda v: calls.append(("copy_many", len(v))) or v,
+            fn_post_many=lambda v: calls.append(("post_many", len(v))) or v,
+            fn_patch_many=lambda v: calls.append(("patch_many", len(v))),
+        )
+        grid = EditGrid(schema=EditableGrid, value=rows, datahandler=datahandler)
+        return grid, calls
+
+    def test_delete_and_copy_many(self):
+        grid, calls = self.make_grid()
+        grid.grid.selections = [{"r1": 1, "r2": 3, "c1": 0, "c2": 2}]
+        grid._copy()
+        assert [v["string"] for v in grid.value][-3:] == ["s1", "s2", "s3"]
+        grid.grid.selections = [{"r1": 0, "r2": 2, "c1": 0, "c2": 2}]
+        grid._delete_selected()
+        assert [v["string"] for v in grid.value] == ["s3", "s4", "s1", "s2", "s3"]
+        assert calls == [("copy_many", 3), ("delete_many", 3)]  # i.e. no reload
+
+    def test_post_and_patch_many(self):
+        grid, calls = self.make_grid()
+        grid.ui_add.value = grid.value[0] | {"string": "new"}
+        grid.ui_add.savebuttonbar.fns_onsave[0]()  # i.e. _post
+        grid.ui_add.savebuttonbar.fns_onsave[1]()  # i.e. _save_add_to_grid
+        assert grid.value[-1]["string"] == "new"
+        grid.grid.select(1, 0)
+        grid.ui_edit.value = grid.value[1] | {"string": "edited"}
+        grid._patch()
+        grid._save_edit_to_grid()
+        assert grid.value[1]["string"] == "edited"
+        assert calls == [("post_many", 1), ("patch_many", 1)]
+
+    @pytest.mark.parametrize("primary_key_name", [None, "string"])
+    def test_rows_found_when_returned(self, primary_key_name):
+        async def main():
+            async def many(v):
+                await asyncio.sleep(0.01)
+
+            rows = [
+                DataFrameCols(string=f"s{i}").model_dump(mode="json") for i in range(5)
+            ]
+            datahandler = DataHandler(
+                fn_get_all_data=lambda: rows,
+                fn_post=print,
+                fn_patch=print,
+                fn_delete=print,
+                fn_copy=print,
+                fn_delete_many=many,
+                fn_patch_many=many,
+                primary_key_name=primary_key_name,
+            )
+            grid = EditGrid(schema=EditableGrid, value=rows, datahandler=datahandler)
+            grid.grid.select(3, 0)
+            grid.ui_edit.value = grid.value[3] | {"integer": 10}
+            grid._patch()
+            grid.grid.selections = [{"r1": 2, "r2": 2, "c1": 0, "c2": 2}]
+            grid._delete_selected()
+            grid.apply_changes(Changes(deletions=[0]))  # i.e. rows move meanwhile
+            await grid.wait_datahandler()
+            assert [v["string"] for v in grid.value] == ["s1", "s3", "s4"]
+            assert [v["integer"] for v in grid.value][1] == 10
+
+        asyncio.run(main())
+
+
+class TestOptimistic:
+    @staticmethod
+    def make_grid(fail=(), **kwargs):
+        rows = [DataFrameCols(string=f"s{i}").model_dump(mode="json") for i in range(4)]
+        calls = []
+
+        def log(name):
+            def fn(v):
+                calls.append(name)
+                if name in fail:
+                    raise ValueError(f"{name} error")
+                return v
+
+            return fn
+
+        datahandler = DataHandler(
+            **dict(
+                fn_get_all_data=log("get_all"),
+                fn_post=log("post"),
+                fn_patch=log("patch"),
+                fn_delete=log("delete"),
+                fn_copy=log("copy"),
+            )
+            | kwargs
+        )
+        grid = EditGrid(
+            schema=EditableGrid, value=rows, datahandler=datahandler, optimistic=True
+        )
+        return grid, rows, calls
+
+    def test_applied_without_reload(self):
+        new = DataFrameCols(string="new").model_dump(mode="json")
+        grid, rows, calls = self.make_grid(
+            fn_post_many=lambda v: [r | {"integer": 10} for r in v]
+        )
+        grid.ui_add.value = new
+        grid._post()
+        grid._save_add_to_grid()
+        assert grid.value[-1] == new | {"integer": 10}  # i.e. as returned
+        grid.grid.selections = [{"r1": 0, "r2": 1, "c1": 0, "c2": 2}]
+        grid._delete_selected()
+        assert [v["string"] for v in grid.value] == ["s2", "s3", "new"]
+        assert calls == ["delete", "delete"]
+
+    @pytest.mark.parametrize("action", ["post", "patch", "delete"])
+    def test_rollback(self, action):
+        grid, rows, calls = self.make_grid(fail=[action])
+        grid.grid.select(1, 0)
+        if action == "post":
+            grid.ui_add.value = rows[0] | {"string": "new"}
+            grid._post()
+        elif action == "patch":
+            grid.ui_edit.value = rows[1] | {"string": "edited"}
+            grid._patch()
+        else:
+            grid._delete_selected()
+        assert list(grid.value) == rows
+        assert f"{action} error" in grid.buttonbar_grid.message.value
+
+    @pytest.mark.parametrize("fail", [["s2"], ["s0"], ["s0", "s2"]])
+    def test_rollback_deletes(self, fail):
+        def delete(row):
+            if row["string"] in fail:
+                raise ValueError("delete error")
+
+        grid, rows, calls = self.make_grid(fn_delete=delete)
+        grid._delete_optimistic([0, 2])  # i.e. one call per row
+        expected = [r["string"] for r in rows if r["string"] in fail + ["s1", "s3"]]
+        assert [v["string"] for v in grid.value] == expected
+
+        delete_many = lambda v: list(map(delete, v))
+        grid, rows, calls = self.make_grid(fn_delete_many=delete_many)
+        grid._delete_optimistic([0, 2])
+        assert list(grid.value) == rows
+
+    def test_rollback_async(self):
+        async def main():
+            backend = LatencyBackend(TestAsyncDataHandler.rows)
+            grid = EditGrid(
+                schema=EditableGrid,
+                value=backend.rows,
+                datahandler=backend.datahandler(),
+                optimistic=True,
+            )
+            grid.grid.selections = [{"r1": 0, "r2": 0, "c1": 0, "c2": 2}]
+            grid._delete_selected()
+            assert len(grid.value) == 2  # i.e. before the backend has responded
+            grid.ui_add.value = backend.rows[0] | {"string": "error"}
+            grid._post()
+            grid.grid.selections = [{"r1": 2, "r2": 2, "c1": 0, "c2": 2}]
+            grid._delete_selected()  # i.e. raises in the backend
+            assert [v["string"] for v in grid.value] == ["s1", "s2"]
+            await grid.wait_datahandler()
+            assert [v["string"] for v in grid.value] == ["s1", "s2", "error"]
+            assert backend.calls == ["delete", "post", "delete"]
+            assert "failed and was undone" in grid.buttonbar_grid.message.value
+
+        asyncio.run(main())
+
+    def test_reload_interval(self):
+        async def main():
+            grid, rows, calls = self.make_grid()
+            reloads = []
+            grid.datahandler.fn_get_all_data = lambda: reloads.append(1) or rows
+            grid.reload_interval = 0.01
+            await asyncio.sleep(0.05)
+            grid.reload_interval = None
+            n = len(reloads)
+            await asyncio.sleep(0.03)
+            assert n > 0 and len(reloads) == n
+            assert list(grid.value) == rows
+
+        asyncio.run(main())
+
+
+class VersionedBackend:
+    """rows keyed by "integer" with a log of (version, key) of changed rows"""
+
+    def __init__(self, n=5):
+        self.rows = {
+            i: DataFrameCols(string=f"s{i}", integer=i).model_dump(mode="json")
+            for i in range(n)
+        }
+        self.log, self.version = [], 0
+
+    def _changed(self, key):
+        self.version += 1
+        self.log.append((self.version, key))
+
+    def upsert(self, row):
+        self.rows[row["integer"]] = row
+        self._changed(row["integer"])
+
+    def delete(self, key):
+        del self.rows[key]
+        self._changed(key)
+
+    def get_changes_since(self, version):
+        if version is None:
+            return self.version, Changes(additions=list(self.rows.values()))
+        keys = dict.fromkeys(k for v, k in self.log if v > version)
+        return self.version, Changes(
+            deletions=[k for k in keys if k not in self.rows],
+            edits={k: self.rows[k] for k in keys if k in self.rows and k < 100},
+            additions=[self.rows[k] for k in keys if k in self.rows and k >= 100],
+        )
+
+
+def test_changes_since(monkeypatch):
+    backend = VersionedBackend()
+    datahandler = DataHandler(
+        fn_get_all_data=lambda: pytest.fail("all data loaded"),
+        fn_post=backend.upsert,
+        fn_patch=backend.upsert,
+        fn_delete=backend.delete,
+        fn_copy=backend.upsert,
+        fn_get_changes_since=backend.get_changes_since,
+        primary_key_name="integer",
+    )
+    grid = EditGrid(schema=EditableGrid, datahandler=datahandler)
+    grid._reload_datahandler()
+    assert [v["integer"] for v in grid.value] == [0, 1, 2, 3, 4]
+
+    coerced = []
+    init_data = grid.grid._init_data
+    monkeypatch.setattr(
+        grid.grid, "_init_data", lambda df: coerced.append(len(df)) or init_data(df)
+    )
+    backend.delete(1)
+    backend.upsert(backend.rows[3] | {"string": "edited"})
+    backend.upsert(backend.rows[0] | {"integer": 100})
+    grid._reload_datahandler()
+    assert coerced == [1]  # i.e. only the added row
+    assert [v["integer"] for v in grid.value] == [0, 2, 3, 4, 100]
+    assert grid.value[2]["string"] == "edited"
+    assert grid._datahandler_version == 3
+
+    grid.apply_changes(Changes(deletions=[0]))  # i.e. out of sync
+    backend.upsert(backend.rows[0] | {"string": "edited"})
+    grid._reload_datahandler()  # i.e. resyncs all the rows
+    assert [v["integer"] for v in grid.value] == [0, 2, 3, 4, 100]
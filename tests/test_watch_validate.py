@@ -0,0 +1,174 @@
+import copy
+import typing as ty
+from pydantic import BaseModel, Field, model_validator, field_validator
+from ipyautoui.autoobject import AutoObject
+from ipyautoui.watch_validate import get_field_adapters
+
+
+class Simple(BaseModel):
+    a: int = Field(default=1, ge=0)
+    b: str = "b"
+    c: float = 0.5
+
+
+class WithModelValidator(Simple):
+    @model_validator(mode="after")
+    def check_a_b(self):
+        if self.a == 2 and self.b == "b":
+            raise ValueError("a == 2 and b == 'b'")
+        return self
+
+
+class WithFieldValidator(Simple):
+    @field_validator("b")
+    @classmethod
+    def upper_b(cls, v):
+        return v.upper()
+
+
+def test_get_field_adapters():
+    assert get_field_adapters(Simple).keys() == {"a", "b", "c"}
+    assert get_field_adapters(WithModelValidator) is None
+    assert get_field_adapters(WithFieldValidator).keys() == {"a", "c"}
+
+
+def test_incremental_validation_keys_errors_by_path(monkeypatch):
+    import ipyautoui.watch_validate as wv
+
+    ui = AutoObject.from_pydantic_model(Simple)
+    calls = []
+    fn = wv.pydantic_validate
+    monkeypatch.setattr(wv, "pydantic_validate", lambda *a, **k: calls.append(1) or fn(*a, **k))
+
+    ui.di_widgets["a"].value = -1  # IntText
+    assert calls == []  # only "a" validated
+    assert list(ui.errors.keys()) == [("a",)]
+    assert "greater than or equal to 0" in ui.error
+    assert ui.value["a"] == -1
+
+    ui.di_widgets["b"].value = "c"
+    assert list(ui.errors.keys()) == [("a",)]  # errors of other fields are kept
+    ui.di_widgets["a"].value = 3
+    assert ui.errors == {} and ui.error is None
+    assert ui.value == {"a": 3, "b": "c", "c": 0.5}
+
+
+def test_full_validation_for_validators():
+    ui = AutoObject.from_pydantic_model(WithFieldValidator)
+    ui.di_widgets["b"].value = "c"
+    assert ui.value["b"] == "C"
+
+    ui = AutoObject.from_pydantic_model(WithModelValidator)
+    ui.di_widgets["a"].value = 2
+    assert ui.error is not None
+
+
+def test_validate_commit():
+    ui = AutoObject.from_pydantic_model(Simple)
+    ui.di_widgets["a"].value = -1
+    assert ui.validate() is False
+    assert ui.error.startswith("1 validation error for Simple")
+    ui.di_widgets["a"].value = 1
+    assert ui.validate() is True
+
+
+class Slow(BaseModel):
+    a: int = 1
+    b: str = "b"
+
+    @model_validator(mode="after")
+    def slow(self):
+        import time
+
+        time.sleep(0.05)
+        if self.a < 0:
+            raise ValueError("a < 0")
+        return self
+
+
+def test_validate_in_thread():
+    import asyncio
+
+    async def main():
+        ui = AutoObject.from_pydantic_model(Slow, validate_in_thread=True)
+        while ui.validation_pending:
+            await asyncio.sleep(0.01)
+        ui.debounce_wait = 0  # i.e. validate every change
+        for n in [-1, -2, 3]:
+            ui.di_widgets["a"].value = n
+        assert ui.validation_pending and ui.spinner_validation.show
+        assert ui.value["a"] == 3  # unvalidated value applied immediately
+        while ui.validation_pending:
+            await asyncio.sleep(0.01)
+        assert ui.error is None  # superseded validations of -1, -2 are discarded
+        ui.value = {"a": -1}
+        while ui.validation_pending:
+            await asyncio.sleep(0.01)
+        assert ui.error is not None and not ui.spinner_validation.show
+
+    asyncio.run(main())
+
+
+def test_validate_in_thread_unexpected_error(monkeypatch):
+    import asyncio
+    from ipyautoui import watch_validate
+
+    def fail(model, value):
+        raise RuntimeError("boom")
+
+    async def main():
+        ui = AutoObject.from_pydantic_model(Slow, validate_in_thread=True)
+        while ui.validation_pending:
+            await asyncio.sleep(0.01)
+        monkeypatch.setattr(watch_validate, "_validate", fail)
+        ui.value = {"a": 2}
+        assert ui.validation_pending
+        while ui.validation_pending:
+            await asyncio.sleep(0.01)
+        assert "boom" in ui.error
+
+    asyncio.run(main())
+
+
+def test_spinner_only_if_validate_in_thread():
+    ui = AutoObject.from_pydantic_model(Slow)
+    assert not hasattr(ui, "spinner_validation")
+    ui.validate_in_thread = True
+    assert ui.spinner_validation in ui.hbx_valid.children
+
+
+class Inner(BaseModel):
+    x: int = 1
+    y: str = "y"
+
+
+class Outer(BaseModel):
+    a: int = 1
+    inner: Inner = Inner()
+    items: list[Inner] = [Inner(), Inner()]
+    maybe: ty.Optional[int] = 2
+
+
+def test_set_value_only_assigns_changed_widgets():
+    from ipyautoui.watch_validate import WIDGET_ASSIGNMENTS
+
+    ui = AutoObject.from_pydantic_model(Outer)
+    v = copy.deepcopy(ui.value) | {"items": [Inner().model_dump() for _ in range(2)]}
+    ui.value = copy.deepcopy(v)
+
+    WIDGET_ASSIGNMENTS.clear()
+    v["inner"]["x"] = 2
+    ui.value = copy.deepcopy(v)
+    assert sum(WIDGET_ASSIGNMENTS.values()) == 1
+    assert ui.di_widgets["inner"].di_widgets["x"].value == 2
+
+    WIDGET_ASSIGNMENTS.clear()
+    v["items"][1]["y"] = "z"
+    ui.value = copy.deepcopy(v)
+    assert sum(WIDGET_ASSIGNMENTS.values()) == 1
+
+    WIDGET_ASSIGNMENTS.clear()
+    v["maybe"] = 3
+    ui.value = copy.deepcopy(v)
+    assert sum(WIDGET_ASSIGNMENTS.values()) == 1
+    assert ui.value == v